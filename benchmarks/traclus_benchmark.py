@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :traclus_benchmark.py
+# target    :partition, 聚类和代表性轨迹生成三个阶段的基准测试, 对合成轨迹进行规模扫描, 记录每个阶段的运行时间, 内存峰值和距离计算次数,
+#            结果保存为json文件, 可以通过--compare与之前版本的结果进行对比
+#            运行方式(项目根目录): python -m benchmarks.traclus_benchmark --traj 50,100,200 --output results.json
+# output    :
+# author    :Miller
+# date      :2026/10/18 22:55
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from trajCluster.profiling import profiling_session
+from trajCluster.partition import approximate_trajectory_partitioning, rdp_trajectory_partitioning
+from trajCluster.cluster import line_segment_clustering, representative_trajectory_generation, ClusteringStats
+from trajCluster.synthetic import generate_trajectories
+
+cluster_engines = {
+    'brute': dict(),
+    'vectorized': dict(vectorized=True),
+    'index': dict(use_index=True),
+    'index_vectorized': dict(use_index=True, vectorized=True),
+}
+
+
+def _measure(func, repeat: int, setup=None, counter=None):
+    """运行repeat次取最短时间, 再在tracemalloc下运行一次记录内存峰值和距离计算次数
+    parameter
+    ---------
+        func: Callable[[], Any], 被测试的函数
+        repeat: int, 计时的重复次数
+        setup: Callable[[], None], 每次运行前的准备工作, 不计入时间
+        counter: str, 从Profiler的计数中读取距离计算次数的名称
+    return
+    ------
+        Tuple[float, int, int or None, Any], (最短时间(秒), 内存峰值(字节), 距离计算次数, 最后一次运行的结果)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    with (profiling_session() if counter is not None else contextlib.nullcontext()) as profiler:
+        tracemalloc.start()
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak, profiler.counters[counter] if counter is not None else None, result
+
+
+def _record(stage, n_traj, n_points, n_segments, wall_time, peak_memory, distance_calls, **params):
+    return {'stage': stage, 'n_traj': n_traj, 'n_points': n_points, 'n_segments': n_segments, 'params': params,
+            'wall_time': wall_time, 'peak_memory': peak_memory, 'distance_calls': distance_calls}
+
+
+def run_benchmark(n_traj: int, args):
+    """对一个规模的合成轨迹运行所有阶段的基准测试, 返回记录列表"""
+    trajectories = generate_trajectories(n_traj=n_traj, n_points=args.points, corridors=args.corridors, noise=args.noise,
+                                         outlier_rate=args.outlier_rate, seed=args.seed)
+    records = []
+
+    def approximate():
+        return [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=args.theta)]
+    wall, peak, calls, segs = _measure(approximate, args.repeat,
+                                       counter='partition.distance_evaluations')
+    records.append(_record('approximate_trajectory_partitioning', n_traj, args.points, len(segs), wall, peak, calls, theta=args.theta))
+
+    def rdp():
+        return [s for i, t in enumerate(trajectories) for s in rdp_trajectory_partitioning(t, traj_id=i, epsilon=args.rdp_epsilon)]
+    wall, peak, calls, rdp_segs = _measure(rdp, args.repeat,
+                                           counter='partition.distance_evaluations')
+    records.append(_record('rdp_trajectory_partitioning', n_traj, args.points, len(rdp_segs), wall, peak, calls,
+                           epsilon=args.rdp_epsilon))
+
+    def reset():
+        for s in segs:
+            s.cluster_id = -1
+
+    clusters = None
+    for engine in args.engines:
+        stats = ClusteringStats()
+
+        def cluster():
+            stats.__init__()
+            return line_segment_clustering(segs, epsilon=args.epsilon, min_lines=args.min_lines, stats=stats,
+                                           **cluster_engines[engine])
+        wall, peak, _, (clusters, _) = _measure(cluster, args.repeat, setup=reset)
+        records.append(_record('line_segment_clustering[%s]' % engine, n_traj, args.points, len(segs), wall, peak,
+                               stats.distance_evaluations, epsilon=args.epsilon, min_lines=args.min_lines))
+
+    def representative():
+        return representative_trajectory_generation(clusters, min_lines=args.rep_min_lines, min_dist=args.rep_min_dist,
+                                                    n_jobs=args.rep_jobs)
+    wall, peak, _, _ = _measure(representative, args.repeat)
+    records.append(_record('representative_trajectory_generation', n_traj, args.points, sum(len(v) for v in clusters.values()),
+                           wall, peak, None, min_lines=args.rep_min_lines, min_dist=args.rep_min_dist, n_jobs=args.rep_jobs))
+    return records
+
+
+def _metadata(args):
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': sys.version.split()[0], 'numpy': np.__version__, 'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'arguments': vars(args)}
+
+
+def compare(old_results, new_results):
+    """按照(stage, n_traj, n_points)对比两次结果, 打印时间和内存的比值(new / old)"""
+    old = {(r['stage'], r['n_traj'], r['n_points']): r for r in old_results['results']}
+    print("%-48s %8s %8s %10s %10s" % ('stage', 'n_traj', 'n_points', 'time', 'memory'))
+    for r in new_results['results']:
+        key = (r['stage'], r['n_traj'], r['n_points'])
+        if key not in old:
+            continue
+        time_ratio = r['wall_time'] / old[key]['wall_time'] if old[key]['wall_time'] else float('nan')
+        memory_ratio = r['peak_memory'] / old[key]['peak_memory'] if old[key]['peak_memory'] else float('nan')
+        print("%-48s %8d %8d %9.2fx %9.2fx" % (key + (time_ratio, memory_ratio)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TRACLUS各阶段的基准测试")
+    parser.add_argument('--traj', default='20,40,80', help="轨迹数量的扫描列表, 逗号分隔")
+    parser.add_argument('--points', type=int, default=50, help="每条轨迹的点数")
+    parser.add_argument('--corridors', type=int, default=4)
+    parser.add_argument('--noise', type=float, default=2.0)
+    parser.add_argument('--outlier-rate', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--theta', type=float, default=5.0, help="approximate partition的theta")
+    parser.add_argument('--rdp-epsilon', type=float, default=2.0, help="rdp partition的epsilon")
+    parser.add_argument('--epsilon', type=float, default=15.0, help="line_segment_clustering的epsilon")
+    parser.add_argument('--min-lines', type=int, default=5)
+    parser.add_argument('--rep-min-lines', type=int, default=3)
+    parser.add_argument('--rep-min-dist', type=float, default=5.0)
+    parser.add_argument('--rep-jobs', type=int, default=1, help="代表性轨迹生成的并行进程数")
+    parser.add_argument('--engines', default='brute,vectorized,index', help="聚类的计算方式: " + ','.join(cluster_engines))
+    parser.add_argument('--repeat', type=int, default=3, help="计时的重复次数, 取最短时间")
+    parser.add_argument('--output', default=None, help="结果的json文件路径")
+    parser.add_argument('--compare', default=None, help="与之前的结果文件进行对比")
+    args = parser.parse_args(argv)
+    args.engines = [e for e in args.engines.split(',') if e]
+    for engine in args.engines:
+        if engine not in cluster_engines:
+            parser.error("unknown engine: %s" % engine)
+
+    results = {'meta': _metadata(args), 'results': []}
+    for n_traj in [int(n) for n in args.traj.split(',') if n]:
+        for r in run_benchmark(n_traj, args):
+            results['results'].append(r)
+            print("%-48s n_traj=%-6d segments=%-7d time=%.4fs peak=%.1fMB distance_calls=%s" % (
+                r['stage'], r['n_traj'], r['n_segments'], r['wall_time'], r['peak_memory'] / 2 ** 20, r['distance_calls']))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :assign_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 4:00
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import time
+
+import numpy as np
+
+from trajCluster.assign import ClusterAssigner
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.cluster import line_segment_clustering, representative_trajectory_generation
+from trajCluster.point import Point
+from trajCluster.segment import compare
+from trajCluster.result import ClusteringResult
+from trajCluster.synthetic import generate_trajectories
+
+corridors = 3
+trajectories = generate_trajectories(n_traj=60, n_points=40, corridors=corridors, noise=2.0, outlier_rate=0.0, seed=9)
+segs = [s for i, t in enumerate(trajectories[corridors:], start=corridors)
+        for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+clusters, _ = line_segment_clustering(segs, epsilon=15.0, min_lines=4, use_index=True)
+corridor_of = {k: np.bincount([s.traj_id % corridors for s in v]).argmax() for k, v in clusters.items()}
+representatives = representative_trajectory_generation(clusters, min_lines=3, min_dist=5.0)
+assigner = ClusterAssigner(clusters, representatives, epsilon=15.0)
+
+for i in range(corridors):  # 前corridors条轨迹没有参与聚类, 依次属于每个通道
+    start = time.perf_counter()
+    query_segs, labels = assigner.assign(trajectories[i])
+    elapsed = time.perf_counter() - start
+    assigned = labels[labels != -1]
+    assert len(assigned) > len(labels) / 2
+    assert all(corridor_of[k] == i for k in assigned.tolist())
+    assert assigner.assign_trajectory(trajectories[i]) in corridor_of
+    print("trajectory %d: segments=%d assigned=%d time=%.2fms" % (i, len(labels), len(assigned), elapsed * 1000))
+
+    # 投票结果与暴力计算的邻域一致
+    for seg, label in zip(query_segs, labels.tolist()):
+        votes = dict()
+        for k, v in clusters.items():
+            for other in v:
+                seg_long, seg_short = compare(seg, other)
+                if seg_long.get_all_distance(seg_short) <= 15.0:
+                    votes[k] = votes.get(k, 0) + 1
+        if votes:
+            assert label == min(votes, key=lambda k: (-votes[k], k))
+
+# 远离所有类簇的轨迹不分配
+far = [Point(p.x + 1e5, p.y + 1e5) for p in trajectories[0]]
+assert (assigner.assign(far)[1] == -1).all() and assigner.assign_trajectory(far) == -1
+
+# 只通过代表性轨迹匹配
+rep_only = ClusterAssigner({k: [] for k in clusters}, representatives, epsilon=15.0)
+labels = rep_only.assign(trajectories[1])[1]
+assert all(corridor_of[k] == 1 for k in labels[labels != -1].tolist()) and (labels != -1).any()
+
+result = ClusteringResult.from_clustering(segs, representatives, epsilon=15.0)
+assert np.array_equal(ClusterAssigner.from_result(result).assign(trajectories[2])[1], assigner.assign(trajectories[2])[1])
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :backend_test.py
+# target    :所有可用的距离计算后端与纯python参考实现在随机segment上的计算结果一致(误差范围内)
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 22:10
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment, compare
+from trajCluster.backend import available_backends, get_backend
+from trajCluster.cluster import neighborhood, line_segment_clustering
+from trajCluster.partition import segment_mdl_comp
+from trajCluster.index import SegmentGridIndex
+
+rng = np.random.RandomState(4)
+segs = []
+for i in range(300):
+    x, y = rng.uniform(-50, 50, 2).tolist()
+    dx, dy = rng.uniform(-8, 8, 2).tolist() if i % 15 else (0.0, 0.0)  # 包括起止点重合的segment, 属于同一条轨迹
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 7 if i % 15 else 7))
+
+reference = get_backend('python')
+expected = np.array([[compare(a, b)[0].get_all_distance(compare(a, b)[1]) for b in segs] for a in segs[:40]])
+print("可用的后端:", available_backends())
+assert get_backend(None).name == available_backends()[0]  # 调用时选择最快的后端
+for name in available_backends():
+    backend = get_backend(name)
+    result = np.array([backend.distances(a, segs) for a in segs[:40]])
+    assert np.allclose(result, expected, rtol=1e-9, atol=1e-9), name
+    assert neighborhood(segs[3], segs, epsilon=10.0, backend=name) == neighborhood(segs[3], segs, epsilon=10.0)
+
+    # 距离分量的权重
+    weighted, weighted_reference = get_backend(name, perpendicular=2.0, parallel=0.5, angle=0.0), \
+        get_backend('python', perpendicular=2.0, parallel=0.5, angle=0.0)
+    assert np.allclose(weighted.distances(segs[5], segs), weighted_reference.distances(segs[5], segs), rtol=1e-9, atol=1e-9), name
+
+    # MDL
+    traj = [Point(x, y) for x, y in np.cumsum(rng.uniform(-1, 3, (30, 2)), axis=0)]
+    for current_index in (2, 10, 29):
+        assert abs(segment_mdl_comp(traj, 0, current_index, backend=name) - segment_mdl_comp(traj, 0, current_index)) < 1e-9, name
+
+line_segment_clustering(segs, 6.0, 3)
+labels = [s.cluster_id for s in segs]
+for s in segs:
+    s.cluster_id = -1
+line_segment_clustering(segs, 6.0, 3, backend=available_backends()[0])
+assert labels == [s.cluster_id for s in segs]
+
+# 后端不能与空间索引同时使用, 带权重的距离不满足索引的剪枝下界
+for kwargs in ({'use_index': True}, {'vectorized': True}):
+    try:
+        line_segment_clustering(segs, 6.0, 3, backend=get_backend('numpy', perpendicular=2.0), **kwargs)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(kwargs)
+try:
+    neighborhood(segs[3], segs, epsilon=10.0, index=SegmentGridIndex(segs, epsilon=10.0), backend='numpy')
+except ValueError:
+    pass
+else:
+    raise AssertionError
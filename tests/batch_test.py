@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :batch_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 5:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.partition import approximate_trajectory_partitioning, rdp_trajectory_partitioning, batch_trajectory_partitioning
+from trajCluster.synthetic import generate_trajectories
+
+
+def summary(segs):
+    return [(s.start.x, s.start.y, s.end.x, s.end.y, s.traj_id) for s in segs]
+
+
+if __name__ == '__main__':
+    trajectories = generate_trajectories(n_traj=30, n_points=50, corridors=3, noise=2.0, seed=5)
+    traj_ids = [100 + 7 * i for i in range(len(trajectories))]
+    expected = [s for i, t in zip(traj_ids, trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+    for n_jobs, executor in [(1, 'process'), (3, 'thread'), (3, 'process')]:
+        batch = batch_trajectory_partitioning(trajectories, theta=5.0, n_jobs=n_jobs, executor=executor, chunk_size=4,
+                                              traj_ids=traj_ids)
+        assert summary(batch) == summary(expected)
+        batch = batch_trajectory_partitioning(dict(zip(traj_ids, trajectories)), theta=5.0, n_jobs=n_jobs, executor=executor)
+        assert summary(batch) == summary(expected)
+    rdp = [s for i, t in enumerate(trajectories) for s in rdp_trajectory_partitioning(t, traj_id=i, epsilon=1.0)]
+    assert summary(batch_trajectory_partitioning(trajectories, method='rdp', epsilon=1.0, n_jobs=2)) == summary(rdp)
+
+    # 两个点的轨迹为坐标元组时作为一条轨迹, 而不是(traj_id, 轨迹)
+    segs = batch_trajectory_partitioning([((0.0, 0.0), (3.0, 4.0)), np.array([[1.0, 1.0], [2.0, 2.0], [5.0, 1.0]])])
+    assert summary(segs)[0] == (0.0, 0.0, 3.0, 4.0, 0) and {s.traj_id for s in segs} == {0, 1}
+    for kwargs in [dict(traj_ids=[1]), dict(trajectories={0: trajectories[0]}, traj_ids=[0])]:
+        kwargs.setdefault('trajectories', trajectories[:2])
+        try:
+            batch_trajectory_partitioning(**kwargs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(kwargs)
+    print("segment数量:", len(expected))
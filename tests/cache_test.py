@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :cache_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 4:50
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import tempfile
+
+import numpy as np
+
+from trajCluster.cache import PartitionCache
+from trajCluster.partition import approximate_trajectory_partitioning, rdp_trajectory_partitioning, \
+    batch_trajectory_partitioning, partition_trajectory_store
+from trajCluster.store import TrajectoryStore
+from trajCluster.synthetic import generate_trajectories
+
+
+def coords(segs):
+    return [(s.start.x, s.start.y, s.end.x, s.end.y) for s in segs]
+
+
+if __name__ == '__main__':
+    trajectories = generate_trajectories(n_traj=30, n_points=40, corridors=3, noise=2.0, seed=5)
+    expect = [coords(approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)) for i, t in enumerate(trajectories)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PartitionCache(tmp)
+        first = [coords(approximate_trajectory_partitioning(t, traj_id=i, theta=5.0, cache=cache)) for i, t in enumerate(trajectories)]
+        second = [coords(approximate_trajectory_partitioning(t, traj_id=i, theta=5.0, cache=cache)) for i, t in enumerate(trajectories)]
+        assert first == expect and second == expect
+        assert cache.stats()['hits'] == 30 and cache.stats()['misses'] == 30 and len(cache) == 30
+
+        # 参数或者方法不同时不命中
+        approximate_trajectory_partitioning(trajectories[0], theta=8.0, cache=cache)
+        rdp_trajectory_partitioning(trajectories[0], epsilon=2.0, cache=cache)
+        assert cache.misses == 32
+        assert coords(rdp_trajectory_partitioning(trajectories[0], epsilon=2.0, cache=cache)) == \
+            coords(rdp_trajectory_partitioning(trajectories[0], epsilon=2.0))
+
+        # 缓存在新的实例中仍然有效, 修改一个轨迹点后不命中
+        reopened = PartitionCache(tmp)
+        changed = [np.array([(p.x, p.y) for p in t]) for t in trajectories]
+        changed[3][5, 0] += 1e-9
+        parallel = batch_trajectory_partitioning(changed, theta=5.0, n_jobs=2, chunk_size=4, cache=reopened)
+        assert reopened.hits == 29 and reopened.misses == 1
+        assert coords(parallel) == coords(batch_trajectory_partitioning(changed, theta=5.0))
+
+        store = TrajectoryStore.from_trajectories(trajectories)
+        assert np.array_equal(partition_trajectory_store(store, cache=reopened).coords,
+                              partition_trajectory_store(store).coords)
+
+        # 超过容量上限时删除最久未访问的结果
+        small = PartitionCache(tmp, max_bytes=reopened.size // 2)
+        assert small.size <= small.max_bytes and small.evictions > 0
+        keys = list(small._entries)
+        small.get(keys[0])
+        small.max_bytes = small.size  # 再写入一个结果时删除最久未访问的keys[1]
+        small.put(PartitionCache.key(changed[0], theta=1.0), [(0, 39)])
+        assert small.size <= small.max_bytes
+        assert keys[0] in small and keys[1] not in small
+        assert len(PartitionCache(tmp)) == len(small)
+        print(small)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :clean_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 3:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.partition import clean_trajectory, clean_trajectory_index, approximate_trajectory_partitioning, \
+    rdp_trajectory_partitioning, partition_trajectory_store, batch_trajectory_partitioning
+from trajCluster.point import Point
+from trajCluster.store import TrajectoryStore
+
+rng = np.random.RandomState(3)
+moving = np.cumsum(rng.uniform(5, 10, (30, 2)), axis=0)
+parked = moving[-1] + rng.normal(0, 0.3, (200, 2))  # 停车时的GPS漂移
+leaving = parked[-1] + np.cumsum(rng.uniform(5, 10, (30, 2)), axis=0)
+coords = np.vstack((moving, parked, leaving))
+coords = np.insert(coords, [3, 3, 10], coords[[3, 3, 10]], axis=0)  # 重复的GPS采样
+
+kept, removed = clean_trajectory_index(coords)
+assert removed == 3 and len(kept) == len(coords) - 3
+cleaned, removed = clean_trajectory(coords, stationary_radius=2.0)
+assert len(cleaned) < 70 and removed == len(coords) - len(cleaned)
+assert np.all(np.hypot(*np.diff(cleaned, axis=0).T) > 1e-6)
+# 每个被删除的点与某个保留的点之间的距离都不大于radius
+dist = np.hypot(coords[:, None, 0] - cleaned[None, :, 0], coords[:, None, 1] - cleaned[None, :, 1]).min(axis=1)
+assert dist.max() <= 2.0
+
+# 时间间隔超过time_tolerance的点不作为重复点删除
+timestamps = np.arange(len(coords), dtype=np.float64)
+timestamps[4:] += 1000
+kept, removed = clean_trajectory_index(coords, timestamps=timestamps, time_tolerance=10)
+assert removed == 2
+
+segs = approximate_trajectory_partitioning(coords, traj_id=1, theta=5.0)
+clean = {'stationary_radius': 2.0}
+cleaned_segs = approximate_trajectory_partitioning(coords, traj_id=1, theta=5.0, clean=clean)
+print("segments:", len(segs), "cleaned segments:", len(cleaned_segs))
+assert len(cleaned_segs) <= len(segs) and all(s.length > 0 for s in cleaned_segs)
+
+points = [Point(x, y) for x, y in coords]
+point_segs = rdp_trajectory_partitioning(points, traj_id=1, epsilon=1.0, clean=clean)
+assert all(any(s.start is p for p in points) for s in point_segs)  # segment的端点为原始轨迹中的点
+assert [(s.start.x, s.end.x) for s in point_segs] == [(s.start.x, s.end.x) for s in rdp_trajectory_partitioning(
+    clean_trajectory(coords, **clean)[0], traj_id=1, epsilon=1.0)]
+
+store = partition_trajectory_store(TrajectoryStore.from_trajectories([coords, moving]), clean=clean)
+batch = batch_trajectory_partitioning([coords, moving], clean=clean)
+assert np.array_equal(store.coords, [(s.start.x, s.start.y, s.end.x, s.end.y) for s in batch])
+assert [s.end.x for s in approximate_trajectory_partitioning(moving, clean=clean)] == \
+    [s.end.x for s in approximate_trajectory_partitioning(moving)]
+
+# 缓慢漂移的轨迹: 相邻两点的距离都不大于tolerance, 按照与锚点的距离删除, 不会整体删除
+drift = np.column_stack((np.arange(10) * 0.9, np.zeros(10)))
+kept, removed = clean_trajectory_index(drift, tolerance=1.0)
+assert kept.tolist() == [0, 2, 4, 6, 8, 9] and removed == 4
+assert np.all(np.diff(drift[kept, 0]) > 0)
+drift_segs = approximate_trajectory_partitioning(drift, clean={'tolerance': 1.0})
+assert len(drift_segs) >= 1 and all(s.length > 0 for s in drift_segs)
+assert drift_segs[0].start.x == 0.0 and drift_segs[-1].end.x == drift[-1, 0]
+# 完全重合的最后一个点不保留
+assert clean_trajectory_index(np.zeros((5, 2)))[0].tolist() == [0]
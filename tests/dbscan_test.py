@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :dbscan_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 21:10
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.cluster import line_segment_clustering, ClusteringStats
+
+# 80条相互平行的segment组成一个核心segment的邻域超过50的类簇, 队列中的segment不能被丢弃
+rng = np.random.RandomState(9)
+segs = [Segment(Point(0.0, i * 0.05), Point(10.0, i * 0.05), traj_id=i) for i in range(80)]
+for i in range(200):
+    x, y = rng.uniform(20, 200, 2)
+    dx, dy = rng.uniform(-5, 5, 2)
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 30))
+
+for kwargs in ({}, {'vectorized': True}, {'use_index': True}):
+    for s in segs:
+        s.cluster_id = -1
+    stats = ClusteringStats()
+    cluster_dict, remove_cluster = line_segment_clustering(segs, epsilon=3.0, min_lines=4, stats=stats, **kwargs)
+    assert len(set(s.cluster_id for s in segs[:80])) == 1 and segs[0].cluster_id != -1
+    # 每个segment的邻域最多计算一次
+    assert stats.neighborhood_queries <= len(segs)
+    print(kwargs, stats)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :distance_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 11:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment, compare
+from trajCluster.distance import SegmentArray, segment_distance_batch
+
+rng = np.random.RandomState(3)
+segs = [Segment(Point(1.0, 2.0), Point(1.0, 2.0), traj_id=0), Segment(Point(1.0, 2.0), Point(5.0, 2.0), traj_id=0)]
+for i in range(200):
+    x, y = rng.uniform(0, 100, 2)
+    dx, dy = rng.uniform(-10, 10, 2)
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 7))
+
+arr = SegmentArray(segs)
+for seg in segs[1:]:
+    expect = np.array([compare(seg, s)[0].get_all_distance(compare(seg, s)[1]) for s in segs[1:]])
+    assert np.allclose(arr.distances(seg)[1:], expect, rtol=1e-12, atol=1e-12)
+
+block = segment_distance_batch(arr.coords[:10], arr.coords, arr.traj[:10], arr.traj)
+print("block的距离矩阵大小:", block.shape)
+assert np.array_equal(block[5], arr.distances(segs[5]))
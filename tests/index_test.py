@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :index_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 10:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.cluster import neighborhood
+from trajCluster.index import SegmentGridIndex
+
+rng = np.random.RandomState(7)
+segs = []
+for i in range(300):
+    x, y = rng.uniform(0, 200, 2)
+    dx, dy = rng.uniform(-10, 10, 2)
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 20))
+
+index = SegmentGridIndex(segs, epsilon=10.0)
+for seg in segs:
+    assert neighborhood(seg, segs, epsilon=10.0) == neighborhood(seg, segs, epsilon=10.0, index=index)
+    assert neighborhood(seg, segs, epsilon=5.0) == index.neighborhood(seg, epsilon=5.0)
+print("平均候选segment数量:", np.mean([len(index.candidates(s)) for s in segs]), "segment总数:", len(segs))
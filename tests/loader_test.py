@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :loader_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 0:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import os
+import tempfile
+
+import numpy as np
+
+from trajCluster.loader import read_trajectories, load_trajectory_store, partition_file
+from trajCluster.partition import partition_trajectory_store
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.store import TrajectoryStore, SegmentStore
+from trajCluster.synthetic import generate_trajectories
+
+trajectories = generate_trajectories(n_traj=15, n_points=40, seed=2, as_array=True)
+rows = np.vstack([np.column_stack((np.full(len(t), 100 + i), np.arange(len(t)), t)) for i, t in enumerate(trajectories)])
+expected = TrajectoryStore.from_trajectories(trajectories, traj_ids=100 + np.arange(len(trajectories)))
+
+# 打乱每条轨迹内部的点顺序, 读取时按照时间列恢复
+shuffled = rows.copy()
+for i in range(len(trajectories)):
+    block = slice(i * 40, (i + 1) * 40)
+    shuffled[block] = shuffled[block][np.random.RandomState(i).permutation(40)]
+
+with tempfile.TemporaryDirectory() as tmp:
+    csv_path = os.path.join(tmp, 'gps.csv')
+    np.savetxt(csv_path, shuffled, delimiter=',', header='traj_id,t,x,y', comments='', fmt=['%d', '%d', '%.17g', '%.17g'])
+    npy_path = os.path.join(tmp, 'gps.npy')
+    np.save(npy_path, shuffled)
+    record = np.zeros(len(rows), dtype=[('vehicle', 'i8'), ('lon', 'f8'), ('lat', 'f8'), ('ts', 'f8')])
+    record['vehicle'], record['ts'], record['lon'], record['lat'] = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+
+    for source, kwargs in [(csv_path, {}), (npy_path, {}), (record, {'columns': ('vehicle', 'ts', 'lon', 'lat')}),
+                           (rows, {'columns': (0, None, 2, 3)})]:
+        for chunk_size in (7, 40, 333, 10000):
+            chunks = list(read_trajectories(source, chunk_size=chunk_size, **kwargs))
+            assert all(len(c) > 0 for c in chunks)
+            store = TrajectoryStore.concatenate(chunks)
+            assert np.array_equal(store.offsets, expected.offsets) and np.array_equal(store.traj_ids, expected.traj_ids)
+            assert np.array_equal(store.coords, expected.coords)
+
+    segs = partition_file(csv_path, chunk_size=100)
+    ref = partition_trajectory_store(expected)
+    assert np.array_equal(segs.coords, ref.coords) and np.array_equal(segs.traj_id, ref.traj_id)
+    # 超出int32范围的轨迹ID(如手机号)不能被截断为其他的ID
+    phone_path = os.path.join(tmp, 'phone.csv')
+    phone_rows = rows[:80].copy()
+    phone_rows[:, 0] = np.where(phone_rows[:, 0] == 100, 13800138000, 13800138001)
+    np.savetxt(phone_path, phone_rows, delimiter=',', header='traj_id,t,x,y', comments='', fmt=['%d', '%d', '%.17g', '%.17g'])
+    for check in (lambda: load_trajectory_store(phone_path), lambda: TrajectoryStore(rows[:2, 2:], [0, 2], [13800138000]),
+                  lambda: SegmentStore(np.zeros((1, 4)), [13800138000]),
+                  lambda: SegmentStore.from_segments([Segment(Point(0, 0), Point(1, 1), traj_id=13800138000)])):
+        try:
+            check()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("out of range traj_id should raise ValueError")
+    print("trajectories:", len(load_trajectory_store(npy_path)), "segments:", len(segs))
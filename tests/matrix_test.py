@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :matrix_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 19:05
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import tempfile
+
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.store import SegmentStore
+from trajCluster.distance import SegmentArray
+from trajCluster.cluster import line_segment_clustering
+from trajCluster.matrix import SegmentDistanceMatrix
+
+rng = np.random.RandomState(11)
+segs = []
+for i in range(400):
+    x, y = rng.uniform(0, 100, 2)
+    dx, dy = rng.uniform(-6, 6, 2)
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 25))
+arrays = SegmentArray(segs)
+
+dense = SegmentDistanceMatrix.compute(segs, block_size=64)
+sparse = SegmentDistanceMatrix.compute(segs, cutoff=8.0, block_size=64)
+for pos in range(0, len(segs), 7):
+    assert np.array_equal(dense.row(pos)[1], arrays.distances_at(pos))
+    assert sparse.neighbor_positions(pos, 5.0) == arrays.neighbor_positions(pos, 5.0)
+
+with tempfile.TemporaryDirectory() as path:
+    SegmentDistanceMatrix.compute(segs, cutoff=8.0, path=path, block_size=100)
+    spilled = SegmentDistanceMatrix.load(path)
+    assert np.array_equal(spilled.indptr, sparse.indptr) and np.array_equal(spilled.data, sparse.data)
+
+    # 同一个距离矩阵对不同的epsilon进行聚类, 结果与向量化计算一致
+    for epsilon, min_lines in ((4.0, 4), (6.0, 5), (8.0, 6)):
+        expected = line_segment_clustering(segs, epsilon, min_lines, vectorized=True)
+        expected_labels = [s.cluster_id for s in segs]
+        for s in segs:
+            s.cluster_id = -1
+        result = line_segment_clustering(segs, epsilon, min_lines, distance_matrix=spilled)
+        assert [s.cluster_id for s in segs] == expected_labels and sorted(result[0]) == sorted(expected[0])
+        for s in segs:
+            s.cluster_id = -1
+    del spilled
+
+store = SegmentStore.from_segments(segs)
+cluster_dict, _ = line_segment_clustering(store, 6.0, 5, distance_matrix=sparse)
+print("稀疏矩阵保存的距离数量:", len(sparse.data), "类簇数量:", len(cluster_dict))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :mdl_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 15:10
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.partition import segment_mdl_comp, _mdl_costs, approximate_trajectory_partitioning
+from trajCluster.point import Point
+
+rng = np.random.RandomState(11)
+coords = np.cumsum(rng.uniform(-3, 5, (120, 2)), axis=0)
+traj = [Point(float(x), float(y)) for x, y in coords]
+sub_len = np.array([traj[i+1].distance(traj[i]) for i in range(len(traj) - 1)])
+
+# 批量计算的MDL与逐个计算的MDL一致
+costs = list(_mdl_costs(coords[:, 0], coords[:, 1], sub_len, 10, 11, 60))
+for k, curr_index in enumerate(range(11, 61)):
+    assert np.isclose(costs[k][0], segment_mdl_comp(traj, 10, curr_index, typed='par'), rtol=1e-12)
+    assert costs[k][1] == segment_mdl_comp(traj, 10, curr_index, typed='nopar')
+
+part = approximate_trajectory_partitioning(traj, theta=3.0)
+assert [s.start.get_point() for s in part] == [s.start.get_point() for s in approximate_trajectory_partitioning(coords, theta=3.0)]
+print("partition后的segment数量:", len(part))
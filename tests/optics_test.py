@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :optics_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 19:55
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.distance import SegmentArray
+from trajCluster.optics import optics_ordering
+from trajCluster.cluster import line_segment_clustering
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.synthetic import generate_trajectories
+
+
+def summary(result):
+    clusters, removed = result
+    return ({k: [(s.start.x, s.start.y, s.traj_id) for s in v] for k, v in clusters.items()},
+            {k: [(s.start.x, s.start.y, s.traj_id) for s in v] for k, v in removed.items()})
+
+
+def corridor_segments():
+    trajectories = generate_trajectories(n_traj=40, n_points=40, corridors=4, noise=2.0, outlier_rate=0.2, extent=800.0, seed=11)
+    return [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+
+
+rng = np.random.RandomState(5)
+segs = []
+for i in range(300):
+    x, y = rng.uniform(0, 80, 2)
+    dx, dy = rng.uniform(-5, 5, 2)
+    segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 30))
+arrays = SegmentArray(segs)
+ordering = optics_ordering(segs, epsilon=8.0, min_lines=4)
+assert sorted(ordering.ordering.tolist()) == list(range(len(segs)))
+
+# 对每个epsilon提取的核心segment的划分与dbscan的核心连通分量一致
+for epsilon in (3.0, 5.0, 8.0):
+    neighbors = [arrays.neighbor_positions(pos, epsilon) for pos in range(len(segs))]
+    core = [len(n) >= 4 for n in neighbors]
+    component = [-1] * len(segs)
+    for pos in range(len(segs)):
+        if core[pos] and component[pos] == -1:
+            component[pos], stack = pos, [pos]
+            while stack:
+                for other in neighbors[stack.pop()]:
+                    if core[other] and component[other] == -1:
+                        component[other] = pos
+                        stack.append(other)
+    labels = ordering.labels(epsilon)
+    pairs = {(component[p], labels[p]) for p in range(len(segs)) if core[p]}
+    assert len(pairs) == len({c for c, _ in pairs}) == len({l for _, l in pairs})
+    assert all(labels[p] != -1 for p in range(len(segs)) if core[p])
+
+indexed = optics_ordering(segs, epsilon=8.0, min_lines=4, use_index=True)
+assert np.array_equal(indexed.core_distance, ordering.core_distance)
+# 任意不大于生成epsilon的epsilon提取的结果(包括边界segment的归属, cluster_id的编号和删除的类簇)与line_segment_clustering一致
+corridor = optics_ordering(corridor_segments(), epsilon=15.0, min_lines=4, use_index=True)
+for epsilon in (5.0, 10.0, 12.5, 15.0):
+    expected_segs = corridor_segments()
+    expected = summary(line_segment_clustering(expected_segs, epsilon=epsilon, min_lines=4, vectorized=True))
+    assert corridor.labels(epsilon) == [s.cluster_id for s in expected_segs]
+    assert summary(corridor.extract(epsilon)) == expected
+for epsilon in (3.0, 5.0, 8.0):
+    expected_segs = [Segment(s.start, s.end, traj_id=s.traj_id) for s in segs]
+    expected = summary(line_segment_clustering(expected_segs, epsilon=epsilon, min_lines=4, vectorized=True))
+    assert ordering.labels(epsilon) == [s.cluster_id for s in expected_segs]
+    assert summary(ordering.extract(epsilon)) == expected
+for row in ordering.sweep([2.0, 4.0, 6.0, 8.0]):
+    print(row)
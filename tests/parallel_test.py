@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :parallel_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 20:45
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.segment import Segment
+from trajCluster.store import SegmentStore
+from trajCluster.cluster import line_segment_clustering
+
+
+def make_segments(size=600, seed=2):
+    rng = np.random.RandomState(seed)
+    segs = []
+    for i in range(size):
+        x, y = rng.uniform(0, 120, 2)
+        dx, dy = rng.uniform(-6, 6, 2)
+        segs.append(Segment(Point(x, y), Point(x + dx, y + dy), traj_id=i % 40))
+    return segs
+
+
+if __name__ == '__main__':
+    serial_segs, parallel_segs = make_segments(), make_segments()
+    line_segment_clustering(serial_segs, 6.0, 4, vectorized=True)
+    line_segment_clustering(parallel_segs, 6.0, 4, n_jobs=2)
+    assert [s.cluster_id for s in serial_segs] == [s.cluster_id for s in parallel_segs]
+
+    store = SegmentStore.from_segments(make_segments())
+    line_segment_clustering(store, 6.0, 4, use_index=True, n_jobs=3)
+    assert store.cluster_id.tolist() == [s.cluster_id for s in serial_segs]
+    print("类簇数量:", len(set(s.cluster_id for s in serial_segs) - {-1}))
@@ -10,7 +10,7 @@
 # --------------------------------------------------------------------------------
 import numpy as np
 
-from trajCluster.partition import _point2line_distance
+from trajCluster.point import _point2line_distance
 
 start = np.array((0, 0))
 end = np.array((3, 4))
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :preview_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 5:50
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.preview import preview_clustering, PreviewReport, adjusted_rand_index, rand_index, sample_positions
+from trajCluster.cluster import ClusteringStats, line_segment_clustering
+from trajCluster.distance import SegmentArray
+from trajCluster.partition import approximate_trajectory_partitioning, partition_trajectory_store
+from trajCluster.store import TrajectoryStore
+from trajCluster.synthetic import generate_trajectories
+
+# 一致程度的指标, 类簇编号不同但划分相同时为1
+assert adjusted_rand_index([0, 0, 1, 1, -1], [5, 5, 2, 2, -1]) == 1.0 and rand_index([0, 0, 1, 1], [1, 1, 0, 0]) == 1.0
+assert abs(rand_index([0, 0, 1, 1], [0, 1, 0, 1]) - 2 / 6.0) < 1e-12
+assert adjusted_rand_index([0, 0, 1, 1], [0, 1, 0, 1]) < 0
+
+trajectories = generate_trajectories(n_traj=60, n_points=40, corridors=3, noise=2.0, seed=4, as_array=True)
+store = partition_trajectory_store(TrajectoryStore.from_trajectories(trajectories))
+coords = np.asarray(store.coords)
+
+for sampling in ('random', 'stratified'):
+    sample = sample_positions(coords, 100, sampling=sampling, cell_size=30.0, rng=np.random.RandomState(0))
+    assert len(sample) == len(np.unique(sample)) == 100 and np.all(np.diff(sample) > 0)
+
+# 邻域查询只包括抽样, 验证样本以及判断密度相连时的共同segment, 少于segment总数
+stats, report = ClusteringStats(), PreviewReport()
+clusters, removed = preview_clustering(store, epsilon=15.0, min_lines=5, sample_rate=0.2, sampling='stratified', seed=1,
+                                       validation_size=50, compare=True, stats=stats, report=report)
+assert report.sample_size == int(np.ceil(0.2 * len(store)))
+assert report.sample_size + 50 <= stats.neighborhood_queries < len(store)
+assert report.n_clusters == len(clusters) + len(removed)
+for k, v in clusters.items():
+    assert (v.cluster_id == k).all()
+assert report.adjusted_rand > 0.75 and report.noise_agreement > 0.8 and report.core_coverage > 0.8
+print(report)
+
+# 所有segment都作为样本时, 核心segment都被分配到类簇中, 与list输入的结果一致
+segs = [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+full_report = PreviewReport()
+list_clusters, _ = preview_clustering(segs, epsilon=15.0, min_lines=5, sample_rate=1.0, seed=2, compare=True, report=full_report)
+assert full_report.core_coverage == 1.0 and full_report.adjusted_rand > 0.95
+store_clusters, _ = preview_clustering(store, epsilon=15.0, min_lines=5, sample_rate=1.0, seed=2)
+assert sorted(list_clusters) == sorted(store_clusters)
+assert [s.cluster_id for s in segs] == store.cluster_id.tolist()
+print(full_report)
+
+# 没有抽样时所有segment都为噪声
+empty_report = PreviewReport()
+for sampling in ('random', 'stratified'):
+    assert len(sample_positions(coords, 0, sampling=sampling, cell_size=30.0)) == 0
+    assert preview_clustering(store, epsilon=15.0, min_lines=5, sample_size=0, sampling=sampling, report=empty_report) == ({}, {})
+    assert (store.cluster_id == -1).all() and empty_report.noise_fraction == 1.0
+
+# 包含离群轨迹的数据: 抽样比例为1时核心segment的划分与完整聚类一致, 不会合并完整聚类中不同的类簇
+noisy = generate_trajectories(n_traj=40, n_points=40, corridors=4, noise=2.0, outlier_rate=0.2, extent=800.0, seed=11)
+noisy_segs = [s for i, t in enumerate(noisy) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+arrays = SegmentArray(noisy_segs, epsilon=15.0)
+core = np.array([len(arrays.neighbor_positions(i, 15.0)) >= 4 for i in range(len(noisy_segs))])
+line_segment_clustering(noisy_segs, epsilon=15.0, min_lines=4, vectorized=True)
+full_labels = np.array([s.cluster_id for s in noisy_segs])
+for sampling in ('random', 'stratified'):
+    preview_clustering(noisy_segs, epsilon=15.0, min_lines=4, sample_rate=1.0, sampling=sampling)
+    preview_labels = np.array([s.cluster_id for s in noisy_segs])
+    assert adjusted_rand_index(preview_labels[core], full_labels[core]) == 1.0
+    assert ((preview_labels == -1) == (full_labels == -1)).all()
+
+# 抽样比例较低时类簇被分割, 更多的segment成为噪声, 验证样本上的估计反映实际的一致程度
+for rate in (0.3, 0.1):
+    noisy_report = PreviewReport()
+    preview_clustering(noisy_segs, epsilon=15.0, min_lines=4, sample_rate=rate, seed=0, report=noisy_report, validation_size=400)
+    preview_labels = np.array([s.cluster_id for s in noisy_segs])
+    for k in set(preview_labels.tolist()) - {-1}:  # 每个预览类簇都只属于一个完整聚类的类簇
+        assert len(set(full_labels[preview_labels == k].tolist())) == 1
+    coverage = float((preview_labels[core] != -1).mean())
+    assert abs(noisy_report.core_coverage - coverage) < 0.1
+    print("sample rate:", rate, "core coverage:", round(coverage, 4), noisy_report)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :profiling_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 23:45
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import contextlib
+import io
+import logging
+
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.cluster import line_segment_clustering, representative_trajectory_generation, ClusteringStats
+from trajCluster.profiling import profiling_session, get_profiler
+from trajCluster.synthetic import generate_trajectories
+
+trajectories = generate_trajectories(n_traj=12, n_points=30, corridors=2, noise=1.0, seed=1)
+
+
+def run():
+    segs = [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+    stats = ClusteringStats()
+    clusters, _ = line_segment_clustering(segs, epsilon=15.0, min_lines=3, stats=stats)
+    return segs, stats, clusters, representative_trajectory_generation(clusters, min_lines=3, min_dist=5.0)
+
+
+# 关闭时不输出任何内容, 也不记录统计
+stdout = io.StringIO()
+with contextlib.redirect_stdout(stdout):
+    segs, stats, clusters, _ = run()
+assert stdout.getvalue() == "" and get_profiler() is None
+
+records = []
+logging.basicConfig(level=logging.INFO, format="%(name)s %(message)s")
+with profiling_session(callback=records.append, log_level=logging.INFO) as profiler:
+    _segs, _stats, _clusters, rep = run()
+assert get_profiler() is None
+
+report = profiler.report()
+print(report)
+assert report['timings']['partition.approximate']['calls'] == len(trajectories)
+assert report['timings']['clustering']['calls'] == 1 and report['timings']['representative']['calls'] == 1
+assert [r['stage'] for r in records][-2:] == ['clustering', 'representative']
+counters = report['counters']
+assert counters['partition.mdl_evaluations'] > 0 and counters['partition.distance_evaluations'] > 0
+assert counters['clustering.segments'] == len(segs)
+assert counters['clustering.distance_evaluations'] == stats.distance_evaluations == len(segs) ** 2
+assert counters['clustering.neighborhood_size'] == stats.neighborhood_size
+assert report['maxima']['clustering.max_queue_length'] == stats.max_queue_length > 0
+assert counters['representative.points'] == sum(len(v) for v in rep.values())
+assert [s.cluster_id for s in segs] == [s.cluster_id for s in _segs]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :projection_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 2:00
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import math
+
+import numpy as np
+
+from trajCluster.projection import LocalProjection, get_projection, geographic_clustering
+from trajCluster.partition import partition_trajectory_store
+from trajCluster.cluster import line_segment_clustering
+from trajCluster.store import TrajectoryStore
+from trajCluster.synthetic import generate_trajectories
+
+
+def haversine(lon1, lat1, lon2, lat2, radius=6371008.8):
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * radius * math.asin(math.sqrt(h))
+
+
+# 北京天安门, UTM 50N
+utm = get_projection(116.3974, 39.9093, method='utm')
+x, y = utm.forward(116.3974, 39.9093)
+assert abs(x - 448494.08) < 1 and abs(y - 4417864.26) < 1
+assert np.allclose(utm.inverse(x, y), (116.3974, 39.9093), atol=1e-9)
+assert get_projection(117.5, 40.5, method='utm') is utm  # 同一个投影带使用缓存
+
+local = get_projection(116.4, 39.9)
+for (lon1, lat1), (lon2, lat2) in [((116.40, 39.90), (116.41, 39.91)), ((116.35, 39.88), (116.45, 39.93))]:
+    (x1, x2), (y1, y2) = local.forward([lon1, lon2], [lat1, lat2])
+    assert abs(math.hypot(x2 - x1, y2 - y1) / haversine(lon1, lat1, lon2, lat2) - 1) < 1e-3
+
+# 以米为单位生成的轨迹反投影为经纬度, 按经纬度聚类与直接按米聚类的结果一致
+trajectories = generate_trajectories(n_traj=20, n_points=30, corridors=3, extent=5000.0, step=50.0, noise=5.0, seed=7,
+                                     as_array=True)
+store = TrajectoryStore.from_trajectories(trajectories)
+geo_store = TrajectoryStore(local.inverse_coords(store.coords), store.offsets, store.traj_ids)
+result = geographic_clustering(geo_store, epsilon=60.0, min_lines=3, min_dist=20.0, projection=local)
+segments = partition_trajectory_store(store)
+line_segment_clustering(segments, epsilon=60.0, min_lines=3)
+assert np.array_equal(result.segments.cluster_id, segments.cluster_id)
+assert np.allclose(local.forward_coords(result.segments.coords), segments.coords, atol=1e-6)
+assert LocalProjection.from_dict(result.params['projection']) == local
+for k, coords in result.representatives().items():
+    assert 116.3 < coords[:, 0].min() and coords[:, 0].max() < 116.5 and 39.8 < coords[:, 1].min() and coords[:, 1].max() < 40.0
+print("clusters:", len(result.clusters()[0]), "representatives:", len(result.rep_cluster_ids))
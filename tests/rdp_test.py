@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :rdp_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 5:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import sys
+
+import numpy as np
+
+from trajCluster.partition import _rdp_partition_indices, rdp_trajectory_partitioning
+from trajCluster.point import Point, _point2line_distance
+
+
+def recursive_rdp(trajectory, epsilon=1.0, offset=0):
+    """原来的递归实现, 返回segment的起止点索引"""
+    size = len(trajectory)
+    d_max = 0.0
+    index = 0
+    for i in range(1, size-1, 1):
+        d = _point2line_distance(trajectory[i].as_array(), trajectory[0].as_array(), trajectory[-1].as_array())
+        if d > d_max:
+            d_max = d
+            index = i
+
+    if d_max > epsilon:
+        return recursive_rdp(trajectory[:index+1], epsilon, offset) + recursive_rdp(trajectory[index:], epsilon, offset + index)
+    return [(offset, offset + size - 1)]
+
+
+rng = np.random.RandomState(6)
+for _ in range(200):
+    size = rng.randint(2, 120)
+    coords = np.cumsum(rng.normal(0, rng.choice([0.5, 2.0, 10.0]), (size, 2)), axis=0)
+    if rng.rand() < 0.2:
+        coords = np.round(coords)  # 距离相同的点, 检查选择第一个最远点
+    epsilon = rng.choice([0.1, 1.0, 5.0])
+    traj = [Point(x, y) for x, y in coords]
+    expected = recursive_rdp(traj, epsilon)
+    assert _rdp_partition_indices(traj, epsilon) == expected
+    assert _rdp_partition_indices(coords, epsilon) == expected
+    segs = rdp_trajectory_partitioning(traj, traj_id=3, epsilon=epsilon)
+    assert [(s.start, s.end) for s in segs] == [(traj[i], traj[j]) for i, j in expected] and {s.traj_id for s in segs} == {3}
+
+# 每次最远的点都是区间的倒数第二个点, 递归深度与轨迹长度相同
+size = sys.getrecursionlimit() + 200
+k = np.arange(size)
+coords = np.column_stack((1.12 ** k, (-1.0) ** k * 1.12 ** k))
+traj = [Point(x, y) for x, y in coords]
+try:
+    recursive_rdp(traj, epsilon=1.0)
+except RecursionError:
+    pass
+else:
+    raise AssertionError("recursive rdp should exceed the recursion limit")
+limit = sys.getrecursionlimit()
+sys.setrecursionlimit(2 * size + 100)
+try:
+    expected = recursive_rdp(traj, epsilon=1.0)
+finally:
+    sys.setrecursionlimit(limit)
+assert len(expected) > limit and _rdp_partition_indices(coords, epsilon=1.0) == expected
+segs = rdp_trajectory_partitioning(traj, epsilon=1.0)
+assert [(s.start, s.end) for s in segs] == [(traj[i], traj[j]) for i, j in expected]
+print("segment数量:", len(segs))
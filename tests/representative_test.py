@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :representative_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 16:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.cluster import _sweep_average, line_segment_clustering, representative_trajectory_generation
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.store import SegmentStore
+from trajCluster.synthetic import generate_trajectories
+
+rng = np.random.RandomState(2)
+rsx = rng.uniform(0, 100, 400)
+rsy = rng.uniform(0, 10, 400)
+rex, rey = rsx + rng.uniform(-5, 30, 400), rsy + rng.uniform(-3, 3, 400)
+rex[:10] = rsx[:10]  # 垂直的segment
+rey[10:20] = rsy[10:20]  # 水平的segment
+
+# 暴力计算每个端点处的平均Y值
+expect = []
+slope = np.divide(rey - rsy, rex - rsx, out=np.zeros_like(rsx), where=rsx != rex)
+for px in np.sort(np.concatenate((rsx, rex)), kind='stable'):
+    mask = (px >= rsx) & (px <= rex) & (rsx != rex)
+    if mask.sum() >= 3:
+        expect.append((px, np.mean((slope * (px - rsx) + rsy)[mask])))
+
+result = _sweep_average(rsx, rsy, rex, rey, min_lines=3)
+assert len(result) == len(expect)
+assert np.allclose(np.array(result), np.array(expect), rtol=1e-12, atol=1e-9)
+print("代表性轨迹点数量:", len(result))
+
+
+if __name__ == '__main__':
+    # 并行生成代表性轨迹, 结果和key的顺序与串行计算一致, 并且不修改类簇中的segment
+    trajectories = generate_trajectories(n_traj=80, n_points=40, corridors=4, noise=2.0, seed=3)
+    segs = [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+    clusters, _ = line_segment_clustering(segs, epsilon=15.0, min_lines=4, use_index=True)
+    before = {k: [(s.start.x, s.start.y, s.end.x, s.end.y) for s in v] for k, v in clusters.items()}
+    serial = representative_trajectory_generation(clusters, min_lines=3, min_dist=5.0)
+    assert {k: [(s.start.x, s.start.y, s.end.x, s.end.y) for s in v] for k, v in clusters.items()} == before
+    for executor in ('process', 'thread'):
+        parallel = representative_trajectory_generation(clusters, min_lines=3, min_dist=5.0, n_jobs=3, executor=executor)
+        assert list(parallel) == list(serial)
+        assert all([(p.x, p.y) for p in parallel[k]] == [(p.x, p.y) for p in v] for k, v in serial.items())
+
+    stores = {k: SegmentStore.from_segments(v) for k, v in clusters.items()}
+    store_parallel = representative_trajectory_generation(stores, min_lines=3, min_dist=5.0, n_jobs=2)
+    assert list(store_parallel) == list(serial)
+    assert all(np.array_equal(store_parallel[k], [(p.x, p.y) for p in v]) for k, v in serial.items())
+    print("类簇数量:", len(clusters), "代表性轨迹数量:", len(serial))
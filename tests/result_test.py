@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :result_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 1:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import tempfile
+
+import numpy as np
+
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.cluster import line_segment_clustering, representative_trajectory_generation
+from trajCluster.store import SegmentStore
+from trajCluster.result import ClusteringResult
+from trajCluster.synthetic import generate_trajectories
+
+trajectories = generate_trajectories(n_traj=20, n_points=30, corridors=3, seed=5)
+segs = [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+
+with tempfile.TemporaryDirectory() as tmp:
+    # 保存partition的结果, 加载后继续聚类, 与直接对Segment列表聚类的结果一致
+    SegmentStore.from_segments(segs).save(tmp + '/partition')
+    store = SegmentStore.load(tmp + '/partition')
+    assert not store.coords.flags.owndata and not store.cluster_id.flags.owndata  # memmap, 没有复制数据
+    clusters, removed = line_segment_clustering(segs, epsilon=15.0, min_lines=3)
+    store_clusters, store_removed = line_segment_clustering(store, epsilon=15.0, min_lines=3)
+    assert np.array_equal(store.cluster_id, [s.cluster_id for s in segs])
+    assert (np.load(tmp + '/partition/cluster_id.npy') == -1).all()  # copy-on-write, 不修改磁盘中的数据
+
+    cluster_coords = {k: SegmentStore.from_segments(v).coords for k, v in clusters.items()}
+    rep = representative_trajectory_generation(clusters, min_lines=3, min_dist=5.0)
+    result = ClusteringResult.from_clustering(segs, rep, epsilon=15.0, min_lines=3)
+    result.save(tmp + '/result')
+    loaded = ClusteringResult.load(tmp + '/result', mmap_mode='r')
+    assert loaded.params == {'epsilon': 15.0, 'min_lines': 3} and len(loaded) == len(segs)
+    loaded_clusters, loaded_removed = loaded.clusters()
+    assert sorted(loaded_clusters) == sorted(clusters) and sorted(loaded_removed) == sorted(removed)
+    for k, coords in cluster_coords.items():
+        assert np.array_equal(loaded_clusters[k].coords, coords)
+    assert sorted(loaded.representatives()) == sorted(rep)
+    for k, points in rep.items():
+        assert np.array_equal(loaded.representative(k), [(p.x, p.y) for p in points])
+    print("clusters:", len(loaded_clusters), "representative points:", len(loaded.rep_coords))
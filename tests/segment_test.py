@@ -24,3 +24,21 @@ print("两个segment的长度距离为:", y)
 
 z = se1.angle_distance(se2)
 print("两个segment的角度距离为:", z)
+
+# 缓存的几何量(长度, 方向, bounding box), 重新设置起止点后缓存失效
+import math
+from trajCluster.segment import compare
+
+seg = Segment(Point(0.0, 0.0), Point(3.0, 4.0), traj_id=1)
+assert seg.length == 5.0 and seg.geometry.box == (0.0, 0.0, 3.0, 4.0)
+assert (seg.geometry.ux, seg.geometry.uy) == (0.6, 0.8) and not seg.geometry.degenerate
+seg.end = Point(6.0, 8.0)
+assert seg.length == 10.0 and seg.geometry.box == (0.0, 0.0, 6.0, 8.0)
+seg.start = Point(6.0, 8.0)
+assert seg.length == 0.0 and seg.geometry.degenerate
+
+long_seg, short_seg = compare(Segment(Point(0.0, 0.0), Point(10.0, 0.0), traj_id=1),
+                              Segment(Point(2.0, 1.0), Point(5.0, 2.0), traj_id=2))
+assert long_seg.perpendicular_distance(short_seg) == (1 + 4) / 3
+assert long_seg.parallel_distance(short_seg) == 2.0
+assert math.isclose(long_seg.angle_distance(short_seg), math.sqrt(10) * math.sin(math.atan2(1, 3)))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :shard_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 2:50
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.cluster import line_segment_clustering, ClusteringStats
+import numpy as np
+
+from trajCluster.shard import sharded_clustering, assign_tiles, _HaloIndex, _segment_boxes, _tile_neighbors
+from trajCluster.store import SegmentStore
+from trajCluster.synthetic import generate_trajectories
+
+
+def segments():
+    trajectories = generate_trajectories(n_traj=40, n_points=40, corridors=4, noise=2.0, outlier_rate=0.2, extent=800.0, seed=11)
+    return [s for i, t in enumerate(trajectories) for s in approximate_trajectory_partitioning(t, traj_id=i, theta=5.0)]
+
+
+def check_halos(store, radius, tile_size):
+    """共用一次空间排序的halo与逐个segment检查的结果一致"""
+    coords, traj = store.coords, store.traj_id
+    boxes = _segment_boxes(coords)
+    halo_index = _HaloIndex(coords, traj, tile_size)
+    for owned in assign_tiles(coords, tile_size).values():
+        x0, y0 = boxes[owned, 0].min(), boxes[owned, 1].min()
+        x1, y1 = boxes[owned, 2].max(), boxes[owned, 3].max()
+        dx = np.maximum(np.maximum(x0 - boxes[:, 2], boxes[:, 0] - x1), 0.0)
+        dy = np.maximum(np.maximum(y0 - boxes[:, 3], boxes[:, 1] - y1), 0.0)
+        mask = (np.hypot(dx, dy) <= radius) | np.isin(traj, traj[owned])
+        mask[owned] = True
+        halo = halo_index.halo(owned, radius)
+        assert np.array_equal(halo[~np.isin(halo, halo_index.tiny)], np.flatnonzero(mask & ~np.isin(np.arange(len(traj)), halo_index.tiny)))
+        local = np.searchsorted(halo, owned)
+        indptr, indices, core, _ = _tile_neighbors((coords[halo], traj[halo], local, 15.0, 4))
+        assert indices.dtype == np.int32 and len(indptr) == len(owned) + 1 and core.dtype == bool
+
+
+def summary(result):
+    clusters, removed = result
+    return ({k: [(s.start.x, s.start.y, s.traj_id) for s in v] for k, v in clusters.items()},
+            {k: [(s.start.x, s.start.y, s.traj_id) for s in v] for k, v in removed.items()})
+
+
+if __name__ == '__main__':
+    expected_segs = segments()
+    expected = summary(line_segment_clustering(expected_segs, epsilon=15.0, min_lines=4, vectorized=True))
+    labels = [s.cluster_id for s in expected_segs]
+    for tile_size, n_jobs in [(None, 1), (30.0, 1), (100.0, 2), (1e6, 1)]:
+        segs = segments()
+        stats = ClusteringStats()
+        assert summary(sharded_clustering(segs, epsilon=15.0, min_lines=4, tile_size=tile_size, n_jobs=n_jobs, stats=stats)) == expected
+        assert [s.cluster_id for s in segs] == labels
+        print("tile_size:", tile_size, stats)
+    store = SegmentStore.from_segments(segments())
+    for tile_size in (30.0, 100.0):
+        check_halos(store, 2 * 15.0 * (1 + 1e-9) + 1e-9, tile_size)
+    clusters, removed = sharded_clustering(store, epsilon=15.0, min_lines=4, tile_size=50.0)
+    assert store.cluster_id.tolist() == labels and sorted(clusters) == sorted(expected[0])
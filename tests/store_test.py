@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :store_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 14:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.partition import approximate_trajectory_partitioning, partition_trajectory_store
+from trajCluster.cluster import line_segment_clustering, representative_trajectory_generation
+from trajCluster.store import TrajectoryStore, SegmentStore
+
+rng = np.random.RandomState(5)
+base = np.cumsum(rng.uniform(2, 6, (40, 2)), axis=0)
+trajs = [base + rng.uniform(-3, 3, base.shape) for _ in range(5)]
+
+store = TrajectoryStore.from_trajectories(trajs, traj_ids=range(1, 6))
+seg_store = partition_trajectory_store(store, theta=3.0)
+segs = []
+for k, traj in enumerate(trajs):
+    segs += approximate_trajectory_partitioning([Point(x, y) for x, y in traj], traj_id=k+1, theta=3.0)
+assert np.array_equal(seg_store.coords, SegmentStore.from_segments(segs).coords)
+
+norm_cluster, remove_cluster = line_segment_clustering(segs, epsilon=10.0, min_lines=3)
+store_cluster, store_remove = line_segment_clustering(seg_store, epsilon=10.0, min_lines=3)
+assert seg_store.cluster_id.tolist() == [s.cluster_id for s in segs]
+assert sorted(norm_cluster.keys()) == sorted(store_cluster.keys())
+
+main_traj = representative_trajectory_generation(norm_cluster, min_lines=2, min_dist=1.0)
+store_traj = representative_trajectory_generation(store_cluster, min_lines=2, min_dist=1.0)
+for k, v in main_traj.items():
+    assert np.array_equal(np.array([p.get_point() for p in v]), store_traj[k])
+print("segment数量:", len(seg_store), "类簇数量:", len(store_cluster), "第一个segment:", seg_store[0].start, seg_store[0].end)
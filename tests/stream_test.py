@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :stream_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 17:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.point import Point
+from trajCluster.partition import approximate_trajectory_partitioning
+from trajCluster.stream import StreamingPartitioner, IncrementalClustering, StreamingTRACLUS
+
+rng = np.random.RandomState(3)
+trajs = []
+for t in range(12):
+    steps = rng.uniform(-1, 1, (60, 2)) + np.array([3.0, 0.5 * (t % 3)])
+    trajs.append([Point(x, y) for x, y in np.cumsum(steps, axis=0) + np.array([0.0, 20.0 * (t % 3)])])
+
+# 在线partition的结果与approximate_trajectory_partitioning一致, 轨迹点交替到达
+partitioner = StreamingPartitioner(theta=0.5)
+stream_segs = {t: [] for t in range(len(trajs))}
+for i in range(60):
+    for t, traj in enumerate(trajs):
+        stream_segs[t].extend(partitioner.add_point(t, traj[i]))
+for seg in partitioner.flush():
+    stream_segs[seg.traj_id].append(seg)
+for t, traj in enumerate(trajs):
+    expected = approximate_trajectory_partitioning(traj, traj_id=t, theta=0.5)
+    assert [(str(s.start), str(s.end)) for s in stream_segs[t]] == [(str(s.start), str(s.end)) for s in expected]
+
+# 长轨迹: 特征点之间的点数超过初始容量, 数组扩容和删除已输出的点之后结果不变
+for theta in (0.5, 5.0, 50.0):
+    long_traj = [Point(x, y) for x, y in np.cumsum(rng.uniform(-1, 1, (500, 2)) + np.array([2.0, 0.0]), axis=0)]
+    partitioner = StreamingPartitioner(theta=theta)
+    segs = [seg for p in long_traj for seg in partitioner.add_point(0, p)] + partitioner.flush()
+    expected = approximate_trajectory_partitioning(long_traj, traj_id=0, theta=theta)
+    assert [(s.start, s.end) for s in segs] == [(s.start, s.end) for s in expected]
+
+# 增量聚类: 结果与插入顺序无关, 与对全部segment重新计算的结果一致
+all_segs = [s for t in range(len(trajs)) for s in stream_segs[t]]
+clustering = IncrementalClustering(epsilon=3.0, min_lines=4)
+for seg in all_segs:
+    clustering.insert(seg)
+shuffled = IncrementalClustering(epsilon=3.0, min_lines=4)
+order = rng.permutation(len(all_segs))
+for i in order:
+    shuffled.insert(all_segs[i])
+labels, shuffled_labels = clustering.labels(), shuffled.labels()
+core = [p for p in range(len(all_segs)) if clustering._core[p]]
+pairs = {}
+for i, p in enumerate(order):
+    if clustering._core[p]:
+        pairs.setdefault(labels[p], set()).add(shuffled_labels[i])
+assert all(len(v) == 1 for v in pairs.values())
+cluster_dict, remove_cluster = clustering.clusters()
+print("segment数量:", len(all_segs), "core segment数量:", len(core), "类簇数量:", len(cluster_dict), "删除的类簇:", len(remove_cluster))
+
+traclus = StreamingTRACLUS(theta=0.5, epsilon=3.0, min_lines=4)
+for i in range(60):
+    for t, traj in enumerate(trajs):
+        traclus.add_point(t, (traj[i].x, traj[i].y))
+traclus.flush()
+assert traclus.clustering.labels() is not None and len(traclus.clustering) == len(all_segs)
+print("在线聚类的类簇:", {k: len(v) for k, v in traclus.clusters()[0].items()})
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :synthetic_test.py
+# target    :
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 23:10
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from trajCluster.synthetic import generate_trajectories
+
+trajs = generate_trajectories(n_traj=30, n_points=20, corridors=3, noise=1.0, outlier_rate=0.2, seed=3)
+again = generate_trajectories(n_traj=30, n_points=20, corridors=3, noise=1.0, outlier_rate=0.2, seed=3, as_array=True)
+assert len(trajs) == 30 and all(len(t) == 20 for t in trajs)
+assert all(np.array_equal([(p.x, p.y) for p in t], a) for t, a in zip(trajs, again))
+assert not np.array_equal(again[0], generate_trajectories(n_traj=30, n_points=20, corridors=3, seed=4, as_array=True)[0])
+print("第一条轨迹的起点:", trajs[0][0])
@@ -8,11 +8,37 @@
 # date      :2019/4/1 14:11
 # log       :包含修改时间、修改人、修改line及原因
 # --------------------------------------------------------------------------------
-from .cluster import representative_trajectory_generation, line_segment_clustering
+from .cluster import representative_trajectory_generation, line_segment_clustering, ClusteringStats
 from .point import Point
-from .partition import approximate_trajectory_partitioning, rdp_trajectory_partitioning
+from .partition import approximate_trajectory_partitioning, rdp_trajectory_partitioning, partition_trajectory_store, \
+    batch_trajectory_partitioning, clean_trajectory
 from .segment import Segment
+from .index import SegmentGridIndex
+from .distance import SegmentArray, segment_distance_batch
+from .store import TrajectoryStore, TrajectoryView, SegmentStore, SegmentView
+from .matrix import SegmentDistanceMatrix
+from .optics import optics_ordering, SegmentOrdering
+from .backend import DistanceBackend, register_backend, available_backends, get_backend
+from .synthetic import generate_trajectories
+from .profiling import Profiler, enable_profiling, disable_profiling, profiling_session
+from .loader import read_trajectories, load_trajectory_store, partition_file
+from .result import ClusteringResult
+from .projection import LocalProjection, get_projection, geographic_clustering
+from .shard import sharded_clustering
+from .assign import ClusterAssigner
+from .cache import PartitionCache
+from .preview import preview_clustering, PreviewReport
+from .stream import StreamingPartitioner, IncrementalClustering, StreamingTRACLUS
 
 
 __all__ = ['Point', 'Segment', 'representative_trajectory_generation', 'line_segment_clustering', 'approximate_trajectory_partitioning',
-           'rdp_trajectory_partitioning']
+           'rdp_trajectory_partitioning', 'SegmentGridIndex', 'SegmentArray', 'segment_distance_batch',
+           'TrajectoryStore', 'TrajectoryView', 'SegmentStore', 'SegmentView', 'partition_trajectory_store',
+           'batch_trajectory_partitioning', 'StreamingPartitioner', 'IncrementalClustering', 'StreamingTRACLUS',
+           'SegmentDistanceMatrix', 'optics_ordering', 'SegmentOrdering',
+           'ClusteringStats', 'DistanceBackend', 'register_backend', 'available_backends', 'get_backend',
+           'generate_trajectories', 'Profiler', 'enable_profiling', 'disable_profiling',
+           'profiling_session', 'read_trajectories', 'load_trajectory_store', 'partition_file',
+           'ClusteringResult', 'LocalProjection', 'get_projection', 'geographic_clustering',
+           'sharded_clustering', 'clean_trajectory', 'ClusterAssigner',
+           'PartitionCache', 'preview_clustering', 'PreviewReport']
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :assign.py
+# target    :新轨迹到已有类簇的实时分配, 对新轨迹进行partition后, 通过网格空间索引查询每个segment在epsilon范围内的类簇segment, 按照邻域中各类簇的
+#            segment数量投票确定cluster_id, 邻域中没有类簇segment时与代表性轨迹的折线进行匹配, 距离与聚类时的TRACLUS segment距离一致
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 3:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from .distance import SegmentArray, segment_distance_batch, segment_length, segments_to_array
+from .index import SegmentGridIndex, tiny_length
+from .store import SegmentStore, _as_coords
+from .partition import approximate_trajectory_partitioning
+from . import profiling as _profiling
+
+
+class ClusterAssigner(object):
+    """将新轨迹的segment分配到已有的类簇中
+    parameter
+    ---------
+        clusters: Dict[int, List[Segment, ...] or SegmentStore], line_segment_clustering返回的cluster_dict
+        representatives: Dict[int, List[Point, ...] or np.ndarray], representative_trajectory_generation返回的代表性轨迹
+        epsilon: float, 与聚类时一致的segment距离阈值
+        theta: float, 新轨迹partition时approximate_trajectory_partitioning的参数
+        min_votes: int, 邻域中类簇segment的最少数量, 少于该值时使用代表性轨迹进行匹配
+    method
+    ------
+        assign_segments(segs): 返回每个segment的cluster_id数组, 不属于任何类簇时为-1
+        assign(traj): 对轨迹进行partition并分配, 返回(segment列表, cluster_id数组)
+        assign_trajectory(traj): 返回轨迹中segment数量最多的cluster_id
+    """
+    def __init__(self, clusters: dict, representatives: dict = None, epsilon: float = 2.0, theta: float = 5.0, min_votes: int = 1):
+        self.epsilon = epsilon
+        self.theta = theta
+        self.min_votes = min_votes
+        self.cluster_ids = np.array(sorted(clusters.keys()), dtype=np.int64)
+
+        parts, traj, labels = [], [], []
+        for k, cluster_id in enumerate(self.cluster_ids.tolist()):
+            segs = clusters[cluster_id]
+            store = segs if isinstance(segs, SegmentStore) else SegmentStore.from_segments(list(segs))
+            parts.append(store.coords)
+            traj.append(store.traj_id)
+            labels.append(np.full(len(store), k, dtype=np.int64))
+        coords = np.concatenate(parts) if parts else np.empty((0, 4), dtype=np.float64)
+        traj = np.concatenate(traj).astype(np.int64) if parts else np.empty(0, dtype=np.int64)
+        self._labels = np.concatenate(labels) if parts else np.empty(0, dtype=np.int64)
+        self._query_traj = int(traj.max()) + 1 if len(traj) else 0  # 新轨迹的轨迹编号与所有类簇segment都不相同
+        self.index = SegmentGridIndex.from_arrays(SegmentArray.from_arrays(coords, traj, epsilon), epsilon=epsilon)
+
+        rep_parts, rep_labels = [], []
+        for k, cluster_id in enumerate(self.cluster_ids.tolist()):
+            if representatives is None or cluster_id not in representatives:
+                continue
+            points = _as_coords(representatives[cluster_id])
+            rep_parts.append(np.hstack((points[:-1], points[1:])))
+            rep_labels.append(np.full(len(points) - 1, k, dtype=np.int64))
+        self._rep_coords = np.concatenate(rep_parts) if rep_parts else np.empty((0, 4), dtype=np.float64)
+        self._rep_labels = np.concatenate(rep_labels) if rep_parts else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_result(cls, result, **kwargs) -> 'ClusterAssigner':
+        """通过ClusteringResult生成, epsilon默认使用result中保存的聚类参数"""
+        kwargs.setdefault('epsilon', result.params.get('epsilon', 2.0))
+        return cls(result.clusters()[0], result.representatives(), **kwargs)
+
+    def __len__(self):
+        return len(self._labels)
+
+    def _assign_one(self, query: np.ndarray) -> int:
+        box = (min(query[0], query[2]), min(query[1], query[3]), max(query[0], query[2]), max(query[1], query[3]))
+        tiny = bool(segment_length(query) < tiny_length)
+        positions = np.asarray(self.index._candidates(box, self._query_traj, tiny), dtype=np.int64)
+        if len(positions):
+            distances = segment_distance_batch(query, self.index._arrays.coords[positions], self._query_traj,
+                                               self.index._arrays.traj[positions])
+            votes = np.bincount(self._labels[positions[distances <= self.epsilon]], minlength=len(self.cluster_ids))
+            if votes.max() >= self.min_votes:
+                return int(self.cluster_ids[np.argmax(votes)])
+        if len(self._rep_coords):
+            distances = segment_distance_batch(query, self._rep_coords, self._query_traj, np.full(len(self._rep_coords), -1))
+            nearest = int(np.argmin(distances))
+            if distances[nearest] <= self.epsilon:
+                return int(self.cluster_ids[self._rep_labels[nearest]])
+        return -1
+
+    def assign_segments(self, segs) -> np.ndarray:
+        """
+        parameter
+        ---------
+            segs: List[Segment, ...] or SegmentStore or np.ndarray, 新轨迹的segment, 数组时为(N, 4)的坐标数组
+        return
+        ------
+            np.ndarray, 每个segment的cluster_id, 邻域中票数相同时取较小的cluster_id, 不属于任何类簇时为-1
+        """
+        if isinstance(segs, SegmentStore):
+            coords = segs.coords
+        elif isinstance(segs, np.ndarray):
+            coords = np.asarray(segs, dtype=np.float64).reshape(-1, 4)
+        else:
+            coords = segments_to_array(list(segs))
+        labels = np.array([self._assign_one(query) for query in coords], dtype=np.int64)
+        _profiling.count('assign.segments', len(labels))
+        return labels
+
+    @_profiling.profiled('assign')
+    def assign(self, traj, traj_id=None):
+        """对一条轨迹进行partition后分配每个segment, 返回(segment列表, cluster_id数组), 同时更新segment的cluster_id"""
+        segs = approximate_trajectory_partitioning(traj, traj_id=traj_id, theta=self.theta)
+        labels = self.assign_segments(segs)
+        for seg, label in zip(segs, labels.tolist()):
+            seg.cluster_id = label
+        return segs, labels
+
+    def assign_trajectory(self, traj) -> int:
+        """返回轨迹中segment数量最多的cluster_id, 所有segment都不属于任何类簇时为-1"""
+        _, labels = self.assign(traj)
+        labels = labels[labels != -1]
+        if not len(labels):
+            return -1
+        values, counts = np.unique(labels, return_counts=True)
+        return int(values[np.argmax(counts)])
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :backend.py
+# target    :segment距离计算的可替换后端, 包括纯python的参考实现(Segment中的方法), numpy向量化实现以及可选的numba编译实现, 每个后端都支持
+#            perpendicular, parallel, angle三个距离分量的权重. 后端是可选的: 只有显式传入backend参数(或者get_backend(None)在调用时选择可用
+#            后端中最快的一个)时才会使用, 不在导入时选择后端, 默认的聚类和partition流程使用Segment和distance中的精确实现.
+#            numba只在第一次使用numba后端时导入
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 21:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import functools
+import importlib.util
+import math
+
+import numpy as np
+
+from .point import Point
+from .segment import Segment, compare
+from .distance import segment_components, segment_distance_batch, segment_length, degenerate_mask, segments_to_array, eps
+
+_registry = dict()  # 后端名称 -> 后端类
+
+
+def register_backend(cls):
+    """注册距离计算后端, 后端类需要定义name和priority, priority越大表示速度越快"""
+    _registry[cls.name] = cls
+    return cls
+
+
+class DistanceBackend(object):
+    """距离计算后端的接口, 子类需要实现segment_distances和components两个数组接口
+    parameter
+    ---------
+        perpendicular, parallel, angle: float, 三个距离分量的权重, 均为1时与Segment.get_all_distance一致
+    method
+    ------
+        segment_distances(query, coords, query_traj, traj): 与segment_distance_batch一致的一对多的距离计算
+        components(long_coords, short_coords): 逐元素计算long segment与short segment的(angle, parallel, perpendicular)
+        distances(seg, segs): 计算seg与segs中每个segment的距离
+        distance(seg_a, seg_b): 计算两个segment之间的距离
+        mdl_components(seg, sub_segs): 计算seg与每个子segment加权后的(perpendicular, angle)距离, 用于MDL的计算
+    """
+    name = None
+    priority = 0
+
+    def __init__(self, perpendicular: float = 1.0, parallel: float = 1.0, angle: float = 1.0):
+        self.weights = (float(perpendicular), float(parallel), float(angle))
+
+    def __repr__(self):
+        return "%s(perpendicular=%r, parallel=%r, angle=%r)" % ((type(self).__name__, ) + self.weights)
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def segment_distances(self, query, coords, query_traj, traj):
+        raise NotImplementedError
+
+    def components(self, long_coords, short_coords):
+        raise NotImplementedError
+
+    @staticmethod
+    def _traj_codes(segs):
+        codes = dict()
+        return np.array([codes.setdefault(s.traj_id, len(codes)) for s in segs], dtype=np.int64), codes
+
+    def distances(self, seg: Segment, segs):
+        traj, codes = self._traj_codes(segs)
+        query_traj = codes.get(seg.traj_id, -1)
+        return self.segment_distances(segments_to_array([seg])[0], segments_to_array(segs), query_traj, traj)
+
+    def distance(self, seg_a: Segment, seg_b: Segment) -> float:
+        return float(self.distances(seg_a, [seg_b])[0])
+
+    def mdl_components(self, seg: Segment, sub_segs):
+        coords = segments_to_array(sub_segs)
+        long_coords = np.broadcast_to(segments_to_array([seg]), coords.shape)
+        angle, _, perpendicular = self.components(long_coords, coords)
+        return self.weights[0] * perpendicular, self.weights[2] * angle
+
+
+@register_backend
+class PythonBackend(DistanceBackend):
+    """纯python的参考实现, 直接调用Segment中的距离方法"""
+    name = 'python'
+    priority = 0
+
+    def _pair(self, seg_long: Segment, seg_short: Segment) -> float:
+        w_perpendicular, w_parallel, w_angle = self.weights
+        res = w_angle * seg_long.angle_distance(seg_short)
+        if not seg_long.geometry.degenerate:
+            res += w_parallel * seg_long.parallel_distance(seg_short)
+        if seg_long.traj_id != seg_short.traj_id:
+            res += w_perpendicular * seg_long.perpendicular_distance(seg_short)
+        return res
+
+    @staticmethod
+    def _segments(coords, traj):
+        return [Segment(Point(float(c[0]), float(c[1])), Point(float(c[2]), float(c[3])), traj_id=int(t))
+                for c, t in zip(np.atleast_2d(coords), np.atleast_1d(traj))]
+
+    def segment_distances(self, query, coords, query_traj, traj):
+        query = np.asarray(query, dtype=np.float64)
+        segs = self._segments(coords, traj)
+        queries = self._segments(query, np.broadcast_to(query_traj, np.atleast_2d(query).shape[:1]))
+        res = np.array([[self._pair(*compare(q, s)) for s in segs] for q in queries], dtype=np.float64).reshape(len(queries), len(segs))
+        return res[0] if query.ndim == 1 else res
+
+    def components(self, long_coords, short_coords):
+        result = np.empty((3, len(long_coords)), dtype=np.float64)
+        for i, (seg_long, seg_short) in enumerate(zip(self._segments(long_coords, np.zeros(len(long_coords))),
+                                                      self._segments(short_coords, np.zeros(len(short_coords))))):
+            result[:, i] = (seg_long.angle_distance(seg_short), seg_long.parallel_distance(seg_short),
+                            seg_long.perpendicular_distance(seg_short))
+        return result[0], result[1], result[2]
+
+    def distances(self, seg: Segment, segs):
+        return np.array([self._pair(*compare(seg, s)) for s in segs], dtype=np.float64)
+
+    def mdl_components(self, seg: Segment, sub_segs):
+        return (self.weights[0] * np.array([seg.perpendicular_distance(s) for s in sub_segs], dtype=np.float64),
+                self.weights[2] * np.array([seg.angle_distance(s) for s in sub_segs], dtype=np.float64))
+
+
+@register_backend
+class NumpyBackend(DistanceBackend):
+    """numpy向量化实现, 与segment_distance_batch一致"""
+    name = 'numpy'
+    priority = 1
+
+    def segment_distances(self, query, coords, query_traj, traj):
+        return segment_distance_batch(query, coords, query_traj, traj, weights=self.weights)
+
+    def components(self, long_coords, short_coords):
+        long_coords, short_coords = np.asarray(long_coords, dtype=np.float64), np.asarray(short_coords, dtype=np.float64)
+        return segment_components(*(long_coords[:, k] for k in range(4)), *(short_coords[:, k] for k in range(4)))
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernels():
+    """导入numba并编译计算函数, 只在第一次使用numba后端时执行, 避免导入trajCluster以及启动worker进程时导入numba"""
+    import numba
+
+    @numba.njit(error_model='numpy')
+    def _point2line(px, py, sx, sy, ex, ey):
+        ax, ay = ex - sx, ey - sy
+        if ax == 0 and ay == 0:
+            dx, dy = px - sx, py - sy
+            return math.sqrt(dx * dx + dy * dy)
+        return abs(ax * (sy - py) - ay * (sx - px)) / math.sqrt(ax * ax + ay * ay)
+
+    @numba.njit(error_model='numpy')
+    def _pair_components(lsx, lsy, lex, ley, ssx, ssy, sex, sey, l_len, s_len):
+        """与segment_components逐元素的计算一致"""
+        lvx, lvy, svx, svy = lex - lsx, ley - lsy, sex - ssx, sey - ssy
+        if l_len < eps:
+            angle = _point2line(lsx, lsy, ssx, ssy, sex, sey)
+        elif s_len < eps:
+            angle = _point2line(ssx, ssy, lsx, lsy, lex, ley)
+        else:
+            cos_theta = min((lvx * svx + lvy * svy) / (l_len * s_len), 1.0)
+            angle = s_len * math.sqrt(1 - cos_theta * cos_theta) if cos_theta > eps else s_len
+
+        l_len2 = l_len * l_len
+        u1 = ((ssx - lsx) * lvx + (ssy - lsy) * lvy) / l_len2
+        u2 = ((sex - lsx) * lvx + (sey - lsy) * lvy) / l_len2
+        p1x, p1y, p2x, p2y = lsx + lvx * u1, lsy + lvy * u1, lsx + lvx * u2, lsy + lvy * u2
+
+        d1x, d1y, d2x, d2y = lsx - p1x, lsy - p1y, lex - p2x, ley - p2y
+        parallel = min(math.sqrt(d1x * d1x + d1y * d1y), math.sqrt(d2x * d2x + d2y * d2y))
+
+        d1x, d1y, d2x, d2y = ssx - p1x, ssy - p1y, sex - p2x, sey - p2y
+        l1, l2 = math.sqrt(d1x * d1x + d1y * d1y), math.sqrt(d2x * d2x + d2y * d2y)
+        perpendicular = 0.0 if l1 < eps and l2 < eps else (l1 * l1 + l2 * l2) / (l1 + l2)
+        return angle, parallel, perpendicular
+
+    @numba.njit(error_model='numpy')
+    def _distance_rows(query, q_len, q_deg, q_traj, coords, c_len, c_deg, traj, w_perpendicular, w_parallel, w_angle):
+        res = np.empty((query.shape[0], coords.shape[0]), dtype=np.float64)
+        for i in range(query.shape[0]):
+            for j in range(coords.shape[0]):
+                if q_len[i] > c_len[j]:
+                    l, s, l_len, s_len, l_deg = query[i], coords[j], q_len[i], c_len[j], q_deg[i]
+                else:
+                    l, s, l_len, s_len, l_deg = coords[j], query[i], c_len[j], q_len[i], c_deg[j]
+                angle, parallel, perpendicular = _pair_components(l[0], l[1], l[2], l[3], s[0], s[1], s[2], s[3], l_len, s_len)
+                value = w_angle * angle
+                if not l_deg:
+                    value += w_parallel * parallel
+                if q_traj[i] != traj[j]:
+                    value += w_perpendicular * perpendicular
+                res[i, j] = value
+        return res
+
+    @numba.njit(error_model='numpy')
+    def _component_rows(long_coords, short_coords, l_len, s_len):
+        res = np.empty((3, long_coords.shape[0]), dtype=np.float64)
+        for i in range(long_coords.shape[0]):
+            l, s = long_coords[i], short_coords[i]
+            res[0, i], res[1, i], res[2, i] = _pair_components(l[0], l[1], l[2], l[3], s[0], s[1], s[2], s[3], l_len[i], s_len[i])
+        return res
+
+    return _distance_rows, _component_rows
+
+
+@register_backend
+class NumbaBackend(DistanceBackend):
+    """numba编译实现, 计算方式与numpy后端一致, 只有安装了numba时可用, 第一次调用时进行编译"""
+    name = 'numba'
+    priority = 2
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec('numba') is not None
+
+    def segment_distances(self, query, coords, query_traj, traj):
+        query = np.ascontiguousarray(query, dtype=np.float64)
+        single = query.ndim == 1
+        q = np.atleast_2d(query)
+        c = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 4)
+        q_len, c_len = segment_length(q), segment_length(c)
+        q_traj = np.ascontiguousarray(np.broadcast_to(query_traj, q.shape[:1]), dtype=np.int64)
+        _distance_rows, _ = _numba_kernels()
+        res = _distance_rows(q, q_len, degenerate_mask(q, q_len), q_traj, c, c_len, degenerate_mask(c, c_len),
+                             np.ascontiguousarray(traj, dtype=np.int64), *self.weights)
+        return res[0] if single else res
+
+    def components(self, long_coords, short_coords):
+        long_coords = np.ascontiguousarray(long_coords, dtype=np.float64)
+        short_coords = np.ascontiguousarray(short_coords, dtype=np.float64)
+        _, _component_rows = _numba_kernels()
+        res = _component_rows(long_coords, short_coords, segment_length(long_coords), segment_length(short_coords))
+        return res[0], res[1], res[2]
+
+
+def available_backends():
+    """返回当前环境中可用的后端名称, 按照速度从快到慢排列"""
+    return [cls.name for cls in sorted(_registry.values(), key=lambda c: -c.priority) if cls.available()]
+
+
+def get_backend(name=None, perpendicular: float = 1.0, parallel: float = 1.0, angle: float = 1.0) -> DistanceBackend:
+    """
+    parameter
+    ---------
+        name: str or DistanceBackend, 后端名称('python', 'numpy', 'numba'), 为None时使用当前可用后端中最快的一个, 为后端实例时直接返回
+        perpendicular, parallel, angle: float, 三个距离分量的权重
+    return
+    ------
+        DistanceBackend, 后端实例
+    """
+    if isinstance(name, DistanceBackend):
+        return name
+    name = available_backends()[0] if name is None else name
+    if name not in _registry:
+        raise ValueError("Unknown distance backend: %r" % (name, ))
+    if not _registry[name].available():
+        raise ValueError("The distance backend %r is not available." % (name, ))
+    return _registry[name](perpendicular=perpendicular, parallel=parallel, angle=angle)
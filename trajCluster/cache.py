@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :cache.py
+# target    :基于内容寻址的partition结果缓存, key为轨迹坐标, partition方法及其参数(theta/epsilon, clean)的哈希值, value为分段segment在轨迹中的
+#            起止点索引, 保存在本地磁盘目录中(每个key一个.npy文件), 超过容量上限时按照最近访问时间(LRU)删除. 相同的轨迹再次partition时直接读取
+#            缓存的结果, 结果与重新计算完全一致
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 4:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from .store import _as_coords
+from . import profiling as _profiling
+
+_cache_version = 1  # partition算法的结果发生变化时修改, 使之前的缓存失效
+default_max_bytes = 256 << 20
+
+
+def _hash_value(h, value):
+    """将clean参数中的值写入哈希, 数组(如timestamps)按照内容计算"""
+    if isinstance(value, dict):
+        for k in sorted(value):
+            h.update(repr(k).encode())
+            _hash_value(h, value[k])
+    elif isinstance(value, (np.ndarray, list, tuple)):
+        array = np.ascontiguousarray(value, dtype=np.float64)
+        h.update(repr(array.shape).encode())
+        h.update(array.tobytes())
+    else:
+        h.update(repr(value).encode())
+
+
+class PartitionCache(object):
+    """磁盘中的partition结果缓存, 可以在多次运行之间共享
+    parameter
+    ---------
+        directory: str, 缓存目录, 不存在时自动创建
+        max_bytes: int, 缓存文件的总大小上限, 超过时删除最久未访问的结果
+    method
+    ------
+        key(traj, method, theta, epsilon, clean): 计算缓存的key
+        get(key): 返回缓存的起止点索引列表, 不存在时返回None
+        put(key, partition_indices): 保存起止点索引
+        stats(): 返回命中次数, 未命中次数等统计
+    """
+    def __init__(self, directory: str, max_bytes: int = default_max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # 按照文件的最后访问时间(通过修改时间记录)恢复LRU顺序
+        entries = []
+        for sub in os.listdir(directory):
+            sub_dir = os.path.join(directory, sub)
+            if not os.path.isdir(sub_dir):
+                continue
+            for name in os.listdir(sub_dir):
+                if name.endswith('.npy'):
+                    st = os.stat(os.path.join(sub_dir, name))
+                    entries.append((st.st_mtime_ns, name[:-4], st.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.size = sum(self._entries.values())
+        self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.npy')
+
+    @staticmethod
+    def key(traj, method: str = 'approximate', theta: float = 5.0, epsilon: float = 1.0, clean: dict = None) -> str:
+        """计算缓存的key, 只包含对应method使用的参数(approximate为theta, rdp为epsilon)
+        parameter
+        ---------
+            traj: List[Point, ...] or np.ndarray, 轨迹
+            method: str, 'approximate' or 'rdp'
+            theta, epsilon: float, partition的参数
+            clean: dict, partition之前清洗轨迹的参数
+        return
+        ------
+            str, 十六进制的sha256
+        """
+        coords = np.ascontiguousarray(_as_coords(traj), dtype=np.float64)
+        h = hashlib.sha256()
+        h.update(b'%d:%s:' % (_cache_version, method.encode()))
+        h.update(repr(float(theta) if method == 'approximate' else float(epsilon)).encode())
+        _hash_value(h, clean)
+        h.update(repr(coords.shape).encode())
+        h.update(coords.tobytes())
+        return h.hexdigest()
+
+    def get(self, key: str):
+        """返回缓存的起止点索引: List[(start_index, end_index), ...], 不存在时返回None"""
+        if key in self._entries:
+            path = self._path(key)
+            try:
+                indices = np.load(path)
+                os.utime(path)
+            except (OSError, ValueError):  # 被其他进程删除或者文件损坏
+                self.size -= self._entries.pop(key)
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                _profiling.count('partition.cache_hits')
+                return [tuple(pair) for pair in indices.tolist()]
+        self.misses += 1
+        _profiling.count('partition.cache_misses')
+        return None
+
+    def put(self, key: str, partition_indices):
+        """保存起止点索引, 先写入临时文件再重命名, 多个进程同时写入同一个key时不会读到不完整的文件"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.asarray(partition_indices, dtype=np.int64).reshape(-1, 2))
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        self.size += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        self.writes += 1
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """删除所有缓存的结果"""
+        for key in list(self._entries):
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        self._entries.clear()
+        self.size = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / float(total) if total else 0.0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate(), 'writes': self.writes,
+                'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self.size}
+
+    def __repr__(self):
+        return "PartitionCache(%r, %s)" % (self.directory, json.dumps(self.stats()))
@@ -8,26 +8,49 @@
 # date      :2019/4/1 14:13
 # log       :包含修改时间、修改人、修改line及原因
 # --------------------------------------------------------------------------------
+import functools
+import logging
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 
 from .segment import compare, Segment
 from .point import Point
+from .index import SegmentGridIndex
+from .distance import SegmentArray, segments_to_array
+from .store import SegmentStore
+from .parallel import parallel_neighbor_positions
+from .backend import get_backend
+from . import profiling as _profiling
 from collections import deque, defaultdict
 
 min_traj_cluster = 2  # 定义聚类的簇中至少需要的trajectory数量
+logger = logging.getLogger(__name__)
 
 
-def neighborhood(seg, segs, epsilon=2.0):
+def neighborhood(seg, segs, epsilon=2.0, index=None, backend=None):
     """计算一个segment在距离epsilon范围内的所有segment集合, 计算的时间复杂度为O(n). n为所有segment的数量
     parameter
     ---------
         seg: Segment instance, 需要计算的segment对象
         segs: List[Segment, ...], 所有的segment集合, 为所有集合的partition分段结果集合
         epsilon: float, segment之间的距离度量阈值
+        index: SegmentGridIndex or SegmentArray, 可选的segs查询引擎, 给定时通过空间索引剪枝或者向量化计算, 结果与暴力计算一致
+        backend: str or DistanceBackend, 距离计算后端, 给定时通过后端计算seg与segs的距离(可以设置距离分量的权重), 不能与index同时使用:
+            带权重的距离不满足索引剪枝使用的距离下界. 未给定时使用Segment中的精确实现, 不会自动选择后端
     return
     ------
         List[segment, ...], 返回seg在距离epsilon内的所有Segment集合.
     """
+    if index is not None and backend is not None:
+        raise ValueError("The parameter 'backend' can not be used together with 'index'.")
+    if index is not None:
+        return index.neighborhood(seg, epsilon=epsilon)
+    if backend is not None:
+        distances = get_backend(backend).distances(seg, segs)
+        return [segs[i] for i in np.nonzero(distances <= epsilon)[0]]
     segment_set = []
     for segment_tmp in segs:
         seg_long, seg_short = compare(seg, segment_tmp)  # get long segment by compare segment
@@ -36,121 +59,455 @@ def neighborhood(seg, segs, epsilon=2.0):
     return segment_set
 
 
-def expand_cluster(segs, queue: deque, cluster_id: int, epsilon: float, min_lines: int):
+def expand_cluster(segs, queue: deque, cluster_id: int, epsilon: float, min_lines: int, index=None, cache: dict = None):
+    """从queue中的segment开始扩展类簇, 每个segment的邻域只计算一次, cache为id(segment)到邻域的缓存, 可以在多次调用之间共享"""
+    cache = dict() if cache is None else cache
     while len(queue) != 0:
         curr_seg = queue.popleft()
-        curr_num_neighborhood = neighborhood(curr_seg, segs, epsilon=epsilon)
+        if id(curr_seg) in cache:
+            continue  # 已经扩展过的segment, 邻域中的segment都已经分配了cluster_id
+        curr_num_neighborhood = cache[id(curr_seg)] = neighborhood(curr_seg, segs, epsilon=epsilon, index=index)
         if len(curr_num_neighborhood) >= min_lines:
             for m in curr_num_neighborhood:
                 if m.cluster_id == -1:
                     queue.append(m)
                     m.cluster_id = cluster_id
-        else:
-            pass
 
 
-def line_segment_clustering(traj_segments, epsilon: float = 2.0, min_lines: int = 5):
-    """线段segment聚类, 采用dbscan的聚类算法, 参考论文中的伪代码来实现聚类, 论文中的part4.2部分中的伪代码及相关定义
+def _backend_positions(backend, arrays: SegmentArray, pos: int, epsilon: float):
+    """通过距离计算后端计算第pos个segment在距离epsilon范围内的所有segment的位置"""
+    distances = backend.segment_distances(arrays.coords[pos], arrays.coords, arrays.traj[pos], arrays.traj)
+    return np.nonzero(distances <= epsilon)[0].tolist()
+
+
+def _scan_positions(segs, pos: int, epsilon: float):
+    """暴力计算第pos个segment在距离epsilon范围内的所有segment的位置, 与neighborhood的计算方式一致"""
+    seg = segs[pos]
+    result = []
+    for i, segment_tmp in enumerate(segs):
+        seg_long, seg_short = compare(seg, segment_tmp)
+        if seg_long.get_all_distance(seg_short) <= epsilon:
+            result.append(i)
+    return result
+
+
+class ClusteringStats(object):
+    """line_segment_clustering的计算量统计, 作为stats参数传入时在聚类结束后填充
+    attribute
+    ---------
+        neighborhood_queries: int, 计算邻域的次数, 每个segment最多计算一次
+        distance_evaluations: int, 计算segment距离的次数, 使用距离矩阵时为0
+        core_segments: int, 核心segment(邻域中的segment数量不小于min_lines)的数量
+        neighborhood_size: int, 所有计算过的邻域中的segment数量之和
+        max_neighborhood_size: int, 最大的邻域中的segment数量
+        max_queue_length: int, 扩展类簇时队列的最大长度
+    """
+    __slots__ = ('neighborhood_queries', 'distance_evaluations', 'core_segments', 'neighborhood_size', 'max_neighborhood_size',
+                 'max_queue_length')
+
+    def __init__(self):
+        self.neighborhood_queries = 0
+        self.distance_evaluations = 0
+        self.core_segments = 0
+        self.neighborhood_size = 0
+        self.max_neighborhood_size = 0
+        self.max_queue_length = 0
+
+    def __repr__(self):
+        return "ClusteringStats(%s)" % ', '.join('%s=%d' % (k, getattr(self, k)) for k in self.__slots__)
+
+    def update(self, other: 'ClusteringStats'):
+        """累加other中的统计结果, 最大值取两者中较大的一个"""
+        self.neighborhood_queries += other.neighborhood_queries
+        self.distance_evaluations += other.distance_evaluations
+        self.core_segments += other.core_segments
+        self.neighborhood_size += other.neighborhood_size
+        self.max_neighborhood_size = max(self.max_neighborhood_size, other.max_neighborhood_size)
+        self.max_queue_length = max(self.max_queue_length, other.max_queue_length)
+
+
+class _NeighborhoodCache(object):
+    """每个segment的邻域只计算一次, 同时记录segment是否已经访问以及是否为核心segment"""
+    __slots__ = ('neighbor_positions', 'neighbors', 'visited', 'core', 'queries')
+
+    def __init__(self, size: int, neighbor_positions):
+        self.neighbor_positions = neighbor_positions
+        self.neighbors = [None] * size
+        self.visited = [False] * size
+        self.core = [False] * size
+        self.queries = 0
+
+    def visit(self, pos: int, min_lines):
+        """访问第pos个segment, 返回邻域位置列表, 同时确定是否为核心segment"""
+        neighbors = self.neighbors[pos]
+        if neighbors is None:
+            neighbors = self.neighbors[pos] = self.neighbor_positions(pos)
+            self.queries += 1
+        self.visited[pos] = True
+        self.core[pos] = len(neighbors) >= min_lines
+        return neighbors
+
+
+def _expand_positions(labels: list, cache: _NeighborhoodCache, queue: deque, cluster_id: int, min_lines: int):
+    """与expand_cluster一致, 通过segment的位置和labels列表来完成聚类的扩展, 已经访问过的segment的邻域都已经分配了cluster_id, 不再重复扩展.
+    返回扩展过程中队列的最大长度"""
+    max_queue_length = len(queue)
+    while len(queue) != 0:
+        curr_pos = queue.popleft()
+        if cache.visited[curr_pos]:
+            continue
+        curr_num_neighborhood = cache.visit(curr_pos, min_lines)
+        if cache.core[curr_pos]:
+            for m in curr_num_neighborhood:
+                if labels[m] == -1:
+                    queue.append(m)
+                    labels[m] = cluster_id
+            max_queue_length = max(max_queue_length, len(queue))
+    return max_queue_length
+
+
+def _cluster_positions(labels: list, neighbor_positions, min_lines: int, stats: ClusteringStats = None):
+    """dbscan聚类的主流程, 直接修改labels中的cluster_id, 每个segment的邻域最多计算一次, 扩展时使用无界的队列
     parameter
     ---------
-        traj_segments: List[Segment, ...], 所有轨迹的partition划分后的segment集合.
-        epsilon: float, segment之间的距离度量阈值
+        labels: List[int, ...], 每个segment的cluster_id, 初始为-1
+        neighbor_positions: Callable[[int], List[int, ...]], 计算第pos个segment在epsilon范围内的所有segment的位置
         min_lines: int or float, 轨迹在epsilon范围内的segment数量的最小阈值
+        stats: ClusteringStats, 给定时累加邻域计算次数, 核心segment数量, 邻域大小和队列长度
     return
     ------
-        Tuple[Dict[int, List[Segment, ...]], ...], 返回聚类的集合和不属于聚类的集合, 通过dict表示, key为cluster_id, value为segment集合
+        Dict[int, List[int, ...]], key为cluster_id, value为segment的位置列表
     """
-    cluster_id = 0
+    cache = _NeighborhoodCache(len(labels), neighbor_positions)
+    cluster_id, max_queue_length = 0, 0
     cluster_dict = defaultdict(list)
-    for seg in traj_segments:
-        _queue = deque(list(), maxlen=50)
-        if seg.cluster_id == -1:
-            seg_num_neighbor_set = neighborhood(seg, traj_segments, epsilon=epsilon)
-            if len(seg_num_neighbor_set) >= min_lines:
-                seg.cluster_id = cluster_id
-                for sub_seg in seg_num_neighbor_set:
-                    sub_seg.cluster_id = cluster_id  # assign clusterId to segment in neighborhood(seg)
-                    _queue.append(sub_seg)  # insert sub segment into queue
-                expand_cluster(traj_segments, _queue, cluster_id, epsilon, min_lines)
+    for pos in range(len(labels)):
+        if labels[pos] == -1 and not cache.visited[pos]:
+            seg_num_neighbor_set = cache.visit(pos, min_lines)
+            if cache.core[pos]:
+                _queue = deque()
+                labels[pos] = cluster_id
+                for sub_pos in seg_num_neighbor_set:
+                    labels[sub_pos] = cluster_id  # assign clusterId to segment in neighborhood(seg)
+                    _queue.append(sub_pos)  # insert sub segment into queue
+                max_queue_length = max(max_queue_length, _expand_positions(labels, cache, _queue, cluster_id, min_lines))
                 cluster_id += 1
-            else:
-                seg.cluster_id = -1
-        # print(seg.cluster_id, seg.traj_id)
-        if seg.cluster_id != -1:
-            cluster_dict[seg.cluster_id].append(seg)  # 将轨迹放入到聚类的集合中, 按dict进行存放
+        if labels[pos] != -1:
+            cluster_dict[labels[pos]].append(pos)  # 将轨迹放入到聚类的集合中, 按dict进行存放
+    if stats is not None:
+        stats.neighborhood_queries += cache.queries
+        stats.core_segments += sum(cache.core)
+        sizes = [len(neighbors) for neighbors in cache.neighbors if neighbors is not None]
+        stats.neighborhood_size += sum(sizes)
+        stats.max_neighborhood_size = max([stats.max_neighborhood_size] + sizes)
+        stats.max_queue_length = max(stats.max_queue_length, max_queue_length)
+    return cluster_dict
+
+
+@_profiling.profiled('clustering')
+def line_segment_clustering(traj_segments, epsilon: float = 2.0, min_lines: int = 5, use_index: bool = False,
+                            vectorized: bool = False, distance_matrix=None, n_jobs: int = 1, stats: ClusteringStats = None,
+                            backend=None):
+    """线段segment聚类, 采用dbscan的聚类算法, 参考论文中的伪代码来实现聚类, 论文中的part4.2部分中的伪代码及相关定义
+    parameter
+    ---------
+        traj_segments: List[Segment, ...] or SegmentStore, 所有轨迹的partition划分后的segment集合.
+        epsilon: float, segment之间的距离度量阈值
+        min_lines: int or float, 轨迹在epsilon范围内的segment数量的最小阈值
+        use_index: bool, 是否使用网格空间索引对neighborhood查询进行剪枝, 聚类结果与暴力计算一致
+        vectorized: bool, 是否使用numpy向量化的距离计算引擎, 可以与use_index同时使用, SegmentStore始终使用向量化的计算
+        distance_matrix: SegmentDistanceMatrix, 预先计算的traj_segments距离矩阵, 给定时直接读取邻域, epsilon不能大于矩阵的cutoff
+        n_jobs: int, 不为1时通过多进程预先计算所有segment的邻域(向量化计算, 坐标通过共享内存传递), 为None或者-1时使用所有的cpu,
+            聚类结果与vectorized=True的串行计算一致
+        stats: ClusteringStats, 给定时在聚类结束后累加邻域计算次数, 距离计算次数, 核心segment数量, 邻域大小和队列长度,
+            开启性能统计(profiling.enable_profiling)时同样的统计结果以'clustering.'为前缀记录到Profiler中
+        backend: str or DistanceBackend, 距离计算后端, 给定时通过后端暴力计算邻域(可以设置距离分量的权重), 优先级低于distance_matrix.
+            后端需要显式指定, 默认的计算方式不使用后端; 不能与use_index或者vectorized同时使用, 带权重的距离不满足网格索引剪枝使用的距离下界
+    return
+    ------
+        Tuple[Dict[int, List[Segment, ...]], ...], 返回聚类的集合和不属于聚类的集合, 通过dict表示, key为cluster_id, value为segment集合,
+        输入为SegmentStore时value为SegmentStore, 同时会更新输入的SegmentStore中的cluster_id
+    """
+    if isinstance(traj_segments, SegmentStore):
+        segs = traj_segments
+        labels = segs.cluster_id.tolist()
+        traj_ids = segs.traj_id.tolist()
+    else:
+        segs = list(traj_segments)
+        labels = [seg.cluster_id for seg in segs]
+        traj_ids = [seg.traj_id for seg in segs]
+
+    if backend is not None and (use_index or vectorized):
+        raise ValueError("The parameter 'backend' can not be used together with 'use_index' or 'vectorized'.")
+    index, evaluations = None, 0
+    if distance_matrix is not None:
+        if len(distance_matrix) != len(segs):
+            raise ValueError("The distance matrix size does not match the number of segments.")
+        neighbor_positions = functools.partial(distance_matrix.neighbor_positions, epsilon=epsilon)
+    elif backend is not None:
+        arrays = SegmentArray.from_store(segs, epsilon=epsilon) if isinstance(segs, SegmentStore) else SegmentArray(segs, epsilon=epsilon)
+        backend = get_backend(backend)
+        neighbor_positions = functools.partial(_backend_positions, backend, arrays, epsilon=epsilon)
+    elif n_jobs != 1:
+        arrays = SegmentArray.from_store(segs, epsilon=epsilon) if isinstance(segs, SegmentStore) else SegmentArray(segs, epsilon=epsilon)
+        neighbors, evaluations = parallel_neighbor_positions(arrays, epsilon, n_jobs=n_jobs, use_index=use_index,
+                                                             return_evaluations=True)
+        neighbor_positions = neighbors.__getitem__
+    elif isinstance(segs, SegmentStore):
+        if use_index:
+            index = SegmentGridIndex.from_store(segs, epsilon=epsilon)
+        else:
+            index = SegmentArray.from_store(segs, epsilon=epsilon)
+    elif use_index:
+        index = SegmentGridIndex(segs, epsilon=epsilon, vectorized=vectorized)
+    elif vectorized:
+        index = SegmentArray(segs, epsilon=epsilon)
+    else:
+        neighbor_positions = functools.partial(_scan_positions, segs, epsilon=epsilon)
+    if index is not None:
+        neighbor_positions = functools.partial(index.neighbor_positions, epsilon=epsilon)
+
+    run_stats = ClusteringStats()
+    position_dict = _cluster_positions(labels, neighbor_positions, min_lines, stats=run_stats)
+    if index is not None:
+        evaluations = index.distance_evaluations
+    elif distance_matrix is None and (n_jobs == 1 or backend is not None):
+        evaluations = run_stats.neighborhood_queries * len(segs)
+    run_stats.distance_evaluations = evaluations
+    if stats is not None:
+        stats.update(run_stats)
+    profiler = _profiling.get_profiler()
+    if profiler is not None:
+        profiler.count('clustering.segments', len(segs))
+        for name in ('neighborhood_queries', 'distance_evaluations', 'core_segments', 'neighborhood_size'):
+            profiler.count('clustering.' + name, getattr(run_stats, name))
+        profiler.maximum('clustering.max_neighborhood_size', run_stats.max_neighborhood_size)
+        profiler.maximum('clustering.max_queue_length', run_stats.max_queue_length)
+    return _collect_clusters(segs, labels, traj_ids, position_dict)
+
+
+def _collect_clusters(segs, labels: list, traj_ids: list, position_dict):
+    """将labels写回segs中的cluster_id, 并按照类簇中的轨迹数量划分为保留的类簇和删除的类簇
+    parameter
+    ---------
+        segs: List[Segment, ...] or SegmentStore, 所有的segment集合
+        labels: List[int, ...], 每个segment的cluster_id
+        traj_ids: List[int, ...], 每个segment的轨迹ID
+        position_dict: Dict[int, List[int, ...]], key为cluster_id(从0开始连续编号), value为segment的位置列表
+    return
+    ------
+        Tuple[Dict[int, List[Segment, ...]], ...], 与line_segment_clustering的返回结果一致
+    """
+    if isinstance(segs, SegmentStore):
+        segs.cluster_id[:] = labels
+        cluster_dict = {k: segs.take(v) for k, v in position_dict.items()}
+    else:
+        for seg, label in zip(segs, labels):
+            seg.cluster_id = label
+        cluster_dict = defaultdict(list, {k: [segs[i] for i in v] for k, v in position_dict.items()})
 
     remove_cluster = dict()
     cluster_number = len(cluster_dict)
     for i in range(0, cluster_number):
-        traj_num = len(set(map(lambda s: s.traj_id, cluster_dict[i])))  # 计算每个簇下的轨迹数量
-        print("the %d cluster lines:" % i, traj_num)
+        traj_num = len(set(traj_ids[pos] for pos in position_dict[i]))  # 计算每个簇下的轨迹数量
+        logger.debug("the %d cluster lines: %d", i, traj_num)
         if traj_num < min_traj_cluster:
             remove_cluster[i] = cluster_dict.pop(i)
     return cluster_dict, remove_cluster
 
 
-def representative_trajectory_generation(cluster_segment: dict, min_lines: int = 3, min_dist: float = 2.0):
+class _ExactSum(object):
+    """可以增加和删除数值的精确累加器(Shewchuk算法), 删除时加上相反数, 累加的结果不会残留浮点误差"""
+    __slots__ = ('partials', )
+
+    def __init__(self):
+        self.partials = []
+
+    def add(self, x: float):
+        i = 0
+        for y in self.partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                self.partials[i] = lo
+                i += 1
+            x = hi
+        self.partials[i:] = [x]
+
+
+def _sweep_average(rsx, rsy, rex, rey, min_lines, steep_slope: float = 1e3):
+    """扫描线计算代表性轨迹点, 坐标为旋转后的坐标系. 按X从小到大扫描所有的端点, segment在起点处进入活动集合, 在终点之后离开活动集合,
+    活动集合中segment在X处的Y值为slope * (X - x0) + offset, 通过精确累加器维护slope和offset的和, 每个端点处的计算为O(1).
+    斜率过大的segment累加时的浮点误差较大, 单独存放并在每个端点处直接计算.
+    parameter
+    ---------
+        rsx, rsy, rex, rey: np.ndarray, 旋转后的segment起止点坐标
+        min_lines: int, 满足segment数的最小值
+        steep_slope: float, 斜率的绝对值大于该值的segment单独计算
+    return
+    ------
+        List[Tuple[float, float], ...], 按X排序的(X, 平均Y)列表, 只包含segment数量满足min_lines的端点
+    """
+    sort_x = np.column_stack((rsx, rex)).ravel()
+    sort_x = sort_x[np.argsort(sort_x, kind='stable')].tolist()
+    if not sort_x:
+        return []
+    x0 = sort_x[0]  # 以最小的X为原点, 减小累加的数值
+    active = np.nonzero(rsx < rex)[0]  # 垂直的segment和反向的segment不会包含任何端点
+    starts = active[np.argsort(rsx[active], kind='stable')].tolist()
+    ends = active[np.argsort(rex[active], kind='stable')].tolist()
+    _rsx, _rsy, _rex, _rey = rsx.tolist(), rsy.tolist(), rex.tolist(), rey.tolist()
+
+    slope_sum, offset_sum, steep = _ExactSum(), _ExactSum(), dict()
+    count, start_pos, end_pos = 0, 0, 0
+    result = []
+    for px in sort_x:
+        while start_pos < len(starts) and _rsx[starts[start_pos]] <= px:
+            q = starts[start_pos]
+            slope = (_rey[q] - _rsy[q]) / (_rex[q] - _rsx[q])
+            if abs(slope) > steep_slope:
+                steep[q] = slope
+            else:
+                slope_sum.add(slope)
+                offset_sum.add(_rsy[q] - slope * (_rsx[q] - x0))
+            count += 1
+            start_pos += 1
+        while end_pos < len(ends) and _rex[ends[end_pos]] < px:
+            q = ends[end_pos]
+            if q in steep:
+                del steep[q]
+            else:
+                slope = (_rey[q] - _rsy[q]) / (_rex[q] - _rsx[q])
+                slope_sum.add(-slope)
+                offset_sum.add(-(_rsy[q] - slope * (_rsx[q] - x0)))
+            count -= 1
+            end_pos += 1
+        if count == 0 or count < min_lines:
+            continue
+        terms = [(px - x0) * math.fsum(slope_sum.partials)] + offset_sum.partials
+        terms.extend(slope * (px - _rsx[q]) + _rsy[q] for q, slope in steep.items())
+        result.append((px, math.fsum(terms) / count))
+    return result
+
+
+def _rotation(rep_x: float, rep_y: float):
+    """通过平均方向向量计算坐标变换的cos(theta)和sin(theta)"""
+    cos_theta = rep_x / math.sqrt(math.pow(rep_x, 2) + math.pow(rep_y, 2))
+    sin_theta = math.sqrt(1 - math.pow(cos_theta, 2))
+    return cos_theta, sin_theta
+
+
+def _representative_coords(coords: np.ndarray, min_lines: int, min_dist: float):
+    """与representative_trajectory_generation中单个类簇的计算一致, 通过坐标数组计算代表性轨迹
+    parameter
+    ---------
+        coords: np.ndarray, shape为(N, 4)的类簇segment坐标数组
+    return
+    ------
+        np.ndarray, shape为(K, 2)的代表性轨迹点坐标数组
+    """
+    sx, sy, ex, ey = coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]
+    rep_x = float(np.cumsum(ex - sx)[-1]) / float(len(coords))  # average direction vector
+    rep_y = float(np.cumsum(ey - sy)[-1]) / float(len(coords))
+    cos_theta, sin_theta = _rotation(rep_x, rep_y)
+
+    rsx, rsy = sx * cos_theta + sy * sin_theta, sy * cos_theta - sx * sin_theta
+    rex, rey = ex * cos_theta + ey * sin_theta, ey * cos_theta - ex * sin_theta
+    result = []
+    for tmp_x, tmp_y in _sweep_average(rsx, rsy, rex, rey, min_lines):
+        x, y = tmp_x * cos_theta - sin_theta * tmp_y, sin_theta * tmp_x + cos_theta * tmp_y
+        if not result or math.sqrt(math.pow(x - result[-1][0], 2) + math.pow(y - result[-1][1], 2)) > min_dist:
+            result.append((x, y))
+    return np.array(result, dtype=np.float64).reshape(-1, 2)
+
+
+def _representative_task(task):
+    """进程池/线程池中执行的单个类簇的代表性轨迹计算, 输入为(cluster_id, 坐标数组, min_lines, min_dist)"""
+    cluster_id, coords, min_lines, min_dist = task
+    return cluster_id, _representative_coords(coords, min_lines, min_dist)
+
+
+def _representative_points(segs: list, min_lines: int, min_dist: float):
+    """单个类簇为Segment列表时的代表性轨迹计算, 坐标变换后的segment保存在新的列表中, 不修改输入的segment列表"""
+    cluster_size = len(segs)
+    rep_point, zero_point = Point(0, 0, -1), Point(1, 0, -1)
+
+    # 对类别下的segment进行循环, 计算类别下的平局方向向量: average direction vector
+    for seg in segs:
+        rep_point = rep_point + (seg.end - seg.start)
+    rep_point = rep_point / float(cluster_size)  # 对所有点的x, y求平局值
+
+    cos_theta = rep_point.dot(zero_point) / rep_point.distance(Point(0, 0, -1))  # cos(theta)
+    sin_theta = math.sqrt(1 - math.pow(cos_theta, 2))  # sin(theta)
+
+    # 对类别下的所有segment进行循环, 每个点进行坐标变换: X' = A * X => X = A^(-1) * X'
+    #   |x'|      | cos(theta)   sin(theta) |    | x |
+    #   |  |  =   |                         | *  |   |
+    #   |y'|      |-sin(theta)   cos(theta) |    | y |
+    rotated = []
+    for seg in segs:
+        s, e = seg.start, seg.end
+        rotated.append(Segment(Point(s.x * cos_theta + s.y * sin_theta, s.y * cos_theta - s.x * sin_theta, -1),
+                               Point(e.x * cos_theta + e.y * sin_theta, e.y * cos_theta - e.x * sin_theta, -1),
+                               traj_id=seg.traj_id, cluster_id=seg.cluster_id))
+
+    # 扫描线计算每个端点处的平均坐标: avg_p and dist >= min_dist
+    rotated = segments_to_array(rotated)
+    result = []
+    for tmp_x, tmp_y in _sweep_average(rotated[:, 0], rotated[:, 1], rotated[:, 2], rotated[:, 3], min_lines):
+        # 坐标转换到原始的坐标系, 通过逆矩阵的方式进行矩阵的计算:https://www.shuxuele.com/algebra/matrix-inverse.html
+        tmp = Point(tmp_x*cos_theta-sin_theta*tmp_y, sin_theta*tmp_x+cos_theta*tmp_y, -1)
+        if not result or tmp.distance(result[-1]) > min_dist:
+            result.append(tmp)
+    return result
+
+
+@_profiling.profiled('representative')
+def representative_trajectory_generation(cluster_segment: dict, min_lines: int = 3, min_dist: float = 2.0, n_jobs: int = 1,
+                                         executor: str = 'process'):
     """通过论文中的算法对轨迹进行变换, 提取代表性路径, 在实际应用中必须和当地的路网结合起来, 提取代表性路径, 该方法就是通过算法生成代表性轨迹
     parameter
     ---------
-        cluster_segment: Dict[int, List[Segment, ...], ...], 轨迹聚类的结果存储字典, key为聚类ID, value为类簇下的segment列表
+        cluster_segment: Dict[int, List[Segment, ...] or SegmentStore, ...], 轨迹聚类的结果存储字典, key为聚类ID, value为类簇下的segment列表,
+            计算过程中不修改其中的segment列表
         min_lines: int, 满足segment数的最小值
         min_dist: float, 生成的轨迹点之间的最小距离, 生成的轨迹点之间的距离不能太近的控制参数
+        n_jobs: int, 并行的worker数量, 每个类簇的计算是独立的, 按照segment数量从大到小分配到worker中, 避免最大的类簇最后才开始计算;
+            为None或者-1时使用所有的cpu, 为1时串行计算
+        executor: str, 'process' or 'thread', 使用进程池或者线程池
     return
     ------
-        Dict[int, List[Point, ...], ...], 每个类别下的代表性轨迹结果
+        Dict[int, List[Point, ...], ...], 每个类别下的代表性轨迹结果, 类簇为SegmentStore时结果为shape为(K, 2)的坐标数组,
+            key的顺序与cluster_segment一致, 并行计算的结果与串行计算一致
     """
+    if executor not in ('process', 'thread'):
+        raise ValueError("The parameter 'executor' given value has error!")
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else n_jobs
     representive_point = defaultdict(list)
-    for i in cluster_segment.keys():
-        cluster_size = len(cluster_segment.get(i))
-        sort_point = []  # [Point, ...], size = cluster_size*2
-        rep_point, zero_point = Point(0, 0, -1), Point(1, 0, -1)
-
-        # 对某个i类别下的segment进行循环, 计算类别下的平局方向向量: average direction vector
-        for j in range(cluster_size):
-            rep_point = rep_point + (cluster_segment[i][j].end - cluster_segment[i][j].start)
-        rep_point = rep_point / float(cluster_size)  # 对所有点的x, y求平局值
-
-        cos_theta = rep_point.dot(zero_point) / rep_point.distance(Point(0, 0, -1))  # cos(theta)
-        sin_theta = math.sqrt(1 - math.pow(cos_theta, 2))  # sin(theta)
-
-        # 对某个i类别下的所有segment进行循环, 每个点进行坐标变换: X' = A * X => X = A^(-1) * X'
-        #   |x'|      | cos(theta)   sin(theta) |    | x |
-        #   |  |  =   |                         | *  |   |
-        #   |y'|      |-sin(theta)   cos(theta) |    | y |
-        for j in range(cluster_size):
-            s, e = cluster_segment[i][j].start, cluster_segment[i][j].end
-            # 坐标轴变换后进行原有的segment修改
-            cluster_segment[i][j] = Segment(Point(s.x * cos_theta + s.y * sin_theta, s.y * cos_theta - s.x * sin_theta, -1),
-                                            Point(e.x * cos_theta + e.y * sin_theta, e.y * cos_theta - e.x * sin_theta, -1),
-                                            traj_id=cluster_segment[i][j].traj_id,
-                                            cluster_id=cluster_segment[i][j].cluster_id)
-            sort_point.extend([cluster_segment[i][j].start, cluster_segment[i][j].end])
-
-        # 对所有点进行排序, 按照横轴的X进行排序, 排序后的point列表应用在后面的计算中
-        sort_point = sorted(sort_point, key=lambda _p: _p.x)
-        for p in range(len(sort_point)):
-            intersect_cnt = 0.0
-            start_y = Point(0, 0, -1)
-            for q in range(cluster_size):
-                s, e = cluster_segment[i][q].start, cluster_segment[i][q].end
-                # 如果点在segment内则进行下一步的操作:
-                if (sort_point[p].x <= e.x) and (sort_point[p].x >= s.x):
-                    if s.x == e.x:
-                        continue
-                    elif s.y == e.y:
-                        intersect_cnt += 1
-                        start_y = start_y + Point(sort_point[p].x, s.y, -1)
-                    else:
-                        intersect_cnt += 1
-                        start_y = start_y + Point(sort_point[p].x, (e.y-s.y)/(e.x-s.x)*(sort_point[p].x-s.x)+s.y, -1)
-            # 计算the average coordinate: avg_p and dist >= min_dist
-            if intersect_cnt >= min_lines:
-                tmp_point: Point = start_y / intersect_cnt
-                # 坐标转换到原始的坐标系, 通过逆矩阵的方式进行矩阵的计算:https://www.shuxuele.com/algebra/matrix-inverse.html
-                tmp = Point(tmp_point.x*cos_theta-sin_theta*tmp_point.y,
-                            sin_theta*tmp_point.x+cos_theta*tmp_point.y, -1)
-                _size = len(representive_point[i]) - 1
-                if _size < 0 or (_size >= 0 and tmp.distance(representive_point[i][_size]) > min_dist):
-                    representive_point[i].append(tmp)
+    if n_jobs == 1 or len(cluster_segment) <= 1:
+        for i, segs in cluster_segment.items():
+            if isinstance(segs, SegmentStore):
+                points = _representative_coords(segs.coords, min_lines, min_dist)
+            else:
+                points = _representative_points(segs, min_lines, min_dist)
+            if len(points):
+                representive_point[i] = points
+    else:
+        tasks = [(i, segs.coords if isinstance(segs, SegmentStore) else segments_to_array(segs), min_lines, min_dist)
+                 for i, segs in cluster_segment.items()]
+        tasks.sort(key=lambda task: -len(task[1]))  # 最大的类簇最先开始计算
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=n_jobs) as pool:
+            results = dict(pool.map(_representative_task, tasks))
+        for i, segs in cluster_segment.items():
+            coords = results[i]
+            if len(coords):
+                representive_point[i] = coords if isinstance(segs, SegmentStore) else [Point(x, y, -1) for x, y in coords.tolist()]
+    profiler = _profiling.get_profiler()
+    if profiler is not None:
+        profiler.count('representative.clusters', len(cluster_segment))
+        profiler.count('representative.segments', sum(len(v) for v in cluster_segment.values()))
+        profiler.count('representative.points', sum(len(v) for v in representive_point.values()))
     return representive_point
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :distance.py
+# target    :segment距离的向量化计算, 通过numpy一次性计算一个(或一批)segment与所有segment之间的距离, 计算结果与Segment中的方法一致(
+#            Segment中使用math.pow计算平方, 与numpy的计算结果可能存在1ulp的浮点误差)
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 11:05
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+eps = 1e-12  # 与Segment.eps保持一致
+degenerate_length = 1e-7  # str(start) == str(end)的segment长度一定小于该值, 只对这部分segment进行字符串比较
+
+
+def segments_to_array(segs):
+    """将segment列表转换为structure-of-arrays格式的坐标数组
+    parameter
+    ---------
+        segs: List[Segment, ...], segment集合
+    return
+    ------
+        np.ndarray, shape为(N, 4)的float64数组, 每一行为(start.x, start.y, end.x, end.y)
+    """
+    coords = np.empty((len(segs), 4), dtype=np.float64)
+    for i, seg in enumerate(segs):
+        coords[i] = (seg.start.x, seg.start.y, seg.end.x, seg.end.y)
+    return coords
+
+
+def segment_length(coords):
+    dx, dy = coords[..., 2] - coords[..., 0], coords[..., 3] - coords[..., 1]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def degenerate_mask(coords, length=None):
+    """计算segment的起止点是否为同一个点, 与Segment.get_all_distance中的str(self.start) == str(self.end)判断一致"""
+    length = segment_length(coords) if length is None else length
+    mask = np.zeros(length.shape, dtype=bool)
+    for pos in zip(*np.nonzero(length < degenerate_length)):
+        row = coords[pos]
+        mask[pos] = "{0:.8f},{1:.8f}".format(row[0], row[1]) == "{0:.8f},{1:.8f}".format(row[2], row[3])
+    return mask
+
+
+def point2line_distances(px, py, sx, sy, ex, ey):
+    """逐元素计算点(px, py)到直线(s, e)的垂直距离, 与point._point2line_distance一致"""
+    ax, ay = ex - sx, ey - sy
+    same = (ax == 0) & (ay == 0)
+    dx, dy = px - sx, py - sy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cross = np.abs(ax * (sy - py) - ay * (sx - px)) / np.sqrt(ax * ax + ay * ay)
+    return np.where(same, np.sqrt(dx * dx + dy * dy), cross)
+
+
+def segment_components(lsx, lsy, lex, ley, ssx, ssy, sex, sey, l_len=None, s_len=None):
+    """逐元素计算segment(ls, le)与segment(ss, se)之间的三个距离分量, 等价于Segment(ls, le)调用对应的方法, 参数为other segment(ss, se)
+    parameter
+    ---------
+        lsx, lsy, lex, ley: np.ndarray, self segment的起止点坐标
+        ssx, ssy, sex, sey: np.ndarray, other segment的起止点坐标
+        l_len, s_len: np.ndarray, 两个segment的长度, 未给定时通过坐标计算
+    return
+    ------
+        Tuple[np.ndarray, np.ndarray, np.ndarray], (angle_distance, parallel_distance, perpendicular_distance)
+    """
+    lvx, lvy, svx, svy = lex - lsx, ley - lsy, sex - ssx, sey - ssy
+    l_len = np.sqrt(lvx * lvx + lvy * lvy) if l_len is None else l_len
+    s_len = np.sqrt(svx * svx + svy * svy) if s_len is None else s_len
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # angle distance
+        cos_theta = np.minimum((lvx * svx + lvy * svy) / (l_len * s_len), 1.0)
+        angle = np.where(cos_theta > eps, s_len * np.sqrt(1 - cos_theta * cos_theta), s_len)
+        angle = np.where(s_len < eps, point2line_distances(ssx, ssy, lsx, lsy, lex, ley), angle)
+        angle = np.where(l_len < eps, point2line_distances(lsx, lsy, ssx, ssy, sex, sey), angle)
+
+        # other segment起止点在self segment上的投影点
+        l_len2 = l_len * l_len
+        u1 = ((ssx - lsx) * lvx + (ssy - lsy) * lvy) / l_len2
+        u2 = ((sex - lsx) * lvx + (sey - lsy) * lvy) / l_len2
+        p1x, p1y, p2x, p2y = lsx + lvx * u1, lsy + lvy * u1, lsx + lvx * u2, lsy + lvy * u2
+
+        # parallel distance
+        d1x, d1y, d2x, d2y = lsx - p1x, lsy - p1y, lex - p2x, ley - p2y
+        parallel = np.minimum(np.sqrt(d1x * d1x + d1y * d1y), np.sqrt(d2x * d2x + d2y * d2y))
+
+        # perpendicular distance
+        d1x, d1y, d2x, d2y = ssx - p1x, ssy - p1y, sex - p2x, sey - p2y
+        l1, l2 = np.sqrt(d1x * d1x + d1y * d1y), np.sqrt(d2x * d2x + d2y * d2y)
+        perpendicular = np.where((l1 < eps) & (l2 < eps), 0.0, (l1 * l1 + l2 * l2) / (l1 + l2))
+    return angle, parallel, perpendicular
+
+
+def segment_distance_batch(query, coords, query_traj, traj, weights=None):
+    """批量计算segment之间的距离, 等价于对每一对segment调用compare()后计算seg_long.get_all_distance(seg_short)
+    parameter
+    ---------
+        query: np.ndarray, shape为(4, )的一个segment或者shape为(M, 4)的一批segment
+        coords: np.ndarray, shape为(N, 4)的所有segment的坐标数组
+        query_traj: int or np.ndarray, query的轨迹编号, shape为()或者(M, )
+        traj: np.ndarray, shape为(N, )的轨迹编号数组, 轨迹编号相同的segment之间不计算perpendicular_distance
+        weights: Tuple[float, float, float], (perpendicular, parallel, angle)三个距离分量的权重, 默认都为1
+    return
+    ------
+        np.ndarray, shape为(N, )或者(M, N)的距离数组
+    """
+    query = np.asarray(query, dtype=np.float64)
+    single = query.ndim == 1
+    q = np.atleast_2d(query)[:, None, :]
+    c = np.asarray(coords, dtype=np.float64)[None, :, :]
+    q_len, c_len = segment_length(q), segment_length(c)
+    q_deg, c_deg = degenerate_mask(q, q_len), degenerate_mask(c, c_len)
+
+    # compare(): 长度大于对方的为long segment, 否则对方为long segment
+    long_is_q = q_len > c_len
+    long_coords = (np.where(long_is_q, q[..., k], c[..., k]) for k in range(4))
+    short_coords = (np.where(long_is_q, c[..., k], q[..., k]) for k in range(4))
+    l_len, s_len = np.where(long_is_q, q_len, c_len), np.where(long_is_q, c_len, q_len)
+    l_deg = np.where(long_is_q, q_deg, c_deg)
+    same_traj = np.atleast_1d(query_traj)[:, None] == np.asarray(traj)[None, :]
+
+    angle, parallel, perpendicular = segment_components(*long_coords, *short_coords, l_len=l_len, s_len=s_len)
+    if weights is not None:
+        w_perpendicular, w_parallel, w_angle = weights
+        angle, parallel, perpendicular = w_angle * angle, w_parallel * parallel, w_perpendicular * perpendicular
+    res = angle + np.where(l_deg, 0.0, parallel) + np.where(same_traj, 0.0, perpendicular)
+    return res[0] if single else res
+
+
+class SegmentArray(object):
+    """segment集合的数组表示, 作为neighborhood查询的向量化计算引擎, 与SegmentGridIndex的查询接口一致
+    method
+    ------
+        distances(seg, positions): 计算seg与segs中所有(或positions指定的)segment的距离
+        neighborhood(seg, epsilon): 返回seg在距离epsilon范围内的所有segment集合, 顺序与segs中的顺序一致
+        neighbor_positions(pos, epsilon): 返回第pos个segment在距离epsilon范围内的所有segment的位置, 按照位置升序排列
+    attribute
+    ---------
+        distance_evaluations: int, 累计计算的segment距离数量
+    """
+    def __init__(self, segs, epsilon: float = None):
+        self.segs = list(segs)
+        self.epsilon = epsilon
+        self.coords = segments_to_array(self.segs)
+        self.distance_evaluations = 0
+        self._traj_codes = dict()
+        self.traj = np.array([self.traj_code(s.traj_id) for s in self.segs], dtype=np.int64)
+
+    @classmethod
+    def from_store(cls, store, epsilon: float = None):
+        """通过SegmentStore生成, 直接使用store中的坐标数组和轨迹ID数组, 不生成Segment对象"""
+        return cls.from_arrays(store.coords, store.traj_id, epsilon)
+
+    @classmethod
+    def from_arrays(cls, coords: np.ndarray, traj: np.ndarray, epsilon: float = None):
+        """通过(N, 4)的坐标数组和(N, )的轨迹编号数组生成, 不复制数组, 轨迹编号为-1时表示traj_id为None"""
+        arrays = cls.__new__(cls)
+        arrays.segs = None
+        arrays.epsilon = epsilon
+        arrays.coords = coords
+        arrays.distance_evaluations = 0
+        arrays._traj_codes = None
+        arrays.traj = traj
+        return arrays
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    def traj_code(self, traj_id):
+        if self._traj_codes is None:
+            return -1 if traj_id is None else traj_id
+        return self._traj_codes.setdefault(traj_id, len(self._traj_codes))
+
+    def _distances(self, query, query_traj, positions=None):
+        rows = np.atleast_2d(query).shape[0]
+        if positions is None:
+            self.distance_evaluations += rows * len(self)
+            return segment_distance_batch(query, self.coords, query_traj, self.traj)
+        positions = np.asarray(positions, dtype=np.int64)
+        self.distance_evaluations += rows * len(positions)
+        return segment_distance_batch(query, self.coords[positions], query_traj, self.traj[positions])
+
+    def distances(self, seg, positions=None):
+        query = (seg.start.x, seg.start.y, seg.end.x, seg.end.y)
+        return self._distances(query, self.traj_code(seg.traj_id), positions)
+
+    def distances_at(self, pos: int, positions=None):
+        return self._distances(self.coords[pos], self.traj[pos], positions)
+
+    def neighborhood(self, seg, epsilon: float = None, positions=None):
+        epsilon = self.epsilon if epsilon is None else epsilon
+        if positions is None:
+            return [self.segs[i] for i in np.nonzero(self.distances(seg) <= epsilon)[0]]
+        positions = np.asarray(positions, dtype=np.int64)
+        return [self.segs[i] for i in positions[self.distances(seg, positions) <= epsilon]]
+
+    def neighbor_positions(self, pos: int, epsilon: float = None, positions=None):
+        epsilon = self.epsilon if epsilon is None else epsilon
+        if positions is None:
+            return np.nonzero(self.distances_at(pos) <= epsilon)[0].tolist()
+        positions = np.asarray(positions, dtype=np.int64)
+        return positions[self.distances_at(pos, positions) <= epsilon].tolist()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :index.py
+# target    :segment的空间索引, 通过网格索引对segment的bounding box进行划分, 在neighborhood查询时先剪枝再进行精确距离计算
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 10:02
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from .segment import compare, Segment
+from .distance import SegmentArray, segment_length
+
+tiny_length = 1e-6  # 长度小于该值的segment视为退化的segment, 退化segment之间的距离没有下界, 必须进行精确计算
+
+
+def _bounding_box(seg: Segment):
+    return seg.geometry.box
+
+
+def _box_distance(box_a, box_b):
+    """计算两个bounding box之间的欧式距离, 相交时距离为0"""
+    dx = max(box_a[0] - box_b[2], box_b[0] - box_a[2], 0.0)
+    dy = max(box_a[1] - box_b[3], box_b[1] - box_a[3], 0.0)
+    return math.sqrt(dx * dx + dy * dy)
+
+
+class SegmentGridIndex(object):
+    """segment的网格空间索引, 用于neighborhood查询时的候选集剪枝, 查询结果与暴力计算的结果完全一致.
+    对于不同轨迹的两个segment(longer segment不退化), 记D为两个segment之间的最短欧式距离, 则有:
+        parallel_distance >= gap, perpendicular_distance >= max(l1, l2) / 2, D <= gap + max(l1, l2)
+    其中gap为short segment投影到long segment上后与long segment之间的间隔, l1, l2为垂直距离, 因此get_all_distance >= D / 2,
+    当bounding box之间的距离大于2*epsilon时可以直接剪枝. 以下两种情况不满足该下界, 始终进行精确计算:
+        1. 同一轨迹下的segment, get_all_distance中不包括perpendicular_distance;
+        2. 两个segment都为退化的segment(长度小于tiny_length), parallel_distance可能不参与计算.
+    method
+    ------
+        candidates(seg): 返回seg的候选segment在segs中的位置, 按照位置升序排列
+        neighborhood(seg): 返回seg在距离epsilon范围内的所有segment集合, 顺序与segs中的顺序一致
+        neighbor_positions(pos): 返回第pos个segment在距离epsilon范围内的所有segment的位置, 按照位置升序排列
+    """
+    def __init__(self, segs, epsilon: float = 2.0, cell_size: float = None, max_cells: int = 64, vectorized: bool = False):
+        """
+        parameter
+        ---------
+            segs: List[Segment, ...], 所有的segment集合
+            epsilon: float, 建立索引时使用的距离阈值, 查询时的epsilon不能大于该值
+            cell_size: float, 网格的边长, 默认为剪枝半径
+            max_cells: int, 一个segment最多占用的网格数量, 超过该值的segment放入overflow集合中, 每次查询都进行精确计算
+            vectorized: bool, 是否通过SegmentArray对候选集进行向量化的精确距离计算
+        """
+        self.segs = list(segs)
+        self._vectorized = vectorized
+        self._build(SegmentArray(self.segs), epsilon, cell_size, max_cells)
+
+    @classmethod
+    def from_store(cls, store, epsilon: float = 2.0, cell_size: float = None, max_cells: int = 64):
+        """通过SegmentStore建立索引, 精确距离计算始终使用向量化的方式"""
+        return cls.from_arrays(SegmentArray.from_store(store), epsilon, cell_size, max_cells)
+
+    @classmethod
+    def from_arrays(cls, arrays: SegmentArray, epsilon: float = 2.0, cell_size: float = None, max_cells: int = 64):
+        """通过已有的SegmentArray建立索引, 与arrays共享坐标数组, 精确距离计算始终使用向量化的方式"""
+        index = cls.__new__(cls)
+        index.segs = arrays.segs
+        index._vectorized = True
+        index._build(arrays, epsilon, cell_size, max_cells)
+        return index
+
+    def _build(self, arrays: SegmentArray, epsilon, cell_size, max_cells):
+        self.epsilon = epsilon
+        self.radius = 2.0 * epsilon * (1 + 1e-9) + 1e-9  # 剪枝半径, 保留一定的浮点误差余量
+        self.cell_size = cell_size if cell_size is not None else max(self.radius, 1e-9)
+        self.max_cells = max_cells
+        self._arrays = arrays
+        self._evaluations = 0
+
+        coords = arrays.coords
+        self._boxes = np.column_stack((np.minimum(coords[:, 0], coords[:, 2]), np.minimum(coords[:, 1], coords[:, 3]),
+                                       np.maximum(coords[:, 0], coords[:, 2]), np.maximum(coords[:, 1], coords[:, 3]))).tolist()
+        self._tiny_mask = (segment_length(coords) < tiny_length).tolist()
+        self._tiny = [pos for pos, tiny in enumerate(self._tiny_mask) if tiny]
+        self._grid = defaultdict(list)
+        self._overflow = []
+        self._traj = arrays.traj.tolist()
+        self._traj_members = defaultdict(list)
+        for pos, traj in enumerate(self._traj):
+            self._traj_members[traj].append(pos)
+        for pos, box in enumerate(self._boxes):
+            self._register(pos, box)
+
+    def _register(self, pos, box):
+        x0, y0, x1, y1 = self._cell_range(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.max_cells:
+            self._overflow.append(pos)
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._grid[(cx, cy)].append(pos)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    @property
+    def distance_evaluations(self) -> int:
+        """累计精确计算的segment距离数量, 即剪枝后的候选segment数量"""
+        return self._evaluations + self._arrays.distance_evaluations
+
+    def insert(self, seg: Segment) -> int:
+        """向索引中增加一个segment, 只支持非向量化的索引, 返回segment在索引中的位置"""
+        if self._vectorized:
+            raise ValueError("The vectorized index does not support insert.")
+        pos = len(self.segs)
+        self.segs.append(seg)
+        box = _bounding_box(seg)
+        traj = self._arrays.traj_code(seg.traj_id)
+        tiny = seg.length < tiny_length
+        self._boxes.append(box)
+        self._traj.append(traj)
+        self._traj_members[traj].append(pos)
+        self._tiny_mask.append(tiny)
+        if tiny:
+            self._tiny.append(pos)
+        self._register(pos, box)
+        return pos
+
+    def _cell_range(self, box, margin=0.0):
+        return (int(math.floor((box[0] - margin) / self.cell_size)), int(math.floor((box[1] - margin) / self.cell_size)),
+                int(math.floor((box[2] + margin) / self.cell_size)), int(math.floor((box[3] + margin) / self.cell_size)))
+
+    def _candidates(self, box, traj, tiny):
+        result = set(self._overflow)
+        result.update(self._traj_members.get(traj, ()))
+        if tiny:
+            result.update(self._tiny)
+        x0, y0, x1, y1 = self._cell_range(box, margin=self.radius)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._grid):
+            cells = self._grid.values()
+        else:
+            cells = (self._grid.get((cx, cy), ()) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+        for members in cells:
+            for pos in members:
+                if pos not in result and _box_distance(box, self._boxes[pos]) <= self.radius:
+                    result.add(pos)
+        return sorted(result)
+
+    def candidates(self, seg: Segment):
+        return self._candidates(_bounding_box(seg), self._arrays.traj_code(seg.traj_id), seg.length < tiny_length)
+
+    def candidates_at(self, pos: int):
+        return self._candidates(self._boxes[pos], self._traj[pos], self._tiny_mask[pos])
+
+    def _check_epsilon(self, epsilon):
+        epsilon = self.epsilon if epsilon is None else epsilon
+        if epsilon > self.epsilon:
+            raise ValueError("The query epsilon must not be greater than the index epsilon.")
+        return epsilon
+
+    def neighborhood(self, seg: Segment, epsilon: float = None):
+        epsilon = self._check_epsilon(epsilon)
+        if self._vectorized:
+            return self._arrays.neighborhood(seg, epsilon=epsilon, positions=self.candidates(seg))
+        return [self.segs[pos] for pos in self.neighborhood_positions(seg, epsilon)]
+
+    def neighborhood_positions(self, seg: Segment, epsilon: float = None):
+        """返回任意segment在距离epsilon范围内的所有segment的位置, seg不需要在索引中"""
+        epsilon = self._check_epsilon(epsilon)
+        if self._vectorized:
+            positions = np.asarray(self.candidates(seg), dtype=np.int64)
+            return positions[self._arrays.distances(seg, positions) <= epsilon].tolist()
+        result = []
+        candidates = self.candidates(seg)
+        self._evaluations += len(candidates)
+        for pos in candidates:
+            seg_long, seg_short = compare(seg, self.segs[pos])
+            if seg_long.get_all_distance(seg_short) <= epsilon:
+                result.append(pos)
+        return result
+
+    def neighbor_positions(self, pos: int, epsilon: float = None):
+        epsilon = self._check_epsilon(epsilon)
+        if self._vectorized:
+            return self._arrays.neighbor_positions(pos, epsilon=epsilon, positions=self.candidates_at(pos))
+        seg = self.segs[pos]
+        result = []
+        candidates = self.candidates_at(pos)
+        self._evaluations += len(candidates)
+        for i in candidates:
+            seg_long, seg_short = compare(seg, self.segs[i])
+            if seg_long.get_all_distance(seg_short) <= epsilon:
+                result.append(i)
+        return result
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :loader.py
+# target    :从CSV, Parquet和.npy(可以为内存映射)文件中分块读取(traj_id, t, x, y)格式的轨迹点, 按轨迹分组后生成TrajectoryStore,
+#            不为每个轨迹点创建Point对象, 内存占用由分块大小决定而不是文件大小. 同一条轨迹的点在文件中必须是连续存放的
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 0:10
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import itertools
+import os
+
+import numpy as np
+
+from .store import TrajectoryStore, SegmentStore
+from .partition import partition_trajectory_store
+from .projection import LocalProjection
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+default_columns = ('traj_id', 't', 'x', 'y')  # 轨迹ID, 时间, x坐标, y坐标
+default_chunk_size = 1 << 20  # 每个分块读取的轨迹点数量
+
+
+def _column_indices(columns, names=None):
+    """将columns中的列名或者列序号转换为列序号, names为None时(无表头的CSV和普通二维数组)列名按照default_columns的顺序对应列序号"""
+    if len(columns) != 4:
+        raise ValueError("The parameter 'columns' must give the (traj_id, t, x, y) columns.")
+    indices = []
+    for role, col in enumerate(columns):
+        if col is None:
+            if role != 1:
+                raise ValueError("Only the time column can be omitted.")
+            indices.append(None)
+        elif isinstance(col, (int, np.integer)):
+            indices.append(int(col))
+        elif names is not None:
+            if col not in names:
+                raise ValueError("Column %r is not found in %r" % (col, list(names)))
+            indices.append(list(names).index(col))
+        else:
+            indices.append(default_columns.index(col) if col in default_columns else role)
+    return indices
+
+
+def _split_rows(table, indices):
+    """从二维数组或者结构化数组中取出(traj_id, t, x, y)四列, t列未给定时为None"""
+    traj_id, t, x, y = (None if k is None else table[k] for k in indices)
+    return (np.asarray(traj_id, dtype=np.int64), None if t is None else np.asarray(t, dtype=np.float64),
+            np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+
+
+def iter_csv_rows(path: str, columns=default_columns, chunk_size: int = default_chunk_size, delimiter: str = ',',
+                  header: bool = True):
+    """分块读取CSV文件中的轨迹点, 每次最多读取chunk_size行, 通过numpy直接解析为数组
+    parameter
+    ---------
+        path: str, CSV文件路径
+        columns: Tuple[str or int, ...], (traj_id, t, x, y)四列的列名或者列序号, t可以为None, 此时保持文件中的点顺序
+        chunk_size: int, 每个分块的行数
+        delimiter: str, 分隔符
+        header: bool, 第一行是否为表头
+    return
+    ------
+        Iterator[Tuple[np.ndarray, ...]], 每个分块的(traj_id, t, x, y)数组, traj_id必须为整数
+    """
+    with open(path, 'r') as f:
+        names = [name.strip() for name in f.readline().split(delimiter)] if header else None
+        indices = _column_indices(columns, names)
+        usecols = [k for k in indices if k is not None]
+        positions = [None if k is None else usecols.index(k) for k in indices]
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                break
+            table = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, dtype=np.float64, ndmin=2)
+            yield _split_rows(table.T, positions)
+
+
+def iter_parquet_rows(path: str, columns=default_columns, chunk_size: int = default_chunk_size):
+    """分块读取Parquet文件中的轨迹点, 需要安装pyarrow, 只读取需要的四列
+    parameter
+    ---------
+        path: str, Parquet文件路径
+        columns: Tuple[str, ...], (traj_id, t, x, y)四列的列名, t可以为None
+        chunk_size: int, 每个分块的行数
+    return
+    ------
+        Iterator[Tuple[np.ndarray, ...]], 每个分块的(traj_id, t, x, y)数组
+    """
+    if pq is None:
+        raise ImportError("Reading parquet files requires pyarrow.")
+    parquet = pq.ParquetFile(path)
+    names = parquet.schema_arrow.names
+    indices = _column_indices(columns, names)
+    selected = [names[k] for k in indices if k is not None]
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=selected):
+        table = [None if k is None else batch.column(selected.index(names[k])).to_numpy() for k in indices]
+        yield _split_rows(table, range(4))
+
+
+def iter_array_rows(source, columns=default_columns, chunk_size: int = default_chunk_size):
+    """分块读取.npy文件或者数组中的轨迹点, 文件通过内存映射打开, 每个分块只复制需要的列
+    parameter
+    ---------
+        source: str or np.ndarray, .npy文件路径或者数组, 可以为(P, K)的二维数组或者包含对应字段的结构化数组
+        columns: Tuple[str or int, ...], (traj_id, t, x, y)四列的字段名或者列序号, 普通二维数组使用列名时按照default_columns的顺序对应列序号
+        chunk_size: int, 每个分块的行数
+    return
+    ------
+        Iterator[Tuple[np.ndarray, ...]], 每个分块的(traj_id, t, x, y)数组
+    """
+    array = np.load(source, mmap_mode='r') if isinstance(source, (str, os.PathLike)) else source
+    structured = array.dtype.names is not None
+    if structured:
+        names = array.dtype.names
+        fields = [None if k is None else names[k] for k in _column_indices(columns, names)]
+    else:
+        indices = _column_indices(columns)
+    for start in range(0, len(array), chunk_size):
+        chunk = array[start:start + chunk_size]
+        if structured:
+            yield _split_rows({name: chunk[name] for name in fields if name is not None}, fields)
+        else:
+            yield _split_rows(np.asarray(chunk).T, indices)
+
+
+def _build_store(traj_id: np.ndarray, t: np.ndarray, x: np.ndarray, y: np.ndarray):
+    """将按轨迹连续存放的轨迹点生成TrajectoryStore, 给定时间时每条轨迹内按照时间稳定排序"""
+    starts = np.flatnonzero(np.r_[True, traj_id[1:] != traj_id[:-1]])
+    offsets = np.r_[starts, len(traj_id)].astype(np.int64)
+    coords = np.column_stack((x, y))
+    if t is not None and len(t) > 1:
+        backward = np.diff(t) < 0
+        backward[starts[1:] - 1] = False  # 轨迹之间的时间不需要有序
+        if backward.any():
+            group = np.repeat(np.arange(len(starts)), np.diff(offsets))
+            coords = coords[np.lexsort((t, group))]
+    return TrajectoryStore(coords, offsets, traj_id[starts])
+
+
+def iter_trajectory_chunks(rows):
+    """将分块的轨迹点按照轨迹分组, 每个分块生成一个只包含完整轨迹的TrajectoryStore, 分块末尾未结束的轨迹与下一个分块合并.
+    内存占用由分块大小和最长的轨迹决定
+    parameter
+    ---------
+        rows: Iterable[Tuple[np.ndarray, ...]], iter_csv_rows, iter_parquet_rows或者iter_array_rows返回的分块
+    return
+    ------
+        Iterator[TrajectoryStore], 按照文件顺序的轨迹分块
+    """
+    pending = []  # 上一个分块末尾未结束的轨迹
+    for chunk in rows:
+        if len(chunk[0]) == 0:
+            continue
+        if pending:
+            pending.append(chunk)
+            chunk = tuple(None if parts[0] is None else np.concatenate(parts) for parts in zip(*pending))
+        traj_id = chunk[0]
+        last_start = int(np.flatnonzero(np.r_[True, traj_id[1:] != traj_id[:-1]])[-1])
+        pending = [tuple(None if c is None else c[last_start:] for c in chunk)]
+        if last_start > 0:
+            yield _build_store(*(None if c is None else c[:last_start] for c in chunk))
+    if pending:
+        yield _build_store(*pending[0])
+
+
+def read_trajectories(source, fmt: str = None, columns=default_columns, chunk_size: int = default_chunk_size,
+                      projection: LocalProjection = None, **kwargs):
+    """分块读取轨迹文件, 根据文件扩展名选择读取方式
+    parameter
+    ---------
+        source: str or np.ndarray, 文件路径(.csv, .txt, .parquet, .npy)或者数组
+        fmt: str, 'csv', 'parquet' or 'npy', 为None时根据扩展名判断
+        columns: Tuple[str or int, ...], (traj_id, t, x, y)四列的列名或者列序号
+        chunk_size: int, 每个分块读取的轨迹点数量
+        projection: LocalProjection, 给定时x, y列为经纬度, 读取时逐块投影为平面坐标(米)
+        kwargs: iter_csv_rows的delimiter和header参数
+    return
+    ------
+        Iterator[TrajectoryStore], 每个分块中的完整轨迹, 可以直接传入partition_trajectory_store
+    """
+    if fmt is None:
+        if isinstance(source, np.ndarray):
+            fmt = 'npy'
+        else:
+            fmt = os.path.splitext(str(source))[1].lstrip('.').lower()
+            fmt = 'csv' if fmt == 'txt' else fmt
+    if fmt == 'csv':
+        rows = iter_csv_rows(source, columns=columns, chunk_size=chunk_size, **kwargs)
+    elif fmt == 'parquet':
+        rows = iter_parquet_rows(source, columns=columns, chunk_size=chunk_size)
+    elif fmt == 'npy':
+        rows = iter_array_rows(source, columns=columns, chunk_size=chunk_size)
+    else:
+        raise ValueError("Unknown trajectory file format: %r" % (fmt, ))
+    chunks = iter_trajectory_chunks(rows)
+    if projection is not None:
+        return (projection.project_store(store) for store in chunks)
+    return chunks
+
+
+def load_trajectory_store(source, **kwargs) -> TrajectoryStore:
+    """读取整个轨迹文件为一个TrajectoryStore, 参数与read_trajectories一致"""
+    return TrajectoryStore.concatenate(read_trajectories(source, **kwargs))
+
+
+def partition_file(source, method: str = 'approximate', theta: float = 5.0, epsilon: float = 1.0, cache=None,
+                   **kwargs) -> SegmentStore:
+    """分块读取轨迹文件并逐块进行partition, 同一时刻只保留一个分块的轨迹点
+    parameter
+    ---------
+        source: str or np.ndarray, 轨迹文件路径或者数组
+        method: str, 'approximate' or 'rdp'
+        theta: float, approximate方法的参数
+        epsilon: float, rdp方法的参数
+        cache: PartitionCache, 给定时未变化的轨迹直接读取缓存的partition结果
+        kwargs: read_trajectories的参数
+    return
+    ------
+        SegmentStore, 所有轨迹的分段结果, 按照轨迹在文件中的顺序排列
+    """
+    return SegmentStore.concatenate(partition_trajectory_store(store, method=method, theta=theta, epsilon=epsilon, cache=cache)
+                                    for store in read_trajectories(source, **kwargs))
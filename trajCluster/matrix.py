@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :matrix.py
+# target    :segment之间的距离矩阵, 按照分块(tile)的方式一次性计算所有segment之间的距离, 以稠密矩阵或者稀疏矩阵(只保存不大于cutoff的距离)的方式
+#            存放在内存或者磁盘(memmap)中, 之后对不大于cutoff的任意epsilon进行聚类时直接读取邻域, 不再重复计算距离
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 18:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import json
+import os
+
+import numpy as np
+
+from .distance import SegmentArray, segment_distance_batch
+from .store import SegmentStore
+
+_meta_file = 'meta.json'
+
+
+class SegmentDistanceMatrix(object):
+    """segment距离矩阵, 第i行为第i个segment与所有segment之间的距离, 与SegmentArray.distances_at(i)的计算结果一致, 查询接口与SegmentArray一致,
+    可以通过line_segment_clustering(distance_matrix=...)进行聚类.
+    method
+    ------
+        compute(traj_segments, cutoff, path): 分块计算距离矩阵, path不为None时将矩阵写入到磁盘目录中
+        load(path): 以memmap的方式加载磁盘中的距离矩阵
+        row(pos): 返回第pos个segment保存的邻居位置和距离
+        neighbor_positions(pos, epsilon): 返回第pos个segment在距离epsilon范围内的所有segment的位置, 按照位置升序排列
+    """
+    def __init__(self, size: int, cutoff: float = None, dense: np.ndarray = None, indptr: np.ndarray = None,
+                 indices: np.ndarray = None, data: np.ndarray = None, path: str = None):
+        """
+        parameter
+        ---------
+            size: int, segment的数量
+            cutoff: float, 稀疏矩阵中保存的最大距离, 为None时为稠密矩阵
+            dense: np.ndarray, shape为(N, N)的稠密距离矩阵
+            indptr, indices, data: np.ndarray, CSR格式的稀疏距离矩阵, 第i行的列位置为indices[indptr[i]:indptr[i+1]]
+            path: str, 距离矩阵在磁盘中的目录
+        """
+        self.size = size
+        self.cutoff = cutoff
+        self.dense = dense
+        self.indptr, self.indices, self.data = indptr, indices, data
+        self.path = path
+
+    @property
+    def is_dense(self) -> bool:
+        return self.dense is not None
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def compute(cls, traj_segments, cutoff: float = None, path: str = None, block_size: int = 512):
+        """分块计算距离矩阵, 每次计算block_size * block_size个segment对的距离
+        parameter
+        ---------
+            traj_segments: List[Segment, ...] or SegmentStore, 所有的segment集合
+            cutoff: float, 为None时保存稠密矩阵, 否则只保存距离不大于cutoff的segment对(稀疏矩阵)
+            path: str, 距离矩阵的存放目录, 给定时矩阵逐块写入磁盘, 不在内存中保存完整的矩阵
+            block_size: int, 分块的大小
+        return
+        ------
+            SegmentDistanceMatrix
+        """
+        if isinstance(traj_segments, SegmentStore):
+            arrays = SegmentArray.from_store(traj_segments)
+        else:
+            arrays = SegmentArray(traj_segments)
+        coords, traj = arrays.coords, np.asarray(arrays.traj)
+        size = len(arrays)
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+        if cutoff is None:
+            if path is None:
+                dense = np.empty((size, size), dtype=np.float64)
+            else:
+                dense = np.lib.format.open_memmap(os.path.join(path, 'dense.npy'), mode='w+', dtype=np.float64, shape=(size, size))
+            for r0 in range(0, size, block_size):
+                r1 = min(r0 + block_size, size)
+                for c0 in range(0, size, block_size):
+                    c1 = min(c0 + block_size, size)
+                    dense[r0:r1, c0:c1] = segment_distance_batch(coords[r0:r1], coords[c0:c1], traj[r0:r1], traj[c0:c1])
+            if path is not None:
+                dense.flush()
+                del dense
+                cls._write_meta(path, 'dense', size, cutoff)
+                return cls.load(path)
+            return cls(size, cutoff, dense=dense)
+
+        counts = np.zeros(size, dtype=np.int64)
+        if path is None:
+            indices_parts, data_parts = [], []
+        else:
+            indices_file = open(os.path.join(path, 'indices.bin'), 'wb')
+            data_file = open(os.path.join(path, 'data.bin'), 'wb')
+        try:
+            for r0 in range(0, size, block_size):
+                r1 = min(r0 + block_size, size)
+                rows, cols, values = [], [], []
+                for c0 in range(0, size, block_size):
+                    c1 = min(c0 + block_size, size)
+                    tile = segment_distance_batch(coords[r0:r1], coords[c0:c1], traj[r0:r1], traj[c0:c1])
+                    r, c = np.nonzero(tile <= cutoff)
+                    rows.append(r)
+                    cols.append(c + c0)
+                    values.append(tile[r, c])
+                # 各列块按列的顺序排列, 按行稳定排序后每一行的列位置保持升序
+                rows = np.concatenate(rows)
+                order = np.argsort(rows, kind='stable')
+                block_indices = np.concatenate(cols)[order].astype(np.int32)
+                block_data = np.concatenate(values)[order]
+                counts[r0:r1] = np.bincount(rows, minlength=r1 - r0)
+                if path is None:
+                    indices_parts.append(block_indices)
+                    data_parts.append(block_data)
+                else:
+                    indices_file.write(block_indices.tobytes())
+                    data_file.write(block_data.tobytes())
+        finally:
+            if path is not None:
+                indices_file.close()
+                data_file.close()
+
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        if path is not None:
+            np.save(os.path.join(path, 'indptr.npy'), indptr)
+            cls._write_meta(path, 'sparse', size, cutoff)
+            return cls.load(path)
+        indices = np.concatenate(indices_parts) if indices_parts else np.empty(0, dtype=np.int32)
+        data = np.concatenate(data_parts) if data_parts else np.empty(0, dtype=np.float64)
+        return cls(size, cutoff, indptr=indptr, indices=indices, data=data)
+
+    @staticmethod
+    def _write_meta(path, layout, size, cutoff):
+        with open(os.path.join(path, _meta_file), 'w') as f:
+            json.dump({'layout': layout, 'size': size, 'cutoff': cutoff}, f)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(os.path.join(path, _meta_file)) as f:
+            meta = json.load(f)
+        size, cutoff = meta['size'], meta['cutoff']
+        if meta['layout'] == 'dense':
+            return cls(size, cutoff, dense=np.load(os.path.join(path, 'dense.npy'), mmap_mode='r'), path=path)
+        indptr = np.load(os.path.join(path, 'indptr.npy'))
+        nnz = int(indptr[-1])
+        if nnz == 0:
+            indices, data = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        else:
+            indices = np.memmap(os.path.join(path, 'indices.bin'), dtype=np.int32, mode='r', shape=(nnz, ))
+            data = np.memmap(os.path.join(path, 'data.bin'), dtype=np.float64, mode='r', shape=(nnz, ))
+        return cls(size, cutoff, indptr=indptr, indices=indices, data=data, path=path)
+
+    def row(self, pos: int):
+        """返回第pos个segment保存的(邻居位置数组, 距离数组), 稠密矩阵时为所有的segment"""
+        if self.is_dense:
+            return np.arange(self.size), np.asarray(self.dense[pos])
+        start, end = self.indptr[pos], self.indptr[pos + 1]
+        return np.asarray(self.indices[start:end]), np.asarray(self.data[start:end])
+
+    def _check_epsilon(self, epsilon):
+        epsilon = self.cutoff if epsilon is None else epsilon
+        if epsilon is None:
+            raise ValueError("The query epsilon must be given for the dense distance matrix.")
+        if self.cutoff is not None and epsilon > self.cutoff:
+            raise ValueError("The query epsilon must not be greater than the matrix cutoff.")
+        return epsilon
+
+    def neighbor_positions(self, pos: int, epsilon: float = None):
+        epsilon = self._check_epsilon(epsilon)
+        if self.is_dense:
+            return np.nonzero(np.asarray(self.dense[pos]) <= epsilon)[0].tolist()
+        positions, distances = self.row(pos)
+        return positions[distances <= epsilon].tolist()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :optics.py
+# target    :基于OPTICS的segment聚类, 对生成epsilon计算一次可达距离排序(reachability ordering), 之后对不大于生成epsilon的任意epsilon直接
+#            提取聚类结果, 避免调参时重复进行O(n^2)的dbscan聚类
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 19:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import heapq
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from .index import SegmentGridIndex, tiny_length
+from .distance import SegmentArray, segment_distance_batch, segment_length
+from .store import SegmentStore
+from .cluster import _collect_clusters, min_traj_cluster
+from . import profiling as _profiling
+
+
+class SegmentOrdering(object):
+    """OPTICS的计算结果, 保存segment的访问顺序, 可达距离和核心距离
+    attribute
+    ---------
+        segs: List[Segment, ...] or SegmentStore, 所有的segment集合
+        epsilon: float, 生成排序时使用的epsilon, 提取聚类时的epsilon不能大于该值
+        min_lines: int, 核心segment的邻域(包括自身)中segment数量的最小阈值
+        ordering: np.ndarray, segment位置的访问顺序
+        reachability: np.ndarray, 每个segment的可达距离, 未定义时为inf
+        core_distance: np.ndarray, 每个segment的核心距离, 不是核心segment时为inf
+        arrays: SegmentArray, segs的坐标和轨迹编号数组, 提取边界segment时查询邻域
+    method
+    ------
+        labels(epsilon): 返回epsilon下每个segment的cluster_id
+        extract(epsilon): 返回epsilon下与line_segment_clustering结构一致的(cluster_dict, remove_cluster)
+        sweep(epsilons): 返回多个epsilon下的类簇数量和噪声比例
+    """
+    def __init__(self, segs, epsilon, min_lines, ordering, reachability, core_distance, arrays: SegmentArray = None):
+        if arrays is None:
+            arrays = SegmentArray.from_store(segs, epsilon=epsilon) if isinstance(segs, SegmentStore) else SegmentArray(segs, epsilon=epsilon)
+        self.segs = segs
+        self.arrays = arrays
+        self.epsilon = epsilon
+        self.min_lines = min_lines
+        self.ordering = ordering
+        self.reachability = reachability
+        self.core_distance = core_distance
+
+    def __len__(self):
+        return len(self.ordering)
+
+    def _extract_dbscan(self, epsilon):
+        """ExtractDBSCAN-Clustering: 按照访问顺序, 可达距离大于epsilon且为核心segment时开始新的类簇, 否则为噪声.
+        核心segment的划分与dbscan一致, 边界segment只能归属于访问顺序中可达的类簇"""
+        labels = [-1] * len(self)
+        cluster_id = -1
+        reachability, core_distance = self.reachability.tolist(), self.core_distance.tolist()
+        for pos in self.ordering.tolist():
+            if reachability[pos] > epsilon:
+                if core_distance[pos] <= epsilon:
+                    cluster_id += 1
+                    labels[pos] = cluster_id
+            else:
+                labels[pos] = cluster_id
+        return labels
+
+    def _labels(self, epsilon: float = None):
+        """计算与line_segment_clustering一致的cluster_id:
+            1. 核心segment(core_distance不大于epsilon)的划分通过ExtractDBSCAN得到, 类簇按照其中第一个核心segment(dbscan中开始扩展的segment)的位置编号;
+            2. 非核心segment重新查询epsilon范围内的核心segment, 距离从核心segment计算, 与dbscan的邻域一致. dbscan开始扩展一个类簇时覆盖起始segment
+               邻域中已有的cluster_id, 扩展过程中只分配未分配的segment, 因此非核心segment属于邻域包含它的起始segment中编号最大的类簇,
+               没有时属于编号最小的可达类簇.
+        return
+        ------
+            Tuple[np.ndarray, np.ndarray], 最终的cluster_id, 以及dbscan按顺序遍历到每个segment时的cluster_id(只考虑起始segment不在其之后的类簇,
+            line_segment_clustering按照该值将segment放入类簇的集合中, 之后被其他类簇覆盖的边界segment仍然在原来的集合中)
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        if epsilon > self.epsilon:
+            raise ValueError("The extract epsilon must not be greater than the generating epsilon.")
+        labels = np.full(len(self), -1, dtype=np.int64)
+        core_pos = np.flatnonzero(self.core_distance <= epsilon)
+        if not len(core_pos):
+            return labels, labels.copy()
+        extracted = np.asarray(self._extract_dbscan(epsilon), dtype=np.int64)[core_pos]
+        values, first = np.unique(extracted, return_index=True)  # core_pos升序, first为每个类簇中第一个核心segment
+        order = np.argsort(core_pos[first], kind='stable')
+        mapping = np.empty(values.max() + 1, dtype=np.int64)
+        mapping[values[order]] = np.arange(len(values))
+        labels[core_pos] = core_labels = mapping[extracted]
+        is_seed = np.zeros(len(core_pos), dtype=bool)
+        is_seed[first] = True
+        seeds = core_pos[first[order]]  # 每个类簇的起始segment, 升序
+        visited = labels.copy()
+
+        coords, traj = self.arrays.coords, self.arrays.traj
+        core_arrays = SegmentArray.from_arrays(coords[core_pos], traj[core_pos], epsilon)
+        index = SegmentGridIndex.from_arrays(core_arrays, epsilon=epsilon)
+        border = np.ones(len(self), dtype=bool)
+        border[core_pos] = False
+        for pos in np.flatnonzero(border).tolist():
+            x0, y0, x1, y1 = coords[pos].tolist()
+            box = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            candidates = np.asarray(index._candidates(box, int(traj[pos]), bool(segment_length(coords[pos]) < tiny_length)),
+                                    dtype=np.int64)
+            if not len(candidates):
+                continue
+            distances = segment_distance_batch(core_arrays.coords[candidates], coords[pos:pos+1], core_arrays.traj[candidates],
+                                               traj[pos:pos+1])[:, 0]
+            near = candidates[distances <= epsilon]
+            if len(near):
+                reached, seeded = core_labels[near], core_labels[near[is_seed[near]]]
+                labels[pos] = seeded.max() if len(seeded) else reached.min()
+                started = np.searchsorted(seeds, pos)  # 遍历到pos时已经开始扩展的类簇数量
+                reached, seeded = reached[reached < started], seeded[seeded < started]
+                visited[pos] = seeded.max() if len(seeded) else (reached.min() if len(reached) else -1)
+        return labels, visited
+
+    def labels(self, epsilon: float = None):
+        """返回epsilon下每个segment的cluster_id, 与line_segment_clustering更新后的cluster_id一致"""
+        return self._labels(epsilon)[0].tolist()
+
+    def extract(self, epsilon: float = None):
+        """
+        parameter
+        ---------
+            epsilon: float, 提取聚类时的距离阈值, 默认为生成epsilon
+        return
+        ------
+            Tuple[Dict[int, List[Segment, ...]], ...], 返回聚类的集合和不属于聚类的集合, 与line_segment_clustering的返回结果一致,
+            同时更新segs中的cluster_id
+        """
+        labels, visited = self._labels(epsilon)
+        position_dict = defaultdict(list)
+        for pos, label in enumerate(visited.tolist()):
+            if label != -1:
+                position_dict[label].append(pos)
+        return _collect_clusters(self.segs, labels.tolist(), self._traj_ids(), position_dict)
+
+    def _traj_ids(self):
+        if isinstance(self.segs, SegmentStore):
+            return self.segs.traj_id.tolist()
+        return [seg.traj_id for seg in self.segs]
+
+    def sweep(self, epsilons):
+        """
+        parameter
+        ---------
+            epsilons: Iterable[float], 需要评估的epsilon列表
+        return
+        ------
+            List[Dict[str, float], ...], 每个epsilon下的类簇数量(clusters), 因轨迹数量不足删除的类簇数量(removed)和噪声segment的比例(noise_ratio)
+        """
+        traj_ids = self._traj_ids()
+        result = []
+        for epsilon in epsilons:
+            labels, visited = self._labels(epsilon)
+            cluster_traj = defaultdict(set)
+            for pos in np.nonzero(visited != -1)[0].tolist():
+                cluster_traj[visited[pos]].add(traj_ids[pos])
+            removed = sum(1 for v in cluster_traj.values() if len(v) < min_traj_cluster)
+            result.append({'epsilon': epsilon, 'clusters': len(cluster_traj) - removed, 'removed': removed,
+                           'noise_ratio': float(np.mean(labels == -1)) if len(labels) else 0.0})
+        return result
+
+
+@_profiling.profiled('optics')
+def optics_ordering(traj_segments, epsilon: float = 2.0, min_lines: int = 5, use_index: bool = False, distance_matrix=None):
+    """计算segment的OPTICS排序, 邻域和核心segment的定义与line_segment_clustering一致(邻域包括segment自身, 数量不小于min_lines为核心segment),
+    之后通过SegmentOrdering.extract对不大于epsilon的任意值提取dbscan的聚类结果, 与line_segment_clustering的结果一致
+    (提取时只对非核心segment重新查询邻域中的核心segment).
+    parameter
+    ---------
+        traj_segments: List[Segment, ...] or SegmentStore, 所有轨迹的partition划分后的segment集合.
+        epsilon: float, 生成排序的距离阈值, 即之后可以提取的最大epsilon
+        min_lines: int, 核心segment的邻域中segment数量的最小阈值
+        use_index: bool, 是否使用网格空间索引对邻域查询进行剪枝
+        distance_matrix: SegmentDistanceMatrix, 预先计算的距离矩阵, 给定时直接读取邻域, epsilon不能大于矩阵的cutoff
+    return
+    ------
+        SegmentOrdering
+    """
+    if isinstance(traj_segments, SegmentStore):
+        segs = traj_segments
+        arrays = SegmentArray.from_store(segs, epsilon=epsilon)
+    else:
+        segs = list(traj_segments)
+        arrays = SegmentArray(segs, epsilon=epsilon)
+    size = len(arrays)
+
+    if distance_matrix is not None:
+        if len(distance_matrix) != size:
+            raise ValueError("The distance matrix size does not match the number of segments.")
+        if distance_matrix.cutoff is not None and epsilon > distance_matrix.cutoff:
+            raise ValueError("The epsilon must not be greater than the matrix cutoff.")
+
+        def neighbor_distances(pos):
+            positions, distances = distance_matrix.row(pos)
+            mask = distances <= epsilon
+            return positions[mask], distances[mask]
+    else:
+        index = None
+        if use_index:
+            index = SegmentGridIndex.from_arrays(arrays, epsilon=epsilon)
+
+        def neighbor_distances(pos):
+            positions = np.arange(size) if index is None else np.asarray(index.candidates_at(pos), dtype=np.int64)
+            distances = arrays.distances_at(pos, positions)
+            mask = distances <= epsilon
+            return positions[mask], distances[mask]
+
+    reachability = np.full(size, np.inf)
+    core_distance = np.full(size, np.inf)
+    processed = np.zeros(size, dtype=bool)
+    ordering = []
+    core_rank = max(int(math.ceil(min_lines)), 1) - 1  # 核心距离为第min_lines近的segment的距离(包括自身)
+
+    def process(pos, seeds):
+        processed[pos] = True
+        ordering.append(pos)
+        positions, distances = neighbor_distances(pos)
+        if len(positions) < min_lines:
+            return
+        core = float(np.partition(distances, core_rank)[core_rank])
+        core_distance[pos] = core
+        for other, dist in zip(positions.tolist(), np.maximum(distances, core).tolist()):
+            if not processed[other] and dist < reachability[other]:
+                reachability[other] = dist
+                heapq.heappush(seeds, (dist, other))
+
+    for pos in range(size):
+        if processed[pos]:
+            continue
+        seeds = []
+        process(pos, seeds)
+        while seeds:
+            dist, other = heapq.heappop(seeds)
+            if processed[other] or dist > reachability[other]:
+                continue
+            process(other, seeds)
+    return SegmentOrdering(segs, epsilon, min_lines, np.asarray(ordering, dtype=np.int64), reachability, core_distance, arrays)
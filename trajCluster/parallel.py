@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :parallel.py
+# target    :多进程并行计算所有segment的epsilon邻域, segment的坐标数组和轨迹编号数组通过共享内存传递给worker进程, 不对Segment列表进行pickle
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 20:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .distance import SegmentArray
+from .index import SegmentGridIndex
+
+_worker = dict()  # worker进程中共享内存的句柄和查询引擎
+
+
+def _to_shared(array: np.ndarray):
+    """将数组复制到新建的共享内存中, 返回(SharedMemory, (name, shape, dtype))"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(coords_spec, traj_spec, epsilon, use_index):
+    coords_shm, coords = _attach(coords_spec)
+    traj_shm, traj = _attach(traj_spec)
+    arrays = SegmentArray.from_arrays(coords, traj, epsilon)
+    _worker['shm'] = (coords_shm, traj_shm)
+    _worker['epsilon'] = epsilon
+    _worker['engine'] = SegmentGridIndex.from_arrays(arrays, epsilon=epsilon) if use_index else arrays
+
+
+def _neighbor_chunk(bounds):
+    start, end = bounds
+    engine, epsilon = _worker['engine'], _worker['epsilon']
+    evaluations = engine.distance_evaluations
+    neighbors = [engine.neighbor_positions(pos, epsilon) for pos in range(start, end)]
+    return neighbors, engine.distance_evaluations - evaluations
+
+
+def parallel_neighbor_positions(arrays: SegmentArray, epsilon: float, n_jobs: int = None, use_index: bool = False,
+                                chunk_size: int = None, return_evaluations: bool = False):
+    """并行计算每个segment在距离epsilon范围内的所有segment的位置, 结果与arrays.neighbor_positions(pos, epsilon)逐个计算的结果一致
+    parameter
+    ---------
+        arrays: SegmentArray, segment集合的数组表示
+        epsilon: float, segment之间的距离度量阈值
+        n_jobs: int, worker进程数量, 为None或者-1时使用所有的cpu, 为1时不创建进程池直接串行计算
+        use_index: bool, worker中是否使用网格空间索引对候选集剪枝
+        chunk_size: int, 每个任务包含的segment数量, 默认每个worker分配4个任务
+        return_evaluations: bool, 是否同时返回所有worker计算的segment距离数量
+    return
+    ------
+        List[List[int, ...], ...], 第pos个元素为第pos个segment的邻域位置列表, 按照位置升序排列,
+        return_evaluations为True时返回(邻域位置列表, 距离计算数量)
+    """
+    size = len(arrays)
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else n_jobs
+    if chunk_size is None:
+        chunk_size = max(1, int(math.ceil(size / float(n_jobs * 4))))
+    chunks = [(i, min(i + chunk_size, size)) for i in range(0, size, chunk_size)]
+    if n_jobs == 1 or len(chunks) <= 1:
+        engine = SegmentGridIndex.from_arrays(arrays, epsilon=epsilon) if use_index else arrays
+        evaluations = engine.distance_evaluations
+        neighbors = [engine.neighbor_positions(pos, epsilon) for pos in range(size)]
+        return (neighbors, engine.distance_evaluations - evaluations) if return_evaluations else neighbors
+
+    coords_shm, coords_spec = _to_shared(np.ascontiguousarray(arrays.coords, dtype=np.float64))
+    traj_shm, traj_spec = _to_shared(np.ascontiguousarray(arrays.traj, dtype=np.int64))
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(coords_spec, traj_spec, epsilon, use_index)) as pool:
+            results = list(pool.map(_neighbor_chunk, chunks))
+    finally:
+        for shm in (coords_shm, traj_shm):
+            shm.close()
+            shm.unlink()
+    neighbors = [item for chunk, _ in results for item in chunk]
+    return (neighbors, sum(evaluations for _, evaluations in results)) if return_evaluations else neighbors
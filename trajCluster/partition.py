@@ -8,16 +8,25 @@
 # date      :2019/4/2 9:23
 # log       :包含修改时间、修改人、修改line及原因
 # --------------------------------------------------------------------------------
+import functools
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 
 from .segment import Segment
-from .point import _point2line_distance
+from .point import Point
+from .distance import segment_components, point2line_distances
+from .store import TrajectoryStore, TrajectoryView, SegmentStore, _as_coords
+from .backend import get_backend
+from . import profiling as _profiling
 
 
 eps = 1e-12   # defined the segment length theta, if length < eps then l_h=0
 
 
-def segment_mdl_comp(traj, start_index, current_index, typed='par'):
+def segment_mdl_comp(traj, start_index, current_index, typed='par', backend=None):
     """计算MDL principle, MDL包括了两部分: L(H)和L(D|H), 在后面使用时也有'par'和'nopar'两种情况, 不同的情况下计算方式不同.其计算公式参考论文
     <<Trajectory Clustering: A Partition-and-Group Framework>>中的part3-TRAJECTORY PARTITIONING, 具体公式主要在(6), (7)两个.
     parameter
@@ -26,6 +35,7 @@ def segment_mdl_comp(traj, start_index, current_index, typed='par'):
         start_index: int, 开始的索引, 轨迹中的开始索引位置.
         current_index: int, 当前索引位置
         typed: str, 'par' or ‘nopar’两个参数可选, 对应不同的计算结果
+        backend: str or DistanceBackend, 距离计算后端, 给定时通过后端一次性计算所有子segment的perpendicular和angle距离
     return
     ------
         float, MDL的值, 在par的模式下包括了L(H)和L(D|H)两个部分, nopar模式只有L(H)部分"""
@@ -41,13 +51,18 @@ def segment_mdl_comp(traj, start_index, current_index, typed='par'):
             length_hypothesis = math.log2(seg.length)
 
     # compute the segment hypothesis
-    for i in range(start_index, current_index, 1):
-        sub_seg = Segment(traj[i], traj[i+1])  # 定义子segment
-        if typed == 'par' or typed == 'PAR':
-            length_data_hypothesis_perpend += seg.perpendicular_distance(sub_seg)
-            length_data_hypothesis_angle += seg.angle_distance(sub_seg)
-        elif typed == "nopar" or typed == "NOPAR":
-            length_hypothesis += sub_seg.length
+    if backend is not None and (typed == 'par' or typed == 'PAR'):
+        sub_segs = [Segment(traj[i], traj[i+1]) for i in range(start_index, current_index, 1)]
+        perpend, angle = get_backend(backend).mdl_components(seg, sub_segs)
+        length_data_hypothesis_perpend, length_data_hypothesis_angle = sum(perpend.tolist()), sum(angle.tolist())
+    else:
+        for i in range(start_index, current_index, 1):
+            sub_seg = Segment(traj[i], traj[i+1])  # 定义子segment
+            if typed == 'par' or typed == 'PAR':
+                length_data_hypothesis_perpend += seg.perpendicular_distance(sub_seg)
+                length_data_hypothesis_angle += seg.angle_distance(sub_seg)
+            elif typed == "nopar" or typed == "NOPAR":
+                length_hypothesis += sub_seg.length
 
     if typed == 'par' or typed == 'PAR':
         if length_data_hypothesis_perpend > eps:
@@ -64,57 +79,337 @@ def segment_mdl_comp(traj, start_index, current_index, typed='par'):
         raise ValueError("The parameter 'typed' given value has error!")
 
 
-def approximate_trajectory_partitioning(traj, traj_id=None, theta=5.0):
+def _mdl_costs(xs, ys, sub_len, start_index, first_index, last_index):
+    """批量计算start_index到[first_index, last_index]中每个current_index的MDL, 与segment_mdl_comp的计算结果一致.
+    'par'中的perpendicular和angle距离通过segment_components对所有的子segment一次性计算, 'nopar'通过子segment长度的前缀累加计算.
+    parameter
+    ---------
+        xs, ys: np.ndarray, 轨迹点的坐标数组
+        sub_len: np.ndarray, 子segment(i, i+1)的长度数组
+        start_index: int, 开始的索引
+        first_index, last_index: int, current_index的取值范围
+    return
+    ------
+        Iterator[Tuple[float, float]], 每个current_index对应的(cost_par, cost_nopar)
+    """
+    curr = np.arange(first_index, last_index + 1)
+    sx, sy = xs[start_index], ys[start_index]
+    hyp_len = np.array([math.sqrt(math.pow(xs[c] - sx, 2) + math.pow(ys[c] - sy, 2)) for c in curr.tolist()])
+    angle, _, perpend = segment_components(sx, sy, xs[curr][:, None], ys[curr][:, None],
+                                           xs[start_index:last_index][None, :], ys[start_index:last_index][None, :],
+                                           xs[start_index+1:last_index+1][None, :], ys[start_index+1:last_index+1][None, :],
+                                           l_len=hyp_len[:, None], s_len=sub_len[None, start_index:last_index])
+    mask = np.arange(start_index, last_index)[None, :] < curr[:, None]
+    perpend_sum = np.cumsum(np.where(mask, perpend, 0.0), axis=1)[:, -1].tolist()
+    angle_sum = np.cumsum(np.where(mask, angle, 0.0), axis=1)[:, -1].tolist()
+    nopar_sum = np.cumsum(sub_len[start_index:last_index])[curr - start_index - 1].tolist()
+
+    for k, length in enumerate(hyp_len.tolist()):
+        cost_par = 0 if length < eps else math.log2(length)
+        if perpend_sum[k] > eps:
+            cost_par += math.log2(perpend_sum[k])
+        if angle_sum[k] > eps:
+            cost_par += math.log2(angle_sum[k])
+        cost_nopar = 0 if nopar_sum[k] < eps else math.log2(nopar_sum[k])
+        yield cost_par, cost_nopar
+
+
+def clean_trajectory_index(traj, tolerance: float = 1e-6, stationary_radius: float = None, timestamps=None,
+                           time_tolerance: float = None):
+    """轨迹点的清洗, 计算需要保留的轨迹点, 删除重复的轨迹点并将停留点合并为一个点, 避免partition时产生长度为0的segment.
+    以最近一个保留的点为锚点, 与锚点的距离不大于radius = max(tolerance, stationary_radius)的点被删除, 因此缓慢漂移的轨迹不会被整体删除,
+    保留的相邻两点之间的距离都大于radius. 给定timestamps和time_tolerance时, 只有与前一个点的时间间隔不大于time_tolerance的点才会被删除.
+    第一个点始终保留, 最后一个点除非与锚点完全重合也会保留, 保证移动的轨迹至少有一个长度不为0的segment; 被删除的点与某个保留的点之间的距离
+    都不大于radius.
+    parameter
+    ---------
+        traj: List[Point, ...] or np.ndarray or TrajectoryView, 轨迹
+        tolerance: float, 重复点的距离阈值
+        stationary_radius: float, 停留点的距离阈值, 为None时只删除重复点
+        timestamps: np.ndarray, 轨迹点的时间
+        time_tolerance: float, 时间间隔阈值
+    return
+    ------
+        Tuple[np.ndarray, int], (保留的轨迹点索引数组, 删除的轨迹点数量)
+    """
+    coords = _as_coords(traj)
+    size = len(coords)
+    if size < 2:
+        return np.arange(size), 0
+    step = np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1]))
+    radius = max(tolerance, stationary_radius or 0.0)
+    close_in_time = np.ones(size - 1, dtype=bool)
+    if timestamps is not None and time_tolerance is not None:
+        close_in_time = np.diff(np.asarray(timestamps, dtype=np.float64)) <= time_tolerance
+    candidates = np.flatnonzero((step <= 2 * radius) & close_in_time) + 1  # 与锚点的距离不大于radius时, 与前一个点的距离不大于2 * radius
+    if len(candidates) == 0:
+        return np.arange(size), 0
+
+    # 锚点随着保留的点逐个向后移动, 非候选点都保留并成为新的锚点, 只需要在候选点上逐个判断
+    index = np.arange(size)
+    is_candidate = np.zeros(size, dtype=bool)
+    is_candidate[candidates] = True
+    last_plain = np.maximum.accumulate(np.where(is_candidate, 0, index)).tolist()  # 每个点之前(包括自身)最近的非候选点
+    xs, ys = coords[:, 0].tolist(), coords[:, 1].tolist()
+    removed = np.zeros(size, dtype=bool)
+    anchor = 0
+    for i in candidates.tolist():
+        anchor = max(anchor, last_plain[i])
+        if math.hypot(xs[i] - xs[anchor], ys[i] - ys[anchor]) <= radius:
+            removed[i] = True
+        else:
+            anchor = i
+    if removed[-1] and (xs[-1], ys[-1]) != (xs[anchor], ys[anchor]):
+        removed[-1] = False
+    kept = np.flatnonzero(~removed)
+    return kept, size - len(kept)
+
+
+def clean_trajectory(traj, tolerance: float = 1e-6, stationary_radius: float = None, timestamps=None,
+                     time_tolerance: float = None):
+    """清洗轨迹, 参数与clean_trajectory_index一致
+    return
+    ------
+        Tuple[np.ndarray, int], (清洗后的(N, 2)坐标数组, 删除的轨迹点数量)
+    """
+    kept, removed = clean_trajectory_index(traj, tolerance, stationary_radius, timestamps, time_tolerance)
+    return _as_coords(traj)[kept], removed
+
+
+def _cleaned(traj, clean):
+    """根据clean参数清洗轨迹, 返回(清洗后的轨迹, 保留的轨迹点索引), clean为None时不清洗"""
+    if clean is None:
+        return traj, None
+    coords = _as_coords(traj)
+    kept, removed = clean_trajectory_index(coords, **clean)
+    _profiling.count('partition.cleaned_points', removed)
+    return coords[kept], kept
+
+
+def _partition_indices(traj, method: str, theta: float, epsilon: float, clean: dict = None, cache=None):
+    """清洗并partition一条轨迹, 返回原始轨迹中每个分段segment的起止点索引, 给定cache(PartitionCache)时优先读取缓存的结果"""
+    if cache is not None:
+        key = cache.key(traj, method, theta, epsilon, clean)
+        partition_indices = cache.get(key)
+        if partition_indices is None:
+            partition_indices = _partition_indices(traj, method, theta, epsilon, clean)
+            cache.put(key, partition_indices)
+        return partition_indices
+    cleaned, kept = _cleaned(traj, clean)
+    if method == 'approximate':
+        partition_indices = _approximate_partition_indices(cleaned, theta)
+    else:
+        partition_indices = _rdp_partition_indices(cleaned, epsilon)
+    if kept is None:
+        return partition_indices
+    kept = kept.tolist()
+    return [(kept[i], kept[j]) for i, j in partition_indices]
+
+
+def _approximate_partition_indices(traj, theta=5.0, batch_size=8, max_batch_elements=1 << 22):
+    """计算approximate_trajectory_partitioning中的特征点, 返回每个分段segment的起止点索引: List[(start_index, end_index), ...].
+    对同一个start_index的多个current_index进行批量计算, 未找到特征点时批量的大小加倍, 结果与逐个调用segment_mdl_comp一致."""
+    coords = _as_coords(traj)
+    xs, ys = coords[:, 0], coords[:, 1]
+    size = len(coords)
+    _xs, _ys = xs.tolist(), ys.tolist()
+    sub_len = np.array([math.sqrt(math.pow(_xs[i+1] - _xs[i], 2) + math.pow(_ys[i+1] - _ys[i], 2)) for i in range(size - 1)])
+
+    partition_indices = []
+    start_index, first_index, batch = 0, 1, batch_size
+    mdl_evaluations, distance_evaluations = 0, 0
+    while first_index < size:
+        batch = max(1, min(batch, max_batch_elements // (first_index - start_index + batch)))
+        last_index = min(first_index + batch - 1, size - 1)
+        mdl_evaluations += last_index - first_index + 1
+        distance_evaluations += (last_index - first_index + 1) * (last_index - start_index)
+        for curr_index, (cost_par, cost_nopar) in enumerate(_mdl_costs(xs, ys, sub_len, start_index, first_index, last_index),
+                                                            start=first_index):
+            if cost_par > (cost_nopar+theta):
+                partition_indices.append((start_index, curr_index-1))
+                start_index, first_index, batch = curr_index - 1, curr_index, batch_size
+                break
+        else:
+            first_index, batch = last_index + 1, batch * 2
+    partition_indices.append((start_index, size-1))
+    _profiling.count('partition.mdl_evaluations', mdl_evaluations)
+    _profiling.count('partition.distance_evaluations', distance_evaluations)
+    return partition_indices
+
+
+@_profiling.profiled('partition.approximate')
+def approximate_trajectory_partitioning(traj, traj_id=None, theta=5.0, clean: dict = None, cache=None):
     """按照论文中的算法流程实现轨迹的partition部分, 主要通过MDL来确定特征点并实现的轨迹分段, 其中theta可以视为惩罚参数,若theta越大那么轨迹
     压缩率越大.
     parameter
     ---------
-        traj: List[Point[x, y], ...], 一个完整轨迹的列表, 其中轨迹点必须为Point类型.
+        traj: List[Point[x, y], ...], 一个完整轨迹的列表, 其中轨迹点必须为Point类型, 也可以为(N, 2)的坐标数组或者TrajectoryView.
         traj_id: int, 轨迹ID
         theta: float, 可是视为轨迹压缩率的控制参数, 在原始的论文中无次参数.
+        clean: dict, 给定时在partition之前通过clean_trajectory_index清洗轨迹点, 为清洗的参数, 如{'tolerance': 1e-6, 'stationary_radius': 2.0},
+            segment的起止点仍然为原始轨迹中的点
+        cache: PartitionCache, 给定时相同的轨迹和参数直接读取磁盘中缓存的partition结果
     return
     ------
         List[Segment[Point, Point], ...], 返回所有的分段后的轨迹列表.
     """
-    size = len(traj)
-    start_index: int = 0; length: int = 1
+    if isinstance(traj, np.ndarray):
+        traj = TrajectoryView(np.ascontiguousarray(traj, dtype=np.float64).reshape(-1, 2))
+    return [Segment(traj[i], traj[j], traj_id=traj_id, cluster_id=-1)
+            for i, j in _partition_indices(traj, 'approximate', theta, None, clean, cache)]
 
-    partition_trajectory = []
-    while (start_index + length) < size:
-        curr_index = start_index + length
-        cost_par = segment_mdl_comp(traj, start_index, curr_index, typed='par')
-        cost_nopar = segment_mdl_comp(traj, start_index, curr_index, typed='nopar')
-        if cost_par > (cost_nopar+theta):
-            seg = Segment(traj[start_index], traj[curr_index-1], traj_id=traj_id)
-            partition_trajectory.append(seg)
-            start_index = curr_index - 1
-            length = 1
-        else:
-            length += 1
-    seg = Segment(traj[start_index], traj[size-1], traj_id=traj_id, cluster_id=-1)
-    partition_trajectory.append(seg)
-    return partition_trajectory
 
+def _rdp_partition_indices(traj, epsilon=1.0):
+    """计算rdp_trajectory_partitioning中的分段结果, 返回每个分段segment的起止点索引: List[(start_index, end_index), ...].
+    通过显式的栈代替递归, 在索引区间上进行计算而不复制轨迹, 区间内所有点到起止点连线的距离通过numpy一次性计算."""
+    coords = _as_coords(traj)
+    xs, ys = coords[:, 0], coords[:, 1]
+    partition_indices = []
+    stack = [(0, len(coords) - 1)]
+    distance_evaluations = 0
+    while stack:
+        start_index, end_index = stack.pop()
+        if end_index - start_index > 1:
+            distance_evaluations += end_index - start_index - 1
+            d = point2line_distances(xs[start_index+1:end_index], ys[start_index+1:end_index],
+                                     xs[start_index], ys[start_index], xs[end_index], ys[end_index])
+            index = int(np.argmax(d))
+            if d[index] > epsilon:
+                index += start_index + 1
+                stack.append((index, end_index))  # 先处理左侧的区间, 保证segment的顺序与轨迹顺序一致
+                stack.append((start_index, index))
+                continue
+        partition_indices.append((start_index, end_index))
+    _profiling.count('partition.distance_evaluations', distance_evaluations)
+    return partition_indices
 
-def rdp_trajectory_partitioning(trajectory, traj_id=None, epsilon=1.0):
+
+@_profiling.profiled('partition.rdp')
+def rdp_trajectory_partitioning(trajectory, traj_id=None, epsilon=1.0, clean: dict = None, cache=None):
     """实现轨迹压缩的Ramer-Douglas-Peucker算法, 实现对轨迹中的重要点进行提取并实现轨迹的分割, 和上面的partition方法的返回结果一致
     parameter
     ---------
-        trajectory: List[Point[x, y], ...], 轨迹数据列表, 按照时间先后排序, 轨迹中的点都通过Point形式进行表示.
+        trajectory: List[Point[x, y], ...], 轨迹数据列表, 按照时间先后排序, 轨迹中的点都通过Point形式进行表示, 也可以为(N, 2)的坐标数组.
+        traj_id: int, 轨迹ID
         epsilon: float, 距离阈值, 需要通过阈值来控制轨迹压缩的程度.
+        clean: dict, 给定时在partition之前通过clean_trajectory_index清洗轨迹点, 为清洗的参数, 如{'tolerance': 1e-6, 'stationary_radius': 2.0},
+            segment的起止点仍然为原始轨迹中的点
+        cache: PartitionCache, 给定时相同的轨迹和参数直接读取磁盘中缓存的partition结果
+    return
+    ------
+        List[Segment[Point, Point], ...], 返回所有的分段后的轨迹列表.
+    """
+    if isinstance(trajectory, np.ndarray):
+        trajectory = TrajectoryView(np.ascontiguousarray(trajectory, dtype=np.float64).reshape(-1, 2))
+    return [Segment(trajectory[i], trajectory[j], traj_id=traj_id, cluster_id=-1)
+            for i, j in _partition_indices(trajectory, 'rdp', None, epsilon, clean, cache)]
+
+
+@_profiling.profiled('partition.store')
+def partition_trajectory_store(store: TrajectoryStore, method: str = 'approximate', theta: float = 5.0, epsilon: float = 1.0,
+                               clean: dict = None, cache=None):
+    """对TrajectoryStore中的所有轨迹进行partition, 结果直接写入SegmentStore中
+    parameter
+    ---------
+        store: TrajectoryStore, 轨迹的列式存储
+        method: str, 'approximate' or 'rdp', 分别对应approximate_trajectory_partitioning和rdp_trajectory_partitioning
+        theta: float, approximate方法的参数
+        epsilon: float, rdp方法的参数
+        clean: dict, 给定时在partition之前通过clean_trajectory_index清洗轨迹点, 为清洗的参数, 如{'tolerance': 1e-6, 'stationary_radius': 2.0},
+            segment的起止点仍然为原始轨迹中的点
+        cache: PartitionCache, 给定时相同的轨迹和参数直接读取磁盘中缓存的partition结果
+    return
+    ------
+        SegmentStore, 所有轨迹的分段结果, 按照轨迹在store中的顺序排列
     """
-    size = len(trajectory)
-    d_max = 0.0
-    index = 0
-    for i in range(1, size-1, 1):
-        d = _point2line_distance(trajectory[i].as_array(), trajectory[0].as_array(), trajectory[-1].as_array())
-        if d > d_max:
-            d_max = d
-            index = i
-
-    if d_max > epsilon:
-        result = rdp_trajectory_partitioning(trajectory[:index+1], epsilon=epsilon) + \
-                 rdp_trajectory_partitioning(trajectory[index:], epsilon=epsilon)
+    if method not in ('approximate', 'rdp'):
+        raise ValueError("The parameter 'method' given value has error!")
+    parts = []
+    for traj in store:
+        index = np.array(_partition_indices(traj, method, theta, epsilon, clean, cache), dtype=np.int64).reshape(-1, 2)
+        coords = np.hstack((traj.coords[index[:, 0]], traj.coords[index[:, 1]]))
+        parts.append(SegmentStore(coords, np.full(len(coords), traj.traj_id, dtype=np.int32)))
+    return SegmentStore.concatenate(parts)
+
+
+def _partition_chunk(chunk, method, theta, epsilon, clean=None):
+    """进程池/线程池中执行的partition任务, 输入为[(traj_id, coords), ...], 返回每条轨迹分段的起止点索引"""
+    return [_partition_indices(coords, method, theta, epsilon, clean) for traj_id, coords in chunk]
+
+
+@_profiling.profiled('partition.batch')
+def batch_trajectory_partitioning(trajectories, method: str = 'approximate', theta: float = 5.0, epsilon: float = 1.0,
+                                  n_jobs: int = 1, executor: str = 'process', chunk_size: int = None, clean: dict = None,
+                                  cache=None, traj_ids=None):
+    """对多条轨迹并行进行partition, 每条轨迹之间的partition是独立的, 通过进程池或者线程池分块执行, 返回结果与逐条调用partition方法后拼接的结果一致
+    parameter
+    ---------
+        trajectories: Iterable[List[Point, ...] or np.ndarray or Sequence[Tuple[x, y]]] or Dict[int, ...], 轨迹集合, 为dict时key为traj_id;
+            每个元素都作为一条轨迹(两个点的轨迹同样是长度为2的tuple, 无法与(traj_id, 轨迹)区分), traj_id通过traj_ids或者dict的key给定
+        method: str, 'approximate' or 'rdp', 分别对应approximate_trajectory_partitioning和rdp_trajectory_partitioning
+        theta: float, approximate方法的参数
+        epsilon: float, rdp方法的参数
+        n_jobs: int, 并行的worker数量, 为None或者-1时使用所有的cpu, 为1时不创建pool直接串行计算
+        executor: str, 'process' or 'thread', 使用进程池或者线程池
+        chunk_size: int, 每个任务包含的轨迹数量, 默认每个worker分配4个任务.
+            使用进程池时worker进程中的MDL计算次数和距离计算次数不会记录到当前的Profiler中
+        clean: dict, 给定时在partition之前通过clean_trajectory_index清洗轨迹点, 为清洗的参数, 如{'tolerance': 1e-6, 'stationary_radius': 2.0},
+            segment的起止点仍然为原始轨迹中的点
+        cache: PartitionCache, 给定时相同的轨迹和参数直接读取磁盘中缓存的partition结果, 缓存的读写都在当前进程中进行,
+            只有未命中的轨迹分配到worker中计算
+        traj_ids: Iterable[int], 与trajectories一一对应的traj_id, 不能与dict形式的trajectories同时使用,
+            都未给定时使用轨迹在集合中的序号作为traj_id
+    return
+    ------
+        List[Segment, ...], 所有轨迹的分段结果, 按照轨迹的输入顺序拼接
+    """
+    if method not in ('approximate', 'rdp'):
+        raise ValueError("The parameter 'method' given value has error!")
+    if executor not in ('process', 'thread'):
+        raise ValueError("The parameter 'executor' given value has error!")
+
+    if isinstance(trajectories, dict):
+        if traj_ids is not None:
+            raise ValueError("The parameter 'traj_ids' can not be given with a dict of trajectories!")
+        items = list(trajectories.items())
+    else:
+        trajectories = list(trajectories)
+        traj_ids = range(len(trajectories)) if traj_ids is None else list(traj_ids)
+        if len(traj_ids) != len(trajectories):
+            raise ValueError("The parameter 'traj_ids' must have the same length as 'trajectories'!")
+        items = list(zip(traj_ids, trajectories))
+    # 坐标元组的序列(如((x0, y0), (x1, y1)))与坐标数组一样处理, segment的起止点通过TrajectoryView生成
+    items = [(traj_id, traj if isinstance(traj, TrajectoryView) or (len(traj) and isinstance(traj[0], Point))
+              else np.asarray(traj, dtype=np.float64).reshape(-1, 2)) for traj_id, traj in items]
+    tasks = [(traj_id, _as_coords(traj)) for traj_id, traj in items]
+    if cache is not None:
+        keys = [cache.key(coords, method, theta, epsilon, clean) for _, coords in tasks]
+        cached = [cache.get(key) for key in keys]
+        misses = [k for k, part in enumerate(cached) if part is None]
+        tasks = [tasks[k] for k in misses]
+
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else n_jobs
+    if chunk_size is None:
+        chunk_size = max(1, int(math.ceil(len(tasks) / float(n_jobs * 4))))
+    chunks = [tasks[i:i+chunk_size] for i in range(0, len(tasks), chunk_size)]
+    worker = functools.partial(_partition_chunk, method=method, theta=theta, epsilon=epsilon, clean=clean)
+    if n_jobs == 1 or len(chunks) <= 1:
+        results = map(worker, chunks)
     else:
-        result = [Segment(trajectory[0], trajectory[-1], traj_id=traj_id, cluster_id=-1)]
-    return result
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=n_jobs) as pool:
+            results = list(pool.map(worker, chunks))
+
+    parts = [part for chunk_result in results for part in chunk_result]
+    if cache is not None:
+        for k, part in zip(misses, parts):
+            cache.put(keys[k], part)
+            cached[k] = part
+        parts = cached
+
+    partition_trajectory = []
+    for (traj_id, traj), part in zip(items, parts):
+        if isinstance(traj, np.ndarray):
+            traj = TrajectoryView(_as_coords(traj))
+        partition_trajectory.extend(Segment(traj[i], traj[j], traj_id=traj_id, cluster_id=-1) for i, j in part)
+    return partition_trajectory
@@ -22,6 +22,8 @@ class Point(object):
         distance(other): 实现两个Point类型的距离(欧式距离)计算
         dot(other): 实现两个Point对象的dot运算, 得到两个点的值: x**2 + y**2
     """
+    __slots__ = ('trajectory_id', 'x', 'y')
+
     def __init__(self, x, y, traj_id=None):
         self.trajectory_id = traj_id
         self.x = x
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :preview.py
+# target    :基于抽样的快速预览聚类, 只对随机或者分层抽样的segment计算epsilon邻域并判断是否为核心segment, 密度相连的抽样核心segment合并为同一类簇,
+#            其余segment分配到epsilon范围内距离最近的抽样核心segment所在的类簇. 邻域查询的次数与抽样数量成正比, 而不是全部segment数量.
+#            同时在独立的验证样本上估计与完整聚类结果的一致程度, 也可以直接与完整聚类的结果进行比较
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 5:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import functools
+import math
+
+import numpy as np
+
+from .distance import SegmentArray
+from .index import SegmentGridIndex
+from .store import SegmentStore
+from .cluster import ClusteringStats, _cluster_positions, _collect_clusters
+from . import profiling as _profiling
+
+
+class PreviewReport(object):
+    """预览聚类的抽样信息和与完整聚类结果的一致程度
+    parameter
+    ---------
+        n_segments: int, segment总数
+        sample_size: int, 计算邻域的抽样segment数量
+        sampled_cores: int, 抽样中的核心segment数量
+        n_clusters: int, 预览聚类的类簇数量(不按照轨迹数量过滤)
+        noise_fraction: float, 未分配到任何类簇的segment比例
+        validation_size: int, 验证样本的数量
+        core_rate: float, 验证样本中核心segment的比例
+        core_coverage: float, 验证样本的核心segment中被分配到类簇的比例, 完整聚类中为1
+        neighbor_agreement: float, 验证样本的核心segment与其邻域中的segment被分配到同一类簇的比例, 完整聚类中核心segment的邻域都属于同一类簇,
+            除了被其他类簇先分配的边界segment
+        adjusted_rand: float, compare=True时与完整聚类结果的调整兰德指数, 噪声segment作为一个单独的类别
+        label_agreement: float, compare=True时两个结果中segment对是否属于同一类簇一致的比例(兰德指数)
+        noise_agreement: float, compare=True时两个结果中是否为噪声一致的segment比例
+    """
+    __slots__ = ('n_segments', 'sample_size', 'sampled_cores', 'n_clusters', 'noise_fraction', 'validation_size', 'core_rate',
+                 'core_coverage', 'neighbor_agreement', 'adjusted_rand', 'label_agreement', 'noise_agreement')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    def __repr__(self):
+        return "PreviewReport(%s)" % ', '.join('%s=%s' % (k, _format(getattr(self, k))) for k in self.__slots__)
+
+    def as_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+def _format(value):
+    return '%.4f' % value if isinstance(value, float) else repr(value)
+
+
+def sample_positions(coords: np.ndarray, size: int, sampling: str = 'random', cell_size: float = None, rng=None) -> np.ndarray:
+    """抽取size个segment的位置
+    parameter
+    ---------
+        coords: np.ndarray, shape为(N, 4)的segment坐标数组
+        size: int, 抽样数量
+        sampling: str, 'random'为简单随机抽样; 'stratified'为按照segment中点所在的网格分层的系统抽样, 每个网格中的抽样数量与其segment数量成正比,
+            稀疏的通道也能被抽到
+        cell_size: float, 分层抽样的网格边长
+        rng: np.random.RandomState, 随机数生成器
+    return
+    ------
+        np.ndarray, 升序的segment位置数组
+    """
+    if sampling not in ('random', 'stratified'):
+        raise ValueError("The parameter 'sampling' given value has error!")
+    rng = np.random.RandomState() if rng is None else rng
+    n = len(coords)
+    size = min(max(int(size), 0), n)
+    if size == 0:
+        return np.empty(0, dtype=np.int64)
+    if sampling == 'random' or size == n:
+        return np.sort(rng.choice(n, size, replace=False)).astype(np.int64)
+    cx = np.floor((coords[:, 0] + coords[:, 2]) / 2 / cell_size).astype(np.int64)
+    cy = np.floor((coords[:, 1] + coords[:, 3]) / 2 / cell_size).astype(np.int64)
+    order = np.lexsort((rng.random_sample(n), cy, cx))  # 按照网格排序, 网格内随机排序
+    picks = np.floor((np.arange(size) + rng.random_sample()) * (n / float(size))).astype(np.int64)
+    return np.sort(order[np.minimum(picks, n - 1)])
+
+
+class _DisjointSet(object):
+    """合并抽样核心segment的并查集"""
+    __slots__ = ('parent', )
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def roots(self) -> np.ndarray:
+        return np.array([self.find(i) for i in range(len(self.parent))], dtype=np.int64)
+
+
+def _contingency(labels_a, labels_b) -> np.ndarray:
+    _, a = np.unique(np.asarray(labels_a), return_inverse=True)
+    _, b = np.unique(np.asarray(labels_b), return_inverse=True)
+    table = np.zeros((a.max() + 1 if len(a) else 1, b.max() + 1 if len(b) else 1), dtype=np.float64)
+    np.add.at(table, (a, b), 1)
+    return table
+
+
+def _pairs(x):
+    return x * (x - 1) / 2.0
+
+
+def adjusted_rand_index(labels_a, labels_b) -> float:
+    """两个划分的调整兰德指数, -1(噪声)作为一个单独的类别"""
+    table = _contingency(labels_a, labels_b)
+    same_both = _pairs(table).sum()
+    same_a, same_b, total = _pairs(table.sum(axis=1)).sum(), _pairs(table.sum(axis=0)).sum(), _pairs(table.sum())
+    expected = same_a * same_b / total if total else 0.0
+    maximum = (same_a + same_b) / 2.0
+    return 1.0 if maximum == expected else float((same_both - expected) / (maximum - expected))
+
+
+def rand_index(labels_a, labels_b) -> float:
+    """两个划分中segment对是否属于同一类簇一致的比例"""
+    table = _contingency(labels_a, labels_b)
+    same_both = _pairs(table).sum()
+    same_a, same_b, total = _pairs(table.sum(axis=1)).sum(), _pairs(table.sum(axis=0)).sum(), _pairs(table.sum())
+    return float((total + 2 * same_both - same_a - same_b) / total) if total else 1.0
+
+
+@_profiling.profiled('clustering.preview')
+def preview_clustering(traj_segments, epsilon: float = 2.0, min_lines: int = 5, sample_size: int = None, sample_rate: float = 0.1,
+                       sampling: str = 'random', validation_size: int = 200, compare: bool = False, seed: int = None,
+                       stats: ClusteringStats = None, report: PreviewReport = None):
+    """抽样的预览聚类, 返回结果的格式与line_segment_clustering一致, 用于快速查看通道结构或者调整参数, 不保证与完整的dbscan聚类结果一致.
+    抽样segment的邻域在所有segment中精确计算, 因此抽样segment是否为核心segment是准确的. 两个抽样核心segment在以下情况属于同一类簇:
+        1. 其中一个在另一个的邻域中;
+        2. 两者的邻域中有共同的核心segment(未抽样的共同segment需要额外计算一次邻域来判断是否为核心segment).
+    这两种情况在完整的dbscan聚类中都是密度相连的, 因此预览聚类不会合并完整聚类中不同的类簇, 抽样比例为1时核心segment的划分与完整聚类一致;
+    其余segment分配到epsilon范围内距离最近的抽样核心segment的类簇, 没有时为噪声(-1)
+    parameter
+    ---------
+        traj_segments: List[Segment, ...] or SegmentStore, 所有轨迹的partition划分后的segment集合
+        epsilon: float, segment之间的距离度量阈值
+        min_lines: int or float, 轨迹在epsilon范围内的segment数量的最小阈值
+        sample_size: int, 抽样数量, 为None时为ceil(sample_rate * N)
+        sample_rate: float, 抽样比例
+        sampling: str, 'random' or 'stratified', 见sample_positions
+        validation_size: int, 估计一致程度的验证样本数量(与抽样独立), 为0时不估计
+        compare: bool, 是否同时进行完整的聚类, 计算预览结果与完整结果的一致程度, 用于评估抽样参数, 计算量与完整聚类相同
+        seed: int, 随机数种子
+        stats: ClusteringStats, 给定时累加邻域计算次数, 距离计算次数等统计
+        report: PreviewReport, 给定时写入抽样信息和一致程度的估计
+    return
+    ------
+        Tuple[Dict[int, List[Segment, ...]], ...], 与line_segment_clustering的返回结果一致, 同时更新segment的cluster_id
+    """
+    if isinstance(traj_segments, SegmentStore):
+        segs = traj_segments
+        arrays = SegmentArray.from_store(segs, epsilon=epsilon)
+        traj_ids = segs.traj_id.tolist()
+    else:
+        segs = list(traj_segments)
+        arrays = SegmentArray(segs, epsilon=epsilon)
+        traj_ids = [seg.traj_id for seg in segs]
+    n = len(segs)
+    rng = np.random.RandomState(seed)
+    index = SegmentGridIndex.from_arrays(arrays, epsilon=epsilon)
+    run_stats = ClusteringStats()
+
+    def neighbors_at(pos):
+        candidates = np.asarray(index.candidates_at(pos), dtype=np.int64)
+        distances = arrays.distances_at(pos, candidates)
+        mask = distances <= epsilon
+        run_stats.neighborhood_queries += 1
+        run_stats.neighborhood_size += int(mask.sum())
+        run_stats.max_neighborhood_size = max(run_stats.max_neighborhood_size, int(mask.sum()))
+        return candidates[mask], distances[mask]
+
+    # 1. 抽样segment的精确邻域和核心segment
+    size = int(math.ceil(sample_rate * n)) if sample_size is None else sample_size
+    radius = 2.0 * epsilon * (1 + 1e-9) + 1e-9
+    sample = sample_positions(np.asarray(arrays.coords), size, sampling=sampling, cell_size=radius, rng=rng) if n else \
+        np.empty(0, dtype=np.int64)
+    core_neighbors, core_flag = [], dict()  # core_flag: 已经计算邻域的segment是否为核心segment
+    for pos in sample.tolist():
+        positions, distances = neighbors_at(pos)
+        core_flag[pos] = len(positions) >= min_lines
+        if core_flag[pos]:
+            core_neighbors.append((pos, positions, distances))
+    run_stats.core_segments = len(core_neighbors)
+
+    # 2. 合并密度相连的抽样核心segment, 每个segment分配到距离最近的核心segment(距离相同时取抽样中靠前的核心segment)
+    labels = np.full(n, -1, dtype=np.int64)
+    if core_neighbors:
+        member = np.concatenate([positions for _, positions, _ in core_neighbors])
+        distance = np.concatenate([distances for _, _, distances in core_neighbors])
+        owner = np.repeat(np.arange(len(core_neighbors)), [len(positions) for _, positions, _ in core_neighbors])
+        core_index = np.full(n, -1, dtype=np.int64)
+        core_index[[pos for pos, _, _ in core_neighbors]] = np.arange(len(core_neighbors))
+        components = _DisjointSet(len(core_neighbors))
+        direct = np.flatnonzero(core_index[member] != -1)
+        for a, b in zip(owner[direct].tolist(), core_index[member[direct]].tolist()):
+            components.union(a, b)
+        # 邻域中共同的未抽样segment为核心segment时, 两个核心segment通过它密度相连
+        order = np.lexsort((owner, member))
+        sorted_member, sorted_owner = member[order], owner[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_member[1:] != sorted_member[:-1], True])
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if end - start < 2:
+                continue
+            owners = sorted_owner[start:end].tolist()
+            if len(set(components.find(k) for k in owners)) < 2:
+                continue
+            pos = int(sorted_member[start])
+            if pos not in core_flag:
+                core_flag[pos] = len(neighbors_at(pos)[0]) >= min_lines
+            if core_flag[pos]:
+                for k in owners[1:]:
+                    components.union(owners[0], k)
+        roots = components.roots()
+
+        order = np.lexsort((owner, distance, member))
+        first = order[np.r_[True, member[order][1:] != member[order][:-1]]]
+        labels[member[first]] = roots[owner[first]]
+        # 按照类簇中第一个segment的位置重新编号
+        assigned = np.flatnonzero(labels != -1)
+        keys, first_pos = np.unique(labels[assigned], return_index=True)
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[np.argsort(first_pos)] = np.arange(len(keys))
+        labels[assigned] = rank[np.searchsorted(keys, labels[assigned])]
+    order = np.argsort(labels, kind='stable')
+    bounds = np.searchsorted(labels[order], np.arange(int(labels.max()) + 2 if n else 1))
+    position_dict = {k: order[bounds[k]:bounds[k+1]].tolist() for k in range(len(bounds) - 1)}
+
+    # 3. 在独立的验证样本上估计一致程度
+    report = PreviewReport() if report is None else report
+    report.n_segments, report.sample_size, report.sampled_cores = n, len(sample), len(core_neighbors)
+    report.n_clusters = len(position_dict)
+    report.noise_fraction = float((labels == -1).mean()) if n else 0.0
+    validation = np.sort(rng.choice(n, min(validation_size, n), replace=False)) if n else np.empty(0, dtype=np.int64)
+    cores, covered, agree, pairs = 0, 0, 0, 0
+    for pos in validation.tolist():
+        positions, _ = neighbors_at(pos)
+        if len(positions) >= min_lines:
+            cores += 1
+            covered += int(labels[pos] != -1)
+            if labels[pos] != -1:
+                agree += int((labels[positions] == labels[pos]).sum())
+            pairs += len(positions)
+    report.validation_size = len(validation)
+    report.core_rate = cores / float(len(validation)) if len(validation) else None
+    report.core_coverage = covered / float(cores) if cores else None
+    report.neighbor_agreement = agree / float(pairs) if pairs else None
+
+    run_stats.distance_evaluations = arrays.distance_evaluations
+    if compare:
+        full_labels = [-1] * n
+        _cluster_positions(full_labels, functools.partial(index.neighbor_positions, epsilon=epsilon), min_lines)
+        report.adjusted_rand = adjusted_rand_index(labels, full_labels)
+        report.label_agreement = rand_index(labels, full_labels)
+        report.noise_agreement = float(((labels == -1) == (np.array(full_labels) == -1)).mean()) if n else 1.0
+
+    if stats is not None:
+        stats.update(run_stats)
+    profiler = _profiling.get_profiler()
+    if profiler is not None:
+        profiler.count('clustering.preview_sample', len(sample))
+        profiler.count('clustering.core_segments', len(core_neighbors))
+        profiler.count('clustering.neighborhood_queries', run_stats.neighborhood_queries)
+        profiler.count('clustering.distance_evaluations', run_stats.distance_evaluations)
+    return _collect_clusters(segs, labels.tolist(), traj_ids, position_dict)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :profiling.py
+# target    :轨迹聚类流程的性能统计, 默认关闭, 关闭时各阶段只做一次是否开启的判断. 开启后统计partition, 聚类和代表性轨迹生成各阶段的耗时,
+#            以及MDL计算次数, 距离计算次数, 邻域大小, 队列长度等计数, 每个阶段结束时通过回调函数或者logging模块输出
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 23:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import contextlib
+import functools
+import logging
+import time
+from collections import defaultdict
+
+logger = logging.getLogger('trajCluster')
+
+_profiler = None  # 当前开启的Profiler, 为None时表示关闭
+_disabled = contextlib.nullcontext()
+
+
+class Profiler(object):
+    """性能统计的收集器, 通过enable_profiling开启
+    parameter
+    ---------
+        callback: Callable[[Dict], None], 每个阶段结束时调用, 参数为{'stage': 阶段名称, 'elapsed': 耗时(秒), 'counters': 阶段内的计数}
+        log_level: int, 给定时每个阶段结束时通过logging.getLogger('trajCluster')以该级别输出
+    attribute
+    ---------
+        counters: Dict[str, int], 所有阶段的累加计数
+        maxima: Dict[str, int], 所有阶段的最大值统计, 如邻域大小和队列长度的最大值
+        timings: Dict[str, List[int, float]], 每个阶段的[调用次数, 总耗时(秒)]
+    """
+
+    def __init__(self, callback=None, log_level: int = None):
+        self.callback = callback
+        self.log_level = log_level
+        self.counters = defaultdict(int)
+        self.maxima = dict()
+        self.timings = defaultdict(lambda: [0, 0.0])
+        self._depth = 0
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def maximum(self, name: str, value):
+        if value > self.maxima.get(name, value - 1):
+            self.maxima[name] = value
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """统计一个阶段的耗时, 阶段可以嵌套, 嵌套的阶段分别记录"""
+        before = dict(self.counters)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            timing = self.timings[name]
+            timing[0] += 1
+            timing[1] += elapsed
+            counters = {k: v - before.get(k, 0) for k, v in self.counters.items() if v != before.get(k, 0)}
+            self._emit({'stage': name, 'elapsed': elapsed, 'counters': counters})
+
+    def _emit(self, record: dict):
+        if self.callback is not None:
+            self.callback(record)
+        if self.log_level is not None and logger.isEnabledFor(self.log_level):
+            logger.log(self.log_level, "%s%s: %.6fs %s", '  ' * self._depth, record['stage'], record['elapsed'],
+                       ' '.join('%s=%s' % item for item in sorted(record['counters'].items())))
+
+    def report(self) -> dict:
+        """返回统计结果: {'timings': {阶段: {'calls': 调用次数, 'elapsed': 总耗时}}, 'counters': 累加计数, 'maxima': 最大值}"""
+        return {'timings': {k: {'calls': v[0], 'elapsed': v[1]} for k, v in self.timings.items()},
+                'counters': dict(self.counters), 'maxima': dict(self.maxima)}
+
+    def reset(self):
+        self.counters.clear()
+        self.maxima.clear()
+        self.timings.clear()
+
+
+def enable_profiling(callback=None, log_level: int = None) -> Profiler:
+    """开启性能统计, 返回新建的Profiler, 之后调用的partition, 聚类和代表性轨迹生成都会记录到该Profiler中
+    parameter
+    ---------
+        callback: Callable[[Dict], None], 每个阶段结束时的回调函数
+        log_level: int, 每个阶段结束时通过logging输出的级别, 如logging.INFO
+    return
+    ------
+        Profiler, 当前开启的性能统计
+    """
+    global _profiler
+    _profiler = Profiler(callback=callback, log_level=log_level)
+    return _profiler
+
+
+def disable_profiling():
+    """关闭性能统计, 返回关闭前的Profiler"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler():
+    """返回当前开启的Profiler, 关闭时返回None"""
+    return _profiler
+
+
+@contextlib.contextmanager
+def profiling_session(callback=None, log_level: int = None):
+    """在with代码块中开启性能统计, 退出时恢复之前的状态
+    example
+    -------
+        >>> with profiling_session() as profiler:
+        ...     line_segment_clustering(segments, epsilon=2.0, min_lines=5)
+        >>> profiler.report()['timings']['clustering']
+    """
+    global _profiler
+    previous = _profiler
+    profiler = enable_profiling(callback=callback, log_level=log_level)
+    try:
+        yield profiler
+    finally:
+        _profiler = previous
+
+
+def stage(name: str):
+    """阶段耗时统计的上下文管理器, 关闭时返回不做任何事情的上下文管理器"""
+    return _disabled if _profiler is None else _profiler.stage(name)
+
+
+def profiled(name: str):
+    """函数装饰器, 开启性能统计时将函数的调用记录为name阶段"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: int = 1):
+    if _profiler is not None:
+        _profiler.count(name, value)
+
+
+def maximum(name: str, value):
+    if _profiler is not None:
+        _profiler.maximum(name, value)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :projection.py
+# target    :WGS84经纬度坐标的局部投影, 支持局部等距圆柱投影(equirectangular)和UTM投影, 都通过numpy向量化计算. 经纬度轨迹投影到以米为单位的
+#            平面坐标后进行partition和聚类, epsilon和min_dist都以米为单位, 结果再反投影回经纬度. 同一区域的投影参数只计算一次并缓存
+#            约定: Point.x/坐标数组的第0列为经度(lon), Point.y/第1列为纬度(lat)
+# output    :
+# author    :Miller
+# date      :2026/10/19 1:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import functools
+import math
+
+import numpy as np
+
+from .store import TrajectoryStore, SegmentStore, _as_coords
+from .partition import partition_trajectory_store
+from .cluster import line_segment_clustering, representative_trajectory_generation
+from .result import ClusteringResult
+
+earth_radius = 6371008.8  # WGS84的平均半径(米)
+wgs84_a = 6378137.0  # WGS84椭球长半轴(米)
+wgs84_f = 1 / 298.257223563  # WGS84椭球扁率
+utm_k0 = 0.9996
+utm_false_easting = 500000.0
+utm_false_northing = 10000000.0  # 南半球的北向偏移
+
+# 横轴墨卡托投影的Krüger级数系数
+_n = wgs84_f / (2 - wgs84_f)
+_A = wgs84_a / (1 + _n) * (1 + _n ** 2 / 4 + _n ** 4 / 64)
+_alpha = (_n / 2 - 2 * _n ** 2 / 3 + 5 * _n ** 3 / 16, 13 * _n ** 2 / 48 - 3 * _n ** 3 / 5, 61 * _n ** 3 / 240)
+_beta = (_n / 2 - 2 * _n ** 2 / 3 + 37 * _n ** 3 / 96, _n ** 2 / 48 + _n ** 3 / 15, 17 * _n ** 3 / 480)
+_delta = (2 * _n - 2 * _n ** 2 / 3 - 2 * _n ** 3, 7 * _n ** 2 / 3 - 8 * _n ** 3 / 5, 56 * _n ** 3 / 15)
+_e = 2 * math.sqrt(_n) / (1 + _n)
+
+
+class LocalProjection(object):
+    """经纬度与平面坐标(米)之间的投影, 通过fit或者get_projection获取缓存的实例
+    parameter
+    ---------
+        lon0, lat0: float, 投影中心的经纬度, UTM投影时lon0为投影带的中央经线
+        method: str, 'equirectangular'(以(lon0, lat0)为原点的局部等距圆柱投影, 适用于城市级别的范围)或者'utm'
+        south: bool, UTM投影是否为南半球
+    method
+    ------
+        forward(lon, lat): 经纬度数组投影为平面坐标(x, y)
+        inverse(x, y): 平面坐标反投影为经纬度(lon, lat)
+        forward_coords(coords), inverse_coords(coords): 对(N, 2)或者(N, 4)的坐标数组进行投影和反投影
+    """
+    def __init__(self, lon0: float, lat0: float, method: str = 'equirectangular', south: bool = False):
+        if method not in ('equirectangular', 'utm'):
+            raise ValueError("The parameter 'method' given value has error!")
+        self.lon0, self.lat0 = float(lon0), float(lat0)
+        self.method = method
+        self.south = south
+        self._kx = earth_radius * math.cos(math.radians(self.lat0)) * math.pi / 180.0
+        self._ky = earth_radius * math.pi / 180.0
+
+    def __repr__(self):
+        return "LocalProjection(lon0=%r, lat0=%r, method=%r, south=%r)" % (self.lon0, self.lat0, self.method, self.south)
+
+    def __eq__(self, other):
+        return isinstance(other, LocalProjection) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((self.lon0, self.lat0, self.method, self.south))
+
+    def to_dict(self) -> dict:
+        return {'lon0': self.lon0, 'lat0': self.lat0, 'method': self.method, 'south': self.south}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'LocalProjection':
+        return cls(d['lon0'], d['lat0'], method=d['method'], south=d.get('south', False))
+
+    @classmethod
+    def fit(cls, coords, method: str = 'equirectangular', precision: int = 2) -> 'LocalProjection':
+        """根据经纬度坐标的范围选择投影中心, 中心按照precision位小数取整, 同一区域的数据集共用缓存中的投影
+        parameter
+        ---------
+            coords: np.ndarray or List[Point, ...], (N, 2)的经纬度坐标
+            method: str, 'equirectangular' or 'utm'
+            precision: int, 投影中心经纬度保留的小数位数
+        """
+        coords = _as_coords(coords)
+        if len(coords) == 0:
+            raise ValueError("Can not fit a projection without any coordinates.")
+        lon0 = (float(coords[:, 0].min()) + float(coords[:, 0].max())) / 2
+        lat0 = (float(coords[:, 1].min()) + float(coords[:, 1].max())) / 2
+        return get_projection(lon0, lat0, method=method, precision=precision)
+
+    def forward(self, lon, lat):
+        lon, lat = np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+        if self.method == 'equirectangular':
+            return (lon - self.lon0) * self._kx, (lat - self.lat0) * self._ky
+        phi, lam = np.radians(lat), np.radians(lon - self.lon0)
+        sin_phi = np.sin(phi)
+        t = np.sinh(np.arctanh(sin_phi) - _e * np.arctanh(_e * sin_phi))
+        xi, eta = np.arctan2(t, np.cos(lam)), np.arctanh(np.sin(lam) / np.sqrt(1 + t * t))
+        x, y = eta.copy(), xi.copy()
+        for j, a in enumerate(_alpha, start=1):
+            x += a * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+            y += a * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        return utm_false_easting + utm_k0 * _A * x, (utm_false_northing if self.south else 0.0) + utm_k0 * _A * y
+
+    def inverse(self, x, y):
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        if self.method == 'equirectangular':
+            return x / self._kx + self.lon0, y / self._ky + self.lat0
+        xi = (y - (utm_false_northing if self.south else 0.0)) / (utm_k0 * _A)
+        eta = (x - utm_false_easting) / (utm_k0 * _A)
+        _xi, _eta = xi.copy(), eta.copy()
+        for j, b in enumerate(_beta, start=1):
+            _xi -= b * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+            _eta -= b * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        chi = np.arcsin(np.sin(_xi) / np.cosh(_eta))
+        phi = chi.copy()
+        for j, d in enumerate(_delta, start=1):
+            phi += d * np.sin(2 * j * chi)
+        return self.lon0 + np.degrees(np.arctan2(np.sinh(_eta), np.cos(_xi))), np.degrees(phi)
+
+    def _apply(self, func, coords):
+        coords = np.asarray(coords, dtype=np.float64)
+        result = np.empty(coords.shape, dtype=np.float64)
+        for k in range(0, coords.shape[-1], 2):
+            result[..., k], result[..., k + 1] = func(coords[..., k], coords[..., k + 1])
+        return result
+
+    def forward_coords(self, coords) -> np.ndarray:
+        """对(N, 2)的轨迹点坐标或者(N, 4)的segment坐标进行投影"""
+        return self._apply(self.forward, coords)
+
+    def inverse_coords(self, coords) -> np.ndarray:
+        """对(N, 2)的轨迹点坐标或者(N, 4)的segment坐标进行反投影"""
+        return self._apply(self.inverse, coords)
+
+    def project_store(self, store: TrajectoryStore) -> TrajectoryStore:
+        return TrajectoryStore(self.forward_coords(store.coords), store.offsets, store.traj_ids)
+
+    def unproject_segments(self, segments: SegmentStore) -> SegmentStore:
+        return SegmentStore(self.inverse_coords(segments.coords), segments.traj_id, segments.cluster_id)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_projection(lon0: float, lat0: float, method: str, south: bool) -> LocalProjection:
+    return LocalProjection(lon0, lat0, method=method, south=south)
+
+
+def get_projection(lon0: float, lat0: float, method: str = 'equirectangular', precision: int = 2) -> LocalProjection:
+    """返回(lon0, lat0)所在区域的投影, 结果被缓存, 同一区域(UTM为同一投影带)只创建一次
+    parameter
+    ---------
+        lon0, lat0: float, 区域中心的经纬度
+        method: str, 'equirectangular' or 'utm'
+        precision: int, equirectangular投影中心保留的小数位数
+    return
+    ------
+        LocalProjection
+    """
+    if method == 'utm':
+        zone = int((lon0 + 180) // 6) % 60 + 1
+        return _cached_projection(zone * 6 - 183.0, 0.0, method, lat0 < 0)
+    return _cached_projection(round(lon0, precision), round(lat0, precision), method, False)
+
+
+def geographic_clustering(trajectories, epsilon: float, min_lines: int = 5, theta: float = 5.0, min_dist: float = 2.0,
+                          rep_min_lines: int = 3, projection='equirectangular', **kwargs):
+    """经纬度轨迹的聚类, 投影到平面坐标后完成partition, 聚类和代表性轨迹生成, 结果反投影回经纬度
+    parameter
+    ---------
+        trajectories: TrajectoryStore or Iterable[List[Point, ...] or np.ndarray], 经纬度轨迹, x为经度, y为纬度
+        epsilon: float, segment之间的距离阈值(米)
+        min_lines: int, 聚类的min_lines参数
+        theta: float, approximate partition的参数
+        min_dist: float, 代表性轨迹点之间的最小距离(米)
+        rep_min_lines: int, 代表性轨迹生成的min_lines参数
+        projection: str or LocalProjection, 投影方式, 为'equirectangular'或者'utm'时根据数据范围选择缓存中的投影
+        kwargs: line_segment_clustering的其他参数, 如use_index
+    return
+    ------
+        ClusteringResult, segment和代表性轨迹的坐标都为经纬度, params中保存了投影参数
+    """
+    store = trajectories if isinstance(trajectories, TrajectoryStore) else TrajectoryStore.from_trajectories(trajectories)
+    if not isinstance(projection, LocalProjection):
+        projection = LocalProjection.fit(store.coords, method=projection)
+    segments = partition_trajectory_store(projection.project_store(store), method='approximate', theta=theta)
+    clusters, _ = line_segment_clustering(segments, epsilon=epsilon, min_lines=min_lines, **kwargs)
+    representatives = representative_trajectory_generation(clusters, min_lines=rep_min_lines, min_dist=min_dist)
+    representatives = {k: projection.inverse_coords(v) for k, v in representatives.items()}
+    return ClusteringResult.from_clustering(projection.unproject_segments(segments), representatives, epsilon=epsilon,
+                                            min_lines=min_lines, theta=theta, min_dist=min_dist, projection=projection.to_dict())
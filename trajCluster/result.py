@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :result.py
+# target    :轨迹聚类结果的持久化, segment(坐标, 轨迹ID, 聚类ID)和代表性轨迹(所有折线的坐标拼接为一个数组, 通过offsets划分)都保存为
+#            连续的.npy数组, 加载时通过memmap直接映射, 不复制数据也不生成Segment/Point对象
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 1:00
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import json
+import os
+
+import numpy as np
+
+from .store import SegmentStore, _as_coords
+from .cluster import min_traj_cluster
+
+_meta_file = 'meta.json'
+_format_version = 1
+
+
+class ClusteringResult(object):
+    """一次轨迹聚类的结果, 包括聚类后的segment集合和每个类簇的代表性轨迹
+    parameter
+    ---------
+        segments: SegmentStore, 所有的segment, cluster_id为line_segment_clustering的结果
+        rep_coords: np.ndarray, shape为(P, 2)的代表性轨迹点坐标, 所有代表性轨迹按顺序拼接
+        rep_offsets: np.ndarray, shape为(K+1, )的int64数组, 第i条代表性轨迹的点为rep_coords[rep_offsets[i]:rep_offsets[i+1]]
+        rep_cluster_ids: np.ndarray, shape为(K, )的int32数组, 每条代表性轨迹对应的cluster_id
+        params: dict, 聚类参数等可以json序列化的附加信息, 如epsilon, min_lines
+        path: str, 结果在磁盘中的目录
+    method
+    ------
+        from_clustering(traj_segments, representatives, **params): 通过line_segment_clustering和representative_trajectory_generation的结果生成
+        save(path): 保存到磁盘目录
+        load(path, mmap_mode): 以memmap的方式加载
+        clusters(): 与line_segment_clustering的返回结果一致的类簇划分, value为SegmentStore
+        representatives(): 每个类簇的代表性轨迹坐标数组
+    """
+    def __init__(self, segments: SegmentStore, rep_coords: np.ndarray = None, rep_offsets: np.ndarray = None,
+                 rep_cluster_ids: np.ndarray = None, params: dict = None, path: str = None):
+        self.segments = segments
+        self.rep_coords = np.empty((0, 2), dtype=np.float64) if rep_coords is None else rep_coords
+        self.rep_offsets = np.zeros(1, dtype=np.int64) if rep_offsets is None else rep_offsets
+        self.rep_cluster_ids = np.empty(0, dtype=np.int32) if rep_cluster_ids is None else rep_cluster_ids
+        self.params = dict() if params is None else params
+        self.path = path
+
+    def __len__(self):
+        return len(self.segments)
+
+    @classmethod
+    def from_clustering(cls, traj_segments, representatives: dict = None, **params):
+        """
+        parameter
+        ---------
+            traj_segments: List[Segment, ...] or SegmentStore, line_segment_clustering聚类后的segment集合(cluster_id已经写回)
+            representatives: Dict[int, List[Point, ...] or np.ndarray], representative_trajectory_generation的结果
+            params: 需要一起保存的聚类参数
+        return
+        ------
+            ClusteringResult
+        """
+        if isinstance(traj_segments, SegmentStore):
+            segments = traj_segments
+        else:
+            segments = SegmentStore.from_segments(list(traj_segments))
+        representatives = dict() if representatives is None else representatives
+        cluster_ids = sorted(representatives.keys())
+        parts = [_as_coords(representatives[k]) for k in cluster_ids]
+        rep_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        rep_offsets[1:] = np.cumsum([len(p) for p in parts])
+        rep_coords = np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.float64)
+        return cls(segments, rep_coords, rep_offsets, np.array(cluster_ids, dtype=np.int32), params=params)
+
+    def save(self, path: str):
+        """保存到path目录, segment保存为coords.npy, traj_id.npy, cluster_id.npy, 代表性轨迹保存为rep_*.npy, 参数保存在meta.json中"""
+        self.segments.save(path)
+        np.save(os.path.join(path, 'rep_coords.npy'), np.asarray(self.rep_coords, dtype=np.float64))
+        np.save(os.path.join(path, 'rep_offsets.npy'), np.asarray(self.rep_offsets, dtype=np.int64))
+        np.save(os.path.join(path, 'rep_cluster_ids.npy'), np.asarray(self.rep_cluster_ids, dtype=np.int32))
+        with open(os.path.join(path, _meta_file), 'w') as f:
+            json.dump({'version': _format_version, 'segments': len(self.segments), 'representatives': len(self.rep_cluster_ids),
+                       'params': self.params}, f)
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = 'c'):
+        """加载save保存的结果
+        parameter
+        ---------
+            path: str, save时的目录
+            mmap_mode: str, np.load的mmap_mode, 与SegmentStore.load一致, 默认'c'(copy-on-write)
+        return
+        ------
+            ClusteringResult
+        """
+        with open(os.path.join(path, _meta_file)) as f:
+            meta = json.load(f)
+        if meta.get('version') != _format_version:
+            raise ValueError("Unsupported clustering result version: %r" % (meta.get('version'), ))
+        rep = [np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+               for name in ('rep_coords.npy', 'rep_offsets.npy', 'rep_cluster_ids.npy')]
+        return cls(SegmentStore.load(path, mmap_mode=mmap_mode), *rep, params=meta['params'], path=path)
+
+    def cluster_positions(self):
+        """返回每个类簇中segment的位置数组: Dict[int, np.ndarray], 不包括cluster_id为-1的segment"""
+        labels = np.asarray(self.segments.cluster_id)
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        start = np.searchsorted(sorted_labels, 0)
+        keys, counts = np.unique(sorted_labels[start:], return_counts=True)
+        bounds = start + np.r_[0, np.cumsum(counts)]
+        return {int(k): order[bounds[i]:bounds[i+1]] for i, k in enumerate(keys)}
+
+    def clusters(self, min_traj: int = min_traj_cluster):
+        """与line_segment_clustering的返回结果一致, 按照类簇中的轨迹数量划分为保留的类簇和删除的类簇
+        return
+        ------
+            Tuple[Dict[int, SegmentStore], Dict[int, SegmentStore]]
+        """
+        cluster_dict, remove_cluster = dict(), dict()
+        traj_id = np.asarray(self.segments.traj_id)
+        for k, positions in self.cluster_positions().items():
+            target = cluster_dict if len(np.unique(traj_id[positions])) >= min_traj else remove_cluster
+            target[k] = self.segments.take(positions)
+        return cluster_dict, remove_cluster
+
+    def representative(self, cluster_id: int) -> np.ndarray:
+        """返回cluster_id类簇的代表性轨迹坐标, 为memmap中的切片, 不复制数据"""
+        i = int(np.searchsorted(self.rep_cluster_ids, cluster_id))
+        if i >= len(self.rep_cluster_ids) or self.rep_cluster_ids[i] != cluster_id:
+            raise KeyError(cluster_id)
+        return self.rep_coords[self.rep_offsets[i]:self.rep_offsets[i+1]]
+
+    def representatives(self) -> dict:
+        """返回所有类簇的代表性轨迹: Dict[int, np.ndarray], 与输入为SegmentStore时representative_trajectory_generation的返回结果一致"""
+        return {int(k): self.rep_coords[self.rep_offsets[i]:self.rep_offsets[i+1]] for i, k in enumerate(self.rep_cluster_ids)}
@@ -14,22 +14,86 @@ import math
 from .point import Point, _point2line_distance
 
 
+class SegmentGeometry(object):
+    """segment的几何量缓存, 在segment第一次参与距离计算时生成, 避免在O(n^2)的距离计算中重复计算长度, 方向向量等, 计算方式与Point中的方法一致
+    attribute
+    ---------
+        sx, sy, ex, ey: float, 起止点坐标
+        dx, dy: float, 方向向量 end - start
+        length, length2: float, segment的长度及长度的平方
+        ux, uy: float, 单位方向向量, 长度为0时为(0, 0)
+        degenerate: bool, 起止点是否为同一个点, 与str(start) == str(end)一致
+        box: Tuple[float, float, float, float], bounding box(min_x, min_y, max_x, max_y)
+    """
+    __slots__ = ('sx', 'sy', 'ex', 'ey', 'dx', 'dy', 'length', 'length2', 'ux', 'uy', 'degenerate', 'box')
+
+    def __init__(self, start: Point, end: Point):
+        self.sx, self.sy, self.ex, self.ey = start.x, start.y, end.x, end.y
+        self.dx, self.dy = self.ex - self.sx, self.ey - self.sy
+        self.length = end.distance(start)
+        self.length2 = math.pow(self.length, 2)
+        self.ux, self.uy = (self.dx / self.length, self.dy / self.length) if self.length > 0 else (0.0, 0.0)
+        self.degenerate = str(start) == str(end)
+        self.box = (min(self.sx, self.ex), min(self.sy, self.ey), max(self.sx, self.ex), max(self.sy, self.ey))
+
+    def projection(self, x: float, y: float) -> Tuple[float, float]:
+        """点(x, y)在segment所在直线上的投影点"""
+        u = ((x - self.sx) * self.dx + (y - self.sy) * self.dy) / self.length2
+        return self.sx + self.dx * u, self.sy + self.dy * u
+
+
+def _distance(x1: float, y1: float, x2: float, y2: float) -> float:
+    return math.sqrt(math.pow(x1 - x2, 2) + math.pow(y1 - y2, 2))
+
+
 class Segment(object):
-    """将一个segment进行封装, 进行距离(垂直距离, 长度距离, 角度距离)的计算, 设置segment的cluster的ID等, 在使用时需区分长短segment,两者的调用方式不同
+    """将一个segment进行封装, 进行距离(垂直距离, 长度距离, 角度距离)的计算, 设置segment的cluster的ID等, 在使用时需区分长短segment,两者的调用方式不同.
+    segment的几何量(长度, 方向向量等)缓存在geometry中, 重新设置start或end时缓存失效, 轨迹点Point视为不可变的对象, 直接修改Point的坐标后需要调用
+    invalidate()清除缓存.
     method
     ------
         perpendicular_distance: 计算垂直距离, longer_segment.perpendicular_distance(short_segment)
         parallel_distance: 计算segment长度的相似度, longer_segment.parallel_distance(short_segment)
         angle_distance: 计算两个segment的角度相似性, longer_segment.angle_distance(short_segment)
     """
+    __slots__ = ('_start', '_end', 'traj_id', 'cluster_id', '_geometry')
     eps = 1e-12
 
     def __init__(self, start_point: Point, end_point: Point, traj_id: int = None, cluster_id: int = -1):
+        self._geometry = None
         self.start = start_point
         self.end = end_point
         self.traj_id = traj_id
         self.cluster_id = cluster_id
 
+    @property
+    def start(self) -> Point:
+        return self._start
+
+    @start.setter
+    def start(self, point: Point):
+        self._start = point
+        self._geometry = None
+
+    @property
+    def end(self) -> Point:
+        return self._end
+
+    @end.setter
+    def end(self, point: Point):
+        self._end = point
+        self._geometry = None
+
+    @property
+    def geometry(self) -> SegmentGeometry:
+        geometry = self._geometry
+        if geometry is None:
+            geometry = self._geometry = SegmentGeometry(self.start, self.end)
+        return geometry
+
+    def invalidate(self):
+        self._geometry = None
+
     def set_cluster(self, cluster_id: int):
         self.cluster_id = cluster_id
 
@@ -38,12 +102,13 @@ class Segment(object):
 
     @property
     def length(self):
-        return self.end.distance(self.start)
+        return self.geometry.length
 
     def perpendicular_distance(self, other: 'Segment'):
         """计算两个segment之间起始点的垂直距离距离, 参考论文中的公式Formula(1); 必须Segment为short的line segment."""
-        l1 = other.start.distance(self._projection_point(other, typed="start"))
-        l2 = other.end.distance(self._projection_point(other, typed="end"))
+        g, o = self.geometry, other.geometry
+        l1 = _distance(o.sx, o.sy, *g.projection(o.sx, o.sy))
+        l2 = _distance(o.ex, o.ey, *g.projection(o.ex, o.ey))
         if l1 < self.eps and l2 < self.eps:
             return 0
         else:
@@ -51,41 +116,41 @@ class Segment(object):
 
     def parallel_distance(self, other: 'Segment'):
         """计算两个segment之间的长度距离, 参考论文中的公式Formula(2),Segment必须为short的line segment."""
-        l1 = self.start.distance(self._projection_point(other, typed='start'))
-        l2 = self.end.distance(self._projection_point(other, typed='end'))
+        g, o = self.geometry, other.geometry
+        l1 = _distance(g.sx, g.sy, *g.projection(o.sx, o.sy))
+        l2 = _distance(g.ex, g.ey, *g.projection(o.ex, o.ey))
         return min(l1, l2)
 
     def angle_distance(self, other: 'Segment'):
         """计算两个segment之间的角度距离, 参考论文中的公式Formula(3),Segment必须为short的line segment."""
-        self_vector = self.end - self.start
-        self_dist, other_dist = self.end.distance(self.start), other.end.distance(other.start)
+        g, o = self.geometry, other.geometry
 
         # 当两个点重合时, 计算点到直线的距离即可
-        if self_dist < self.eps:
+        if g.length < self.eps:
             return _point2line_distance(self.start.as_array(), other.start.as_array(), other.end.as_array())
-        elif other_dist < self.eps:
+        elif o.length < self.eps:
             return _point2line_distance(other.start.as_array(), self.start.as_array(), self.end.as_array())
 
-        cos_theta = self_vector.dot(other.end - other.start) / (self.end.distance(self.start) * other.end.distance(other.start))
+        cos_theta = (g.dx * o.dx + g.dy * o.dy) / (g.length * o.length)
         if cos_theta > self.eps:
             if cos_theta >= 1:
                 cos_theta = 1.0
-            return other.length * math.sqrt(1 - math.pow(cos_theta, 2))
+            return o.length * math.sqrt(1 - math.pow(cos_theta, 2))
         else:
-            return other.length
+            return o.length
 
     def _projection_point(self, other: 'Segment', typed="e"):
+        o = other.geometry
         if typed == 's' or typed == 'start':
-            tmp = other.start - self.start
+            x, y = self.geometry.projection(o.sx, o.sy)
         else:
-            tmp = other.end - self.start
-        u = tmp.dot(self.end-self.start) / math.pow(self.end.distance(self.start), 2)
-        return self.start + (self.end-self.start) * u
+            x, y = self.geometry.projection(o.ex, o.ey)
+        return Point(x, y, traj_id=self.start.trajectory_id)
 
     def get_all_distance(self, seg: 'Segment'):
         res = self.angle_distance(seg)
         # 起始点不能为同一个点
-        if str(self.start) != str(self.end):
+        if not self.geometry.degenerate:
             res += self.parallel_distance(seg)
         # 不能为同一轨迹
         if self.traj_id != seg.traj_id:
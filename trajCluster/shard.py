@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :shard.py
+# target    :大规模segment的分片聚类, 按照segment bounding box的中心将segment划分到空间网格(tile)中, 每个tile加上宽度为剪枝半径的halo,
+#            独立计算tile内segment的邻域和核心segment(可以在不同的进程中执行, 每个进程只需要tile及halo中的segment),
+#            最后通过halo中共享的segment将跨越tile边界的类簇合并, 结果与全局聚类一致
+#
+# output    :
+# author    :Miller
+# date      :2026/10/19 2:30
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import os
+from collections import deque, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .distance import SegmentArray, segment_length
+from .index import SegmentGridIndex, tiny_length
+from .store import SegmentStore
+from .cluster import ClusteringStats, _collect_clusters
+from . import profiling as _profiling
+
+
+def _segment_boxes(coords: np.ndarray) -> np.ndarray:
+    return np.column_stack((np.minimum(coords[:, 0], coords[:, 2]), np.minimum(coords[:, 1], coords[:, 3]),
+                            np.maximum(coords[:, 0], coords[:, 2]), np.maximum(coords[:, 1], coords[:, 3])))
+
+
+def assign_tiles(coords: np.ndarray, tile_size: float):
+    """按照bounding box的中心将segment划分到边长为tile_size的网格中
+    parameter
+    ---------
+        coords: np.ndarray, shape为(N, 4)的segment坐标数组
+        tile_size: float, 网格的边长
+    return
+    ------
+        Dict[Tuple[int, int], np.ndarray], key为网格坐标, value为属于该网格的segment位置(升序)
+    """
+    boxes = _segment_boxes(coords)
+    cx = np.floor((boxes[:, 0] + boxes[:, 2]) / 2 / tile_size).astype(np.int64)
+    cy = np.floor((boxes[:, 1] + boxes[:, 3]) / 2 / tile_size).astype(np.int64)
+    order = np.lexsort((np.arange(len(coords)), cy, cx))
+    keys = np.column_stack((cx[order], cy[order]))
+    bounds = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1), True])
+    return {(int(keys[s, 0]), int(keys[s, 1])): order[s:e] for s, e in zip(bounds[:-1], bounds[1:])}
+
+
+class _HaloIndex(object):
+    """计算tile的halo时使用的空间索引, 对所有segment只进行一次空间排序: segment按照bounding box覆盖的网格注册(覆盖的网格过多时放入overflow),
+    按照网格排序后每个网格对应排序数组中的一段; 同一轨迹的segment按照轨迹排序. 每个tile只需要检查周围网格中的segment, 而不是所有segment
+    """
+    def __init__(self, coords: np.ndarray, traj: np.ndarray, cell_size: float, max_cells: int = 64):
+        self.boxes = _segment_boxes(coords)
+        self.traj = traj
+        self.cell_size = cell_size
+        cx0, cy0 = np.floor(self.boxes[:, 0] / cell_size).astype(np.int64), np.floor(self.boxes[:, 1] / cell_size).astype(np.int64)
+        cx1, cy1 = np.floor(self.boxes[:, 2] / cell_size).astype(np.int64), np.floor(self.boxes[:, 3] / cell_size).astype(np.int64)
+        nx, ny = cx1 - cx0 + 1, cy1 - cy0 + 1
+        overflow = nx * ny > max_cells
+        self.overflow = np.flatnonzero(overflow)
+        regular = np.flatnonzero(~overflow)
+        counts = (nx * ny)[regular]
+        seg = np.repeat(regular, counts)
+        offset = np.arange(len(seg)) - np.repeat(np.cumsum(counts) - counts, counts)  # segment覆盖的第几个网格
+        cell_x = cx0[seg] + offset // ny[seg]
+        cell_y = cy0[seg] + offset % ny[seg]
+        order = np.lexsort((seg, cell_y, cell_x))
+        self._members = seg[order]
+        keys = np.column_stack((cell_x[order], cell_y[order]))
+        bounds = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1), True]) if len(keys) else np.zeros(1, np.int64)
+        self._cells = {(int(keys[a, 0]), int(keys[a, 1])): (int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])}
+        self._traj_order = np.argsort(traj, kind='stable')
+        self._traj_sorted = traj[self._traj_order]
+        self.tiny = np.flatnonzero(segment_length(coords) < tiny_length)
+
+    def halo(self, owned: np.ndarray, radius: float) -> np.ndarray:
+        """计算tile中segment的邻域时需要的所有segment的位置, 包括tile中的segment和halo中的segment:
+            1. bounding box与tile中segment的bounding box范围的距离不大于radius(2 * epsilon)的segment;
+            2. 与tile中的segment属于同一轨迹的segment, 同一轨迹的segment之间的距离没有空间下界;
+            3. tile中包含退化segment时, 所有的退化segment.
+        return
+        ------
+            np.ndarray, 升序的segment位置数组
+        """
+        owned_boxes = self.boxes[owned]
+        x0, y0 = owned_boxes[:, 0].min(), owned_boxes[:, 1].min()
+        x1, y1 = owned_boxes[:, 2].max(), owned_boxes[:, 3].max()
+        gx0, gy0 = int(np.floor((x0 - radius) / self.cell_size)), int(np.floor((y0 - radius) / self.cell_size))
+        gx1, gy1 = int(np.floor((x1 + radius) / self.cell_size)), int(np.floor((y1 + radius) / self.cell_size))
+        parts = [self.overflow]
+        if (gx1 - gx0 + 1) * (gy1 - gy0 + 1) > len(self._cells):
+            cells = self._cells.values()
+        else:
+            cells = (self._cells[key] for key in ((gx, gy) for gx in range(gx0, gx1 + 1) for gy in range(gy0, gy1 + 1))
+                     if key in self._cells)
+        parts.extend(self._members[a:b] for a, b in cells)
+        candidates = np.unique(np.concatenate(parts))
+        boxes = self.boxes[candidates]
+        dx = np.maximum(np.maximum(x0 - boxes[:, 2], boxes[:, 0] - x1), 0.0)
+        dy = np.maximum(np.maximum(y0 - boxes[:, 3], boxes[:, 1] - y1), 0.0)
+        parts = [candidates[np.sqrt(dx * dx + dy * dy) <= radius], owned]
+        trajs = np.unique(self.traj[owned])
+        lo, hi = np.searchsorted(self._traj_sorted, trajs, side='left'), np.searchsorted(self._traj_sorted, trajs, side='right')
+        parts.extend(self._traj_order[a:b] for a, b in zip(lo.tolist(), hi.tolist()))
+        if len(self.tiny) and np.isin(owned, self.tiny).any():
+            parts.append(self.tiny)
+        return np.unique(np.concatenate(parts))
+
+
+def tile_halo(coords: np.ndarray, traj: np.ndarray, owned: np.ndarray, radius: float):
+    """计算一个tile的halo, 见_HaloIndex.halo, 多个tile时应当共用一个_HaloIndex"""
+    return _HaloIndex(coords, traj, cell_size=radius).halo(owned, radius)
+
+
+def _tile_neighbors(task):
+    """计算一个tile中segment的邻域, 输入和输出都只包含tile及halo中的segment, 可以在worker进程中执行
+    parameter
+    ---------
+        task: Tuple, (halo的坐标数组, halo的轨迹编号数组, tile中的segment在halo中的位置, epsilon, min_lines)
+    return
+    ------
+        Tuple[np.ndarray, np.ndarray, np.ndarray, int], tile中每个segment的邻域以CSR格式表示: (indptr, halo中的位置, 是否为核心segment),
+        以及距离计算的次数
+    """
+    coords, traj, local, epsilon, min_lines = task
+    index = SegmentGridIndex.from_arrays(SegmentArray.from_arrays(coords, traj, epsilon), epsilon=epsilon)
+    dtype = np.int32 if len(coords) < 2 ** 31 else np.int64
+    parts = [np.asarray(index.neighbor_positions(pos, epsilon), dtype=dtype) for pos in local.tolist()]
+    counts = np.array([len(part) for part in parts], dtype=np.int64)
+    indptr = np.r_[0, np.cumsum(counts)]
+    indices = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+    return indptr, indices, counts >= min_lines, index.distance_evaluations
+
+
+def _cluster_csr(labels: list, indptr: np.ndarray, indices: np.ndarray, core: np.ndarray, stats: ClusteringStats):
+    """与_cluster_positions一致的dbscan聚类主流程, 邻域和核心segment从CSR格式的数组中读取, 不缓存邻域列表
+    return
+    ------
+        Dict[int, List[int, ...]], key为cluster_id, value为segment的位置列表
+    """
+    visited = bytearray(len(labels))
+    core = core.tolist()
+    cluster_id, max_queue_length = 0, 0
+    cluster_dict = defaultdict(list)
+
+    def visit(pos):
+        visited[pos] = 1
+        stats.neighborhood_queries += 1
+        return indices[indptr[pos]:indptr[pos + 1]].tolist() if core[pos] else None
+
+    for pos in range(len(labels)):
+        if labels[pos] == -1 and not visited[pos]:
+            neighbors = visit(pos)
+            if neighbors is not None:
+                labels[pos] = cluster_id
+                for sub_pos in neighbors:
+                    labels[sub_pos] = cluster_id
+                queue = deque(neighbors)
+                max_queue_length = max(max_queue_length, len(queue))
+                while queue:
+                    curr_pos = queue.popleft()
+                    if visited[curr_pos]:
+                        continue
+                    neighbors = visit(curr_pos)
+                    if neighbors is not None:
+                        for m in neighbors:
+                            if labels[m] == -1:
+                                queue.append(m)
+                                labels[m] = cluster_id
+                        max_queue_length = max(max_queue_length, len(queue))
+                cluster_id += 1
+        if labels[pos] != -1:
+            cluster_dict[labels[pos]].append(pos)
+    visited = np.frombuffer(bytes(visited), dtype=np.uint8).astype(bool)
+    sizes = np.diff(indptr)[visited]
+    stats.core_segments += int(np.asarray(core, dtype=bool)[visited].sum())
+    stats.neighborhood_size += int(sizes.sum())
+    stats.max_neighborhood_size = max(stats.max_neighborhood_size, int(sizes.max()) if len(sizes) else 0)
+    stats.max_queue_length = max(stats.max_queue_length, max_queue_length)
+    return cluster_dict
+
+
+@_profiling.profiled('clustering.sharded')
+def sharded_clustering(traj_segments, epsilon: float = 2.0, min_lines: int = 5, tile_size: float = None, n_jobs: int = 1,
+                       stats: ClusteringStats = None):
+    """分片的线段segment聚类, 返回结果与line_segment_clustering(vectorized=True)一致.
+    每个tile独立计算其中segment的epsilon邻域以及是否为核心segment, 邻域中包含halo中的segment(属于其他tile), 这些共享的segment将
+    跨越tile边界的类簇连接起来. 合并阶段按照segment的全局顺序扩展类簇, 只读取各个tile的邻域而不再计算距离, 保证cluster_id的编号以及边界segment
+    的归属与全局聚类一致.
+    parameter
+    ---------
+        traj_segments: List[Segment, ...] or SegmentStore, 所有轨迹的partition划分后的segment集合
+        epsilon: float, segment之间的距离度量阈值
+        min_lines: int or float, 轨迹在epsilon范围内的segment数量的最小阈值
+        tile_size: float, tile的边长, 默认将segment的范围划分为4 * 4个tile, 不小于剪枝半径(2 * epsilon)
+        n_jobs: int, 并行计算tile的进程数量, 为None或者-1时使用所有的cpu, 为1时串行计算
+        stats: ClusteringStats, 给定时累加邻域计算次数, 距离计算次数等统计
+    return
+    ------
+        Tuple[Dict[int, List[Segment, ...]], ...], 与line_segment_clustering的返回结果一致
+    """
+    if isinstance(traj_segments, SegmentStore):
+        segs = traj_segments
+        arrays = SegmentArray.from_store(segs, epsilon=epsilon)
+        labels, traj_ids = segs.cluster_id.tolist(), segs.traj_id.tolist()
+    else:
+        segs = list(traj_segments)
+        arrays = SegmentArray(segs, epsilon=epsilon)
+        labels, traj_ids = [seg.cluster_id for seg in segs], [seg.traj_id for seg in segs]
+    coords, traj = np.asarray(arrays.coords, dtype=np.float64), np.asarray(arrays.traj, dtype=np.int64)
+    radius = 2.0 * epsilon * (1 + 1e-9) + 1e-9  # 与SegmentGridIndex的剪枝半径一致
+    if tile_size is None and len(segs):
+        boxes = _segment_boxes(coords)
+        tile_size = max(float(boxes[:, 2].max() - boxes[:, 0].min()), float(boxes[:, 3].max() - boxes[:, 1].min())) / 4
+    tile_size = max(tile_size or 0.0, radius)
+
+    tiles = list(assign_tiles(coords, tile_size).values()) if len(segs) else []
+    halo_index = _HaloIndex(coords, traj, tile_size) if tiles else None
+    tasks, halos = [], []
+    for owned in tiles:
+        halo = halo_index.halo(owned, radius)
+        halos.append(halo)
+        tasks.append((coords[halo], traj[halo], np.searchsorted(halo, owned), epsilon, min_lines))
+
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else n_jobs
+    with _profiling.stage('clustering.tiles'):
+        if n_jobs == 1 or len(tasks) <= 1:
+            results = map(_tile_neighbors, tasks)
+        else:
+            pool = ProcessPoolExecutor(max_workers=n_jobs)
+            results = pool.map(_tile_neighbors, tasks)
+
+        # 合并: 将每个tile的CSR邻域转换为全局位置后拼接为一个CSR数组, halo中的segment将相邻tile的类簇连接起来
+        counts = np.zeros(len(segs), dtype=np.int64)
+        core = np.zeros(len(segs), dtype=bool)
+        tile_parts, evaluations = [], 0
+        for owned, halo, (indptr, indices, tile_core, tile_evaluations) in zip(tiles, halos, results):
+            counts[owned] = np.diff(indptr)
+            core[owned] = tile_core
+            tile_parts.append((owned, indptr, halo[indices].astype(indices.dtype)))
+            evaluations += tile_evaluations
+        if n_jobs != 1 and len(tasks) > 1:
+            pool.shutdown()
+    indptr = np.r_[0, np.cumsum(counts)]
+    indices = np.empty(indptr[-1], dtype=np.int32 if len(segs) < 2 ** 31 else np.int64)
+    for owned, tile_indptr, tile_indices in tile_parts:
+        # tile中的segment位置升序, 按照每个segment的邻域长度将tile的indices分段复制到全局位置
+        lengths = np.diff(tile_indptr)
+        target = np.repeat(indptr[owned], lengths) + (np.arange(tile_indptr[-1]) - np.repeat(tile_indptr[:-1], lengths))
+        indices[target] = tile_indices
+    del tile_parts
+
+    run_stats = ClusteringStats()
+    position_dict = _cluster_csr(labels, indptr, indices, core, run_stats)
+    run_stats.distance_evaluations = evaluations
+    if stats is not None:
+        stats.update(run_stats)
+    profiler = _profiling.get_profiler()
+    if profiler is not None:
+        profiler.count('clustering.tiles', len(tiles))
+        profiler.count('clustering.halo_segments', sum(len(h) for h in halos) - len(segs))
+        profiler.count('clustering.distance_evaluations', evaluations)
+    return _collect_clusters(segs, labels, traj_ids, position_dict)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :store.py
+# target    :轨迹和segment的列式存储, 通过连续的float64坐标数组和int32的ID数组代替Point/Segment对象列表, 降低大规模数据的内存占用
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 13:20
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import os
+
+import numpy as np
+
+from .point import Point
+from .segment import Segment
+
+no_traj_id = -1  # traj_id为None时在store中的存储值
+_segment_files = ('coords', 'traj_id', 'cluster_id')  # SegmentStore.save保存的数组
+
+
+def _as_int32(values, name: str = 'traj_id') -> np.ndarray:
+    """将ID转换为int32数组, 超出int32范围的ID直接转换时会溢出(不同的ID可能变为相同的值), 此时抛出ValueError"""
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iub':
+        values = np.asarray(values, dtype=np.int64)
+    if values.size and (values.min() < np.iinfo(np.int32).min or values.max() > np.iinfo(np.int32).max):
+        raise ValueError("The %s given value is out of the int32 range: [%d, %d]" % (name, values.min(), values.max()))
+    return values.astype(np.int32, copy=False)
+
+
+def _as_coords(traj):
+    """将List[Point, ...]或者(N, 2)的数组转换为(N, 2)的float64数组"""
+    if isinstance(traj, np.ndarray):
+        return np.ascontiguousarray(traj, dtype=np.float64).reshape(-1, 2)
+    if isinstance(traj, TrajectoryView):
+        return traj.coords
+    coords = np.empty((len(traj), 2), dtype=np.float64)
+    for i, p in enumerate(traj):
+        coords[i] = (p.x, p.y)
+    return coords
+
+
+class TrajectoryView(object):
+    """一条轨迹的轻量级视图, 按索引访问时才生成Point对象, 切片时不复制坐标数组, 可以直接作为轨迹传入partition方法"""
+    __slots__ = ('coords', 'traj_id')
+
+    def __init__(self, coords: np.ndarray, traj_id=None):
+        self.coords = coords
+        self.traj_id = traj_id
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return TrajectoryView(self.coords[item], self.traj_id)
+        x, y = self.coords[item]
+        return Point(float(x), float(y), traj_id=self.traj_id)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class TrajectoryStore(object):
+    """多条轨迹的列式存储, 所有轨迹点按轨迹顺序存放在一个(P, 2)的坐标数组中, 通过offsets划分每条轨迹
+    parameter
+    ---------
+        coords: np.ndarray, shape为(P, 2)的float64坐标数组
+        offsets: np.ndarray, shape为(T+1, )的int64数组, 第i条轨迹的点为coords[offsets[i]:offsets[i+1]]
+        traj_ids: np.ndarray, shape为(T, )的int32轨迹ID数组, ID超出int32范围时抛出ValueError
+    """
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, traj_ids: np.ndarray = None):
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if traj_ids is None:
+            traj_ids = np.arange(len(self.offsets) - 1)
+        self.traj_ids = _as_int32(traj_ids)
+
+    @classmethod
+    def from_trajectories(cls, trajectories, traj_ids=None):
+        """通过轨迹集合生成store
+        parameter
+        ---------
+            trajectories: Iterable[List[Point, ...] or np.ndarray], 轨迹集合, 每条轨迹为Point列表或者(N, 2)的坐标数组
+            traj_ids: Iterable[int], 轨迹ID, 默认为轨迹的序号
+        """
+        parts = [_as_coords(t) for t in trajectories]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in parts])
+        coords = np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.float64)
+        return cls(coords, offsets, traj_ids)
+
+    @classmethod
+    def concatenate(cls, stores):
+        stores = list(stores)
+        if not stores:
+            return cls(np.empty((0, 2), dtype=np.float64), np.zeros(1, dtype=np.int64))
+        sizes = np.cumsum([0] + [len(s.coords) for s in stores[:-1]])
+        offsets = np.concatenate([[0]] + [s.offsets[1:] + size for s, size in zip(stores, sizes)])
+        return cls(np.concatenate([s.coords for s in stores]), offsets, np.concatenate([s.traj_ids for s in stores]))
+
+    def __len__(self):
+        return len(self.traj_ids)
+
+    def trajectory(self, i: int) -> TrajectoryView:
+        return TrajectoryView(self.coords[self.offsets[i]:self.offsets[i+1]], int(self.traj_ids[i]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.trajectory(i)
+
+
+class SegmentView(Segment):
+    """SegmentStore中一个segment的视图, 兼容Segment的所有方法, 对cluster_id的修改直接写回store中"""
+    __slots__ = ('_store', '_pos')
+
+    def __init__(self, store: 'SegmentStore', pos: int):
+        self._store = store
+        self._pos = pos
+        self._geometry = None
+
+    @property
+    def start(self):
+        row = self._store.coords[self._pos]
+        return Point(float(row[0]), float(row[1]), traj_id=self.traj_id)
+
+    @property
+    def end(self):
+        row = self._store.coords[self._pos]
+        return Point(float(row[2]), float(row[3]), traj_id=self.traj_id)
+
+    @property
+    def traj_id(self):
+        traj_id = int(self._store.traj_id[self._pos])
+        return None if traj_id == no_traj_id else traj_id
+
+    @property
+    def cluster_id(self):
+        return int(self._store.cluster_id[self._pos])
+
+    @cluster_id.setter
+    def cluster_id(self, cluster_id: int):
+        self._store.cluster_id[self._pos] = cluster_id
+
+
+class SegmentStore(object):
+    """segment集合的列式存储, 可以作为line_segment_clustering和representative_trajectory_generation的输入
+    parameter
+    ---------
+        coords: np.ndarray, shape为(N, 4)的float64坐标数组, 每一行为(start.x, start.y, end.x, end.y)
+        traj_id: np.ndarray, shape为(N, )的int32轨迹ID数组, 轨迹ID为None时存储为-1, ID超出int32范围时抛出ValueError
+        cluster_id: np.ndarray, shape为(N, )的int32聚类ID数组, 默认为-1
+    """
+    def __init__(self, coords: np.ndarray = None, traj_id: np.ndarray = None, cluster_id: np.ndarray = None):
+        if coords is None:
+            coords = np.empty((0, 4), dtype=np.float64)
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 4)
+        size = self.coords.shape[0]
+        self.traj_id = np.full(size, no_traj_id, dtype=np.int32) if traj_id is None else _as_int32(traj_id)
+        self.cluster_id = np.full(size, -1, dtype=np.int32) if cluster_id is None else _as_int32(cluster_id, 'cluster_id')
+
+    @classmethod
+    def from_segments(cls, segs):
+        coords = np.empty((len(segs), 4), dtype=np.float64)
+        traj_id = np.empty(len(segs), dtype=np.int64)
+        cluster_id = np.empty(len(segs), dtype=np.int64)
+        for i, seg in enumerate(segs):
+            coords[i] = (seg.start.x, seg.start.y, seg.end.x, seg.end.y)
+            traj_id[i] = no_traj_id if seg.traj_id is None else seg.traj_id
+            cluster_id[i] = seg.cluster_id
+        return cls(coords, traj_id, cluster_id)
+
+    @classmethod
+    def concatenate(cls, stores):
+        stores = list(stores)
+        if not stores:
+            return cls()
+        return cls(np.concatenate([s.coords for s in stores]), np.concatenate([s.traj_id for s in stores]),
+                   np.concatenate([s.cluster_id for s in stores]))
+
+    def save(self, path: str):
+        """将segment的坐标, 轨迹ID和聚类ID分别保存为path目录下的.npy文件"""
+        os.makedirs(path, exist_ok=True)
+        for name in _segment_files:
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = 'c') -> 'SegmentStore':
+        """以memmap的方式加载save保存的segment, 不复制数据
+        parameter
+        ---------
+            path: str, save时的目录
+            mmap_mode: str, np.load的mmap_mode, 默认'c'(copy-on-write), 聚类时修改cluster_id不会写回磁盘; 'r'为只读, 'r+'修改会写回磁盘,
+                None时读取到内存中
+        return
+        ------
+            SegmentStore
+        """
+        return cls(*(np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode) for name in _segment_files))
+
+    def to_segments(self):
+        """生成独立的Segment对象列表, 与store不再关联"""
+        return [Segment(seg.start, seg.end, traj_id=seg.traj_id, cluster_id=seg.cluster_id) for seg in self]
+
+    def take(self, positions) -> 'SegmentStore':
+        positions = np.asarray(positions, dtype=np.int64)
+        return SegmentStore(self.coords[positions], self.traj_id[positions], self.cluster_id[positions])
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError("SegmentStore index out of range")
+            return SegmentView(self, int(item))
+        if isinstance(item, slice):
+            return SegmentStore(self.coords[item], self.traj_id[item], self.cluster_id[item])
+        return self.take(item)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SegmentView(self, i)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :stream.py
+# target    :在线(streaming)模式的TRACLUS实现, 轨迹点逐个到达时进行partition, 确定特征点后立即输出segment并增量更新聚类结果
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 17:05
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from .point import Point
+from .segment import Segment
+from .index import SegmentGridIndex
+from .partition import _mdl_costs
+from .cluster import min_traj_cluster
+
+
+class _PartitionState(object):
+    """一条轨迹的partition状态, 坐标和子segment长度保存在预先分配的数组中, 容量不足时倍增. [start, size)为从当前start_index开始的轨迹点,
+    start之前的点在下一次扩容时才删除, 每个点的追加和删除都是均摊O(1)"""
+    __slots__ = ('points', 'xs', 'ys', 'sub_len', 'start', 'size')
+
+    def __init__(self, capacity: int = 16):
+        self.points = []
+        self.xs, self.ys = np.empty(capacity, dtype=np.float64), np.empty(capacity, dtype=np.float64)
+        self.sub_len = np.empty(capacity, dtype=np.float64)  # sub_len[i]为点i到点i+1的距离
+        self.start, self.size = 0, 0
+
+    def __len__(self):
+        return self.size - self.start
+
+    def append(self, point):
+        if self.size == len(self.xs):
+            n, capacity = len(self), len(self.xs)
+            if n * 2 > capacity:
+                capacity *= 2
+            xs, ys, sub_len = np.empty(capacity), np.empty(capacity), np.empty(capacity)
+            xs[:n], ys[:n], sub_len[:n] = self.xs[self.start:self.size], self.ys[self.start:self.size], self.sub_len[self.start:self.size]
+            self.xs, self.ys, self.sub_len = xs, ys, sub_len
+            del self.points[:self.start]
+            self.start, self.size = 0, n
+        if self.size > self.start:
+            last = self.points[-1]
+            self.sub_len[self.size-1] = math.sqrt(math.pow(point.x - last.x, 2) + math.pow(point.y - last.y, 2))
+        self.points.append(point)
+        self.xs[self.size], self.ys[self.size] = point.x, point.y
+        self.size += 1
+
+
+class StreamingPartitioner(object):
+    """在线的approximate_trajectory_partitioning, 每到达一个轨迹点只计算一次MDL(确定特征点时再计算一次), 对同一条轨迹按顺序输入所有的点后
+    调用flush, 输出的segment与approximate_trajectory_partitioning的结果一致. 轨迹点追加到预先分配的数组中, 不会重新构造数组, 但是MDL需要计算
+    新的假设segment与每个子segment之间的距离, 因此一次MDL的计算量与上一个特征点之后的点数k成正比(与approximate_trajectory_partitioning相同).
+    method
+    ------
+        add_point(traj_id, point): 增加一个轨迹点, 返回确定了特征点后输出的segment列表
+        flush(traj_id): 结束轨迹, 输出最后一个segment, traj_id为None时结束所有的轨迹
+    """
+    def __init__(self, theta: float = 5.0):
+        self.theta = theta
+        self._states = dict()
+
+    def __len__(self):
+        return len(self._states)
+
+    def add_point(self, traj_id, point):
+        """
+        parameter
+        ---------
+            traj_id: int, 轨迹ID
+            point: Point or Tuple[float, float], 轨迹点, 同一条轨迹的点必须按照时间顺序输入
+        return
+        ------
+            List[Segment, ...], 新确定的segment列表, 通常为空或者只有一个segment
+        """
+        if not isinstance(point, Point):
+            point = Point(point[0], point[1], traj_id=traj_id)
+        state = self._states.get(traj_id)
+        if state is None:
+            state = self._states[traj_id] = _PartitionState()
+        state.append(point)
+
+        result = []
+        curr_index = len(state) - 1
+        while curr_index > 0:
+            start, size = state.start, state.size
+            cost_par, cost_nopar = next(_mdl_costs(state.xs[start:size], state.ys[start:size], state.sub_len[start:size-1],
+                                                   0, curr_index, curr_index))
+            # curr_index为1时start_index不会移动, 不再重复计算
+            if not cost_par > (cost_nopar+self.theta) or curr_index == 1:
+                break
+            result.append(Segment(state.points[state.start], state.points[state.size-2], traj_id=traj_id, cluster_id=-1))
+            # 特征点curr_index-1作为新的start_index, 之前的轨迹点在扩容时删除
+            state.start += curr_index - 1
+            curr_index = len(state) - 1
+        return result
+
+    def flush(self, traj_id=None):
+        traj_ids = list(self._states.keys()) if traj_id is None else [traj_id]
+        result = []
+        for _id in traj_ids:
+            state = self._states.pop(_id, None)
+            if state is not None and len(state):
+                result.append(Segment(state.points[state.start], state.points[-1], traj_id=_id, cluster_id=-1))
+        return result
+
+
+class IncrementalClustering(object):
+    """增量的segment密度聚类, segment逐个插入, 每次插入只查询新segment的邻域, 通过并查集维护core segment之间的连通关系.
+    与dbscan的定义一致: 邻域(包括自身)的segment数量不小于min_lines的segment为core segment, 相互在邻域内的core segment属于同一个类簇,
+    非core segment归属于邻域中最早插入的core segment所在的类簇. 类簇合并时保留较小的cluster_id, 因此cluster_id在插入过程中保持稳定.
+    邻域关系以新插入的segment计算的距离为准(两个segment长度相等时get_all_distance可能不对称).
+    method
+    ------
+        insert(seg): 插入一个segment, 返回segment的位置
+        cluster_of(pos): 返回第pos个segment当前的cluster_id, 不属于任何类簇时为-1
+        clusters(): 返回与line_segment_clustering相同结构的(cluster_dict, remove_cluster)
+    """
+    def __init__(self, epsilon: float = 2.0, min_lines: int = 5):
+        self.epsilon = epsilon
+        self.min_lines = min_lines
+        self.index = SegmentGridIndex([], epsilon=epsilon)
+        self._adjacency = []
+        self._core = []
+        self._parent = []
+        self._cluster_id = dict()  # 并查集根节点 -> cluster_id
+        self._next_cluster = 0
+
+    def __len__(self):
+        return len(self._adjacency)
+
+    @property
+    def segs(self):
+        return self.index.segs
+
+    def _find(self, pos):
+        root = pos
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[pos] != root:
+            self._parent[pos], pos = root, self._parent[pos]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        cluster_id = min(self._cluster_id.pop(ra), self._cluster_id.pop(rb))
+        self._parent[rb] = ra
+        self._cluster_id[ra] = cluster_id
+
+    def _set_core(self, pos):
+        self._core[pos] = True
+        self._cluster_id[pos] = self._next_cluster
+        self._next_cluster += 1
+        for other in self._adjacency[pos]:
+            if self._core[other] and other != pos:
+                self._union(pos, other)
+
+    def insert(self, seg: Segment) -> int:
+        neighbors = self.index.neighborhood_positions(seg, self.epsilon)
+        pos = self.index.insert(seg)
+        neighbors.append(pos)
+        self._adjacency.append(neighbors)
+        self._core.append(False)
+        self._parent.append(pos)
+        for other in neighbors[:-1]:
+            self._adjacency[other].append(pos)
+        for other in neighbors:
+            if not self._core[other] and len(self._adjacency[other]) >= self.min_lines:
+                self._set_core(other)
+        return pos
+
+    def cluster_of(self, pos: int) -> int:
+        if self._core[pos]:
+            return self._cluster_id[self._find(pos)]
+        cores = [other for other in self._adjacency[pos] if self._core[other]]
+        if not cores:
+            return -1
+        return self._cluster_id[self._find(min(cores))]
+
+    def labels(self):
+        return [self.cluster_of(pos) for pos in range(len(self))]
+
+    def clusters(self):
+        """返回当前的聚类结果, 同时更新所有segment的cluster_id, 结构与line_segment_clustering的返回结果一致, key为稳定的cluster_id"""
+        cluster_dict = defaultdict(list)
+        for seg, label in zip(self.segs, self.labels()):
+            seg.cluster_id = label
+            if label != -1:
+                cluster_dict[label].append(seg)
+        remove_cluster = dict()
+        for i in sorted(cluster_dict.keys()):
+            if len(set(s.traj_id for s in cluster_dict[i])) < min_traj_cluster:
+                remove_cluster[i] = cluster_dict.pop(i)
+        return cluster_dict, remove_cluster
+
+
+class StreamingTRACLUS(object):
+    """在线模式的TRACLUS, 轨迹点到达后进行partition, 输出的segment立即插入到增量聚类中
+    method
+    ------
+        add_point(traj_id, point): 增加一个轨迹点, 返回新插入聚类的segment列表
+        flush(traj_id): 结束轨迹并插入最后一个segment
+        clusters(): 返回当前的(cluster_dict, remove_cluster)
+    """
+    def __init__(self, theta: float = 5.0, epsilon: float = 2.0, min_lines: int = 5):
+        self.partitioner = StreamingPartitioner(theta=theta)
+        self.clustering = IncrementalClustering(epsilon=epsilon, min_lines=min_lines)
+
+    def _insert(self, segs):
+        for seg in segs:
+            self.clustering.insert(seg)
+        return segs
+
+    def add_point(self, traj_id, point):
+        return self._insert(self.partitioner.add_point(traj_id, point))
+
+    def flush(self, traj_id=None):
+        return self._insert(self.partitioner.flush(traj_id))
+
+    def clusters(self):
+        return self.clustering.clusters()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------------
+# file      :synthetic.py
+# target    :可复现的合成轨迹生成器, 轨迹沿着若干条通道(corridor)的中心线分布并加入噪声, 同时按比例生成随机游走的离群轨迹, 用于基准测试
+#
+# output    :
+# author    :Miller
+# date      :2026/10/18 22:40
+# log       :包含修改时间、修改人、修改line及原因
+# --------------------------------------------------------------------------------
+import numpy as np
+
+from .point import Point
+
+
+def _corridor(rng: np.random.RandomState, n_points: int, extent: float, step: float):
+    """生成一条通道的中心线, 起点在区域内随机选取, 方向缓慢变化"""
+    start = rng.uniform(0, extent, 2)
+    heading = rng.uniform(0, 2 * np.pi)
+    turns = np.cumsum(rng.normal(0, 0.08, n_points - 1))
+    steps = step * np.column_stack((np.cos(heading + turns), np.sin(heading + turns)))
+    return np.vstack((start, start + np.cumsum(steps, axis=0)))
+
+
+def generate_trajectories(n_traj: int = 100, n_points: int = 50, corridors: int = 5, noise: float = 1.0,
+                          outlier_rate: float = 0.1, extent: float = 1000.0, step: float = 10.0, seed: int = 0,
+                          as_array: bool = False):
+    """生成合成轨迹, 相同参数和seed下的结果完全一致
+    parameter
+    ---------
+        n_traj: int, 轨迹数量
+        n_points: int, 每条轨迹的点数
+        corridors: int, 通道数量, 非离群轨迹依次分配到各个通道
+        noise: float, 轨迹点相对于通道中心线的高斯噪声标准差
+        outlier_rate: float, 离群轨迹(随机游走)的比例
+        extent: float, 通道起点所在区域的边长
+        step: float, 相邻轨迹点之间的平均距离
+        seed: int, 随机数种子
+        as_array: bool, 为True时每条轨迹为(n_points, 2)的坐标数组, 否则为Point列表
+    return
+    ------
+        List[List[Point, ...] or np.ndarray], 轨迹集合
+    """
+    rng = np.random.RandomState(seed)
+    centers = [_corridor(rng, n_points, extent, step) for _ in range(max(corridors, 1))]
+    outliers = rng.uniform(size=n_traj) < outlier_rate
+    trajectories = []
+    for i in range(n_traj):
+        if outliers[i]:
+            start = rng.uniform(0, extent, 2)
+            coords = start + np.cumsum(rng.normal(0, step, (n_points, 2)), axis=0)
+        else:
+            center = centers[i % len(centers)]
+            offset = rng.normal(0, 3 * noise, 2)  # 每条轨迹在通道内的整体偏移
+            coords = center + offset + rng.normal(0, noise, (n_points, 2))
+        trajectories.append(coords if as_array else [Point(float(x), float(y)) for x, y in coords])
+    return trajectories